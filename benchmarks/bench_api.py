@@ -0,0 +1,109 @@
+"""
+Requests per second of the headless JSON API (``druginfo.api``).
+
+Starts one uvicorn worker in a subprocess and drives it from a set of
+keep-alive connections for a few seconds per endpoint: a full 200 response,
+a conditional request answered with 304, and the two computed endpoints.
+
+    python benchmarks/bench_api.py [--connections 32] [--seconds 3]
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CASES = (
+    ("GET /api/v1/dosing", "/api/v1/dosing", {}),
+    ("GET /api/v1/dosing (304)", "/api/v1/dosing", {"If-None-Match": None}),
+    ("GET /api/v1/dose", "/api/v1/dose?weight_kg=72&egfr=44&prior_agent=acei", {}),
+    ("GET /api/v1/interactions/check", "/api/v1/interactions/check?drug=lisinopril&drug=ibuprofen", {}),
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _request(reader, writer, raw):
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    if length:
+        await reader.readexactly(length)
+    return head
+
+
+async def _worker(port, raw, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await _request(reader, writer, raw)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def _etag(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = await _request(reader, writer, f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    writer.close()
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"etag:"):
+            return line.split(b":", 1)[1].strip().decode()
+
+
+async def run(port, connections, seconds):
+    print(f"{'endpoint':<34} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for label, path, headers in CASES:
+        headers = {name: value or await _etag(port, path) for name, value in headers.items()}
+        extra = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        raw = f"GET {path} HTTP/1.1\r\nHost: bench\r\n{extra}\r\n".encode()
+
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(_worker(port, raw, deadline, latencies) for _ in range(connections)))
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"{label:<34} {len(latencies) / seconds:>9,.0f} {p50:>9.2f} {p99:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "druginfo.api:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        asyncio.run(run(port, args.connections, args.seconds))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
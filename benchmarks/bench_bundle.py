@@ -0,0 +1,166 @@
+"""
+Per-worker memory of the app with and without the Arrow table bundle.
+
+Scales every table of ``monographs/entresto.json`` by ``--scale`` (rows
+repeated) to stand in for full label datasets, then starts ``--workers``
+processes per configuration. Each runs the real page script
+(``entresto_app.py``, through ``AppTest``) once per section, lets the
+background cache warm-up finish and measures, once all of them are done:
+
+* heap: private dirty memory the app added to the worker (after streamlit,
+  pandas and pyarrow are imported, so their own footprint is excluded);
+* mapped: resident pages of the memory-mapped bundle files, as RSS and as
+  PSS (shared pages split between the processes that map them).
+
+Configurations are the app without a bundle (``ENTRESTO_FAST_START=1``,
+tables drawn from the parsed lists, and the default mode, which builds
+DataFrames from them) and the same two modes with the bundle built, where
+``monographs.load`` reads the tables from the mapped files::
+
+    python benchmarks/bench_bundle.py [--scale 500] [--workers 4]
+
+Linux only (reads ``/proc/<pid>/smaps``).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "entresto_app.py"
+SOURCE = ROOT / "monographs" / "entresto.json"
+SLUG = "entresto"
+# name -> (bundle built, ENTRESTO_FAST_START)
+CONFIGURATIONS = {
+    "lists": (False, True),
+    "pandas": (False, False),
+    "arrow": (True, False),
+    "arrow-fast": (True, True),
+}
+
+
+def private_dirty_kb(pid="self"):
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1])
+    return 0
+
+
+def mapped_kb(pid, directory):
+    """``(rss, pss)`` in kB of the mappings of files under ``directory``."""
+    rss = pss = 0
+    current = False
+    with open(f"/proc/{pid}/smaps") as smaps:
+        for line in smaps:
+            fields = line.split()
+            if "-" in fields[0] and not fields[0].endswith(":"):
+                current = len(fields) >= 6 and fields[5].startswith(str(directory))
+            elif current and fields[0] == "Rss:":
+                rss += int(fields[1])
+            elif current and fields[0] == "Pss:":
+                pss += int(fields[1])
+    return rss, pss
+
+
+def worker():
+    """Child process: run every section of the page, report, hold the caches until stdin closes."""
+    import gc
+
+    import pandas  # noqa: F401
+    import pyarrow  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, str(ROOT))
+    from druginfo import monographs
+
+    gc.collect()
+    before = private_dirty_kb()
+    for section in monographs.load(SLUG).sections:
+        page = AppTest.from_file(str(APP), default_timeout=300)
+        page.query_params["tab"] = section.key
+        page.run()
+        if page.exception:
+            raise RuntimeError(f"{section.key}: {page.exception[0].message}")
+    for thread in threading.enumerate():
+        if thread.name == "warm-up":
+            thread.join()
+    del page
+    gc.collect()
+    print(json.dumps({"heap_kb": private_dirty_kb() - before}), flush=True)
+    sys.stdin.read()
+
+
+def scaled_monograph(directory, scale):
+    document = json.loads(SOURCE.read_text(encoding="utf-8"))
+    # The adverse-risk model parses its table's rates when the monograph loads.
+    compiled = {(document.get("adverse_risk") or {}).get("table")}
+    for name, columns in document["tables"].items():
+        if name in compiled:
+            continue
+        for column, values in columns.items():
+            # Distinct text per copy, like real rows: nothing to deduplicate.
+            columns[column] = [f"{value} [{n}]" if isinstance(value, str) else value
+                               for n in range(scale) for value in values]
+    (Path(directory) / f"{SLUG}.json").write_text(json.dumps(document), encoding="utf-8")
+    return sum(len(next(iter(columns.values()))) for columns in document["tables"].values())
+
+
+def measure(workers, env, bundle_dir):
+    processes = [
+        subprocess.Popen([sys.executable, __file__, "--worker"], cwd=ROOT, env=env,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(workers)
+    ]
+    heap = [json.loads(process.stdout.readline())["heap_kb"] for process in processes]
+    mapped = [mapped_kb(process.pid, bundle_dir) for process in processes]
+    for process in processes:
+        process.stdin.close()
+        process.wait()
+    return {
+        "heap_kb": sum(heap) / workers,
+        "mapped_rss_kb": sum(rss for rss, _ in mapped) / workers,
+        "mapped_pss_kb": sum(pss for _, pss in mapped) / workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=500, help="copies of every table's rows")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker()
+        return
+
+    with tempfile.TemporaryDirectory() as monograph_dir, tempfile.TemporaryDirectory() as bundle_dir, \
+            tempfile.TemporaryDirectory() as empty_dir:
+        rows = scaled_monograph(monograph_dir, args.scale)
+        env = {**os.environ, "ENTRESTO_MONOGRAPH_DIR": monograph_dir, "ENTRESTO_BUNDLE_DIR": bundle_dir}
+        subprocess.run([sys.executable, "-m", "druginfo.bundle"], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        on_disk = sum(path.stat().st_size for path in Path(bundle_dir).rglob("*.arrow"))
+        tables = len(json.loads(SOURCE.read_text(encoding="utf-8"))["tables"])
+        print(f"{rows} rows in {tables} tables (x{args.scale}), bundle {on_disk / 2**20:.1f} MB on disk, "
+              f"{args.workers} workers\n")
+
+        print(f"{'app':<11} {'heap MB':>9} {'mapped RSS':>11} {'mapped PSS':>11} "
+              f"{'MB/worker':>10} {'MB total':>9}")
+        for name, (bundled, fast_start) in CONFIGURATIONS.items():
+            config_env = {**env, "ENTRESTO_BUNDLE_DIR": bundle_dir if bundled else empty_dir,
+                          "ENTRESTO_FAST_START": "1" if fast_start else "0"}
+            result = measure(args.workers, config_env, bundle_dir)
+            per_worker = (result["heap_kb"] + result["mapped_pss_kb"]) / 1024
+            print(f"{name:<11} {result['heap_kb'] / 1024:>9.1f} {result['mapped_rss_kb'] / 1024:>11.1f} "
+                  f"{result['mapped_pss_kb'] / 1024:>11.1f} {per_worker:>10.1f} "
+                  f"{per_worker * args.workers:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Cold-start cost of the app: import time and time to first render.
+
+Each measurement runs in a fresh interpreter started with ``-X importtime``,
+which loads the page script through Streamlit's ``AppTest`` and renders it
+once, in the default mode and with ``ENTRESTO_FAST_START=1``. Import totals
+count only modules loaded before the first render finished (the background
+cache warm-up runs after it).
+
+    python benchmarks/bench_cold_start.py [--runs 3] [--top 8]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "entresto_app.py"
+MARKER = "-- first render --"
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+MODES = (("default", {}), ("fast start", {"ENTRESTO_FAST_START": "1"}))
+
+
+def first_render():
+    """Child process: render the page once and report timings on stdout."""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(APP), default_timeout=120).run()
+    elapsed = time.perf_counter() - start
+    print(MARKER, file=sys.stderr, flush=True)
+    print(json.dumps({
+        "first_render_s": elapsed,
+        "exceptions": len(app.exception),
+        "pandas_loaded": "pandas" in sys.modules,
+    }), flush=True)
+    os._exit(0)
+
+
+def parse_importtime(stderr):
+    """Return ``(total_us, top_level)`` for imports logged before the marker."""
+    total, top_level = 0, {}
+    for line in stderr.splitlines():
+        if line.strip() == MARKER:
+            break
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total += int(self_us)
+        if len(indent) == 1:
+            top_level[module] = int(cumulative_us)
+    return total, top_level
+
+
+def measure(env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--child"],
+        cwd=ROOT, env={**os.environ, **env}, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["import_us"], report["top_level"] = parse_importtime(result.stderr)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        first_render()
+
+    print(f"{'mode':<12} {'imports (s)':>12} {'first render (s)':>17} {'pandas loaded':>14}")
+    last = {}
+    for label, env in MODES:
+        reports = [measure(env) for _ in range(args.runs)]
+        imports = statistics.median(report["import_us"] for report in reports) / 1e6
+        render = statistics.median(report["first_render_s"] for report in reports)
+        print(f"{label:<12} {imports:>12.3f} {render:>17.3f} {str(reports[-1]['pandas_loaded']):>14}")
+        last[label] = reports[-1]
+
+    for label, report in last.items():
+        print(f"\nSlowest top-level imports ({label}):")
+        ranked = sorted(report["top_level"].items(), key=lambda item: -item[1])[:args.top]
+        for module, cumulative_us in ranked:
+            print(f"  {module:<40} {cumulative_us / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare header-image bytes before and after self-hosting.
+
+"Before" is what every page load used to fetch: the 2560px image from the
+third-party CDN. Pass either a local copy of it (``--source``) or let the
+script download it (``--url``, needs network access). "After" is the single
+variant a browser picks from the ``<picture>`` srcset for a given layout
+width, as built by ``python -m druginfo.images``.
+
+    python benchmarks/bench_header_image.py --source entresto-2560.jpg
+"""
+
+import argparse
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from druginfo import images  # noqa: E402
+
+ORIGINAL_URL = (
+    "https://sspark.genspark.ai/cfimages?u1=Muvp4AIB6G6Hg6MJeOOkZrhTW09LRwYzPlOQdDqaCTEDxui%2Bhh9Hujjrk1Hp7bxR"
+    "%2Ffgx4jzdmRna2kYAqXQGr2sxsSUp3tRUW21DgGbzesaR%2BIF7RSUdNj2HbVAldh9sSKjAUyXUtGPT48OjDuIn0XU6"
+    "&u2=ZoKqDbxo4ID3Wy2m&width=2560"
+)
+
+# Rendered image width in CSS px for a phone, a laptop and a wide desktop
+# (the image sits in the middle half of the page above 768px).
+LAYOUTS = (("phone (390px, 3x)", 390 * 3), ("laptop (1440px, 1x)", 720), ("desktop (2560px, 1x)", 1280))
+
+
+def original_bytes(args):
+    if args.source:
+        return Path(args.source).stat().st_size
+    with urllib.request.urlopen(args.url, timeout=30) as response:
+        return len(response.read())
+
+
+def picked_variant(variants, needed_width):
+    """Mimic srcset selection: smallest variant at least as wide, else the largest."""
+    ordered = sorted(variants, key=lambda v: v["width"])
+    return next((v for v in ordered if v["width"] >= needed_width), ordered[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", help="local copy of the original 2560px image")
+    parser.add_argument("--url", default=ORIGINAL_URL, help="original CDN URL (used without --source)")
+    args = parser.parse_args()
+
+    manifest = images.load_manifest()
+    if not manifest:
+        sys.exit("No variants found; run `python -m druginfo.images SOURCE_IMAGE` first.")
+
+    before = original_bytes(args)
+    print(f"before: original 2560px image, every layout: {before:>9,} bytes")
+    for fmt, _, _ in images.FORMATS:
+        variants = [v for v in manifest["variants"] if v["format"] == fmt]
+        if not variants:
+            continue
+        for name, needed in LAYOUTS:
+            variant = picked_variant(variants, needed)
+            saved = 100 * (1 - variant["bytes"] / before)
+            print(f"after:  {fmt:<4} {variant['width']:>4}px, {name:<21} {variant['bytes']:>9,} bytes ({saved:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Memory and load time of serving many drug monographs from one process.
+
+Writes ``--drugs`` synthetic copies of ``monographs/entresto.json`` to a
+temporary directory, points ``ENTRESTO_MONOGRAPH_DIR`` at it and requests
+random drugs through ``monographs.load``. Resident memory should level off
+once the LRU holds ``CACHE_SIZE`` monographs, however many drugs exist.
+
+    python benchmarks/bench_monographs.py [--drugs 500] [--requests 5000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE = ROOT / "monographs" / "entresto.json"
+
+
+def rss_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def write_drugs(directory, count):
+    document = json.loads(SOURCE.read_text(encoding="utf-8"))
+    for n in range(count):
+        document["slug"] = document["name"] = f"drug-{n:04d}"
+        (Path(directory) / f"drug-{n:04d}.json").write_text(json.dumps(document), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drugs", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_drugs(directory, args.drugs)
+        os.environ["ENTRESTO_MONOGRAPH_DIR"] = directory
+        sys.path.insert(0, str(ROOT))
+        from druginfo import monographs
+
+        slugs = monographs.available()
+        rng = random.Random(args.seed)
+        baseline = rss_mb()
+        print(f"{args.drugs} drugs, LRU of {monographs.CACHE_SIZE}, baseline RSS {baseline:.1f} MB\n")
+        print(f"{'requests':>9} {'RSS (MB)':>9} {'hits':>7} {'misses':>7} {'cached':>7} {'us/request':>11}")
+        step = max(1, args.requests // 10)
+        start = time.perf_counter()
+        for n in range(1, args.requests + 1):
+            monographs.load(rng.choice(slugs))
+            if n % step == 0:
+                info = monographs.cache_info()
+                elapsed = (time.perf_counter() - start) / step * 1e6
+                print(f"{n:>9} {rss_mb():>9.1f} {info.hits:>7} {info.misses:>7} {info.currsize:>7} {elapsed:>11.1f}")
+                start = time.perf_counter()
+
+
+if __name__ == "__main__":
+    main()
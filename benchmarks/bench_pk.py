@@ -0,0 +1,88 @@
+"""
+Speed of the PK simulator (``druginfo.pk``) and of re-plotting it in the app.
+
+Times the closed-form solver for one profile (uncached and cached) and for
+a cohort (patients x analytes x time points in one call), then drives the
+Pharmacokinetics section through Streamlit's ``AppTest`` as if a slider
+were being dragged, reporting full-rerun latency against the 50 ms budget.
+
+    python benchmarks/bench_pk.py [--patients 10000] [--drags 40]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from druginfo import monographs, pk  # noqa: E402
+
+BUDGET_MS = 50
+
+
+def best_ms(function, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return 1000 * min(timings)
+
+
+def solver(patients):
+    model = pk.model_from_tables(monographs.load().tables)
+    folds = pk.auc_folds(25, "B")
+
+    def uncached():
+        pk.profile.cache_clear()
+        pk.profile(model, "49/51 mg BID", folds, 10)
+
+    print(f"one profile, 10 days (961 points), uncached: {best_ms(uncached):8.3f} ms")
+    print(f"one profile, cached:                         "
+          f"{best_ms(lambda: pk.profile(model, '49/51 mg BID', folds, 10)):8.3f} ms")
+
+    rng = np.random.default_rng(0)
+    hours = np.linspace(0, 120, 481)
+    dose_scale = rng.choice([24 / 97, 49 / 97, 1.0], patients)
+    cohort_folds = np.array([pk.auc_folds(egfr, child_pugh) for egfr, child_pugh in zip(
+        rng.integers(15, 120, patients), rng.choice([None, "A", "B"], patients))])
+    elapsed = best_ms(lambda: pk.relative_concentrations(model, hours, dose_scale, cohort_folds), repeat=3)
+    print(f"{patients:,} patients x 3 analytes x {len(hours)} points:   {elapsed:8.1f} ms")
+
+
+def slider_drag(drags):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(ROOT / "entresto_app.py"), default_timeout=60).run()
+    app.radio(key="section_nav").set_value("pharmacokinetics").run()
+    latencies = []
+    for n in range(drags):
+        egfr = 15 + (n * 7) % 106
+        start = time.perf_counter()
+        app.slider(key="pk_egfr").set_value(egfr).run()
+        latencies.append(1000 * (time.perf_counter() - start))
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    print(f"\nslider drag, full rerun ({drags} moves): p50 {statistics.median(latencies):.1f} ms, "
+          f"p95 {p95:.1f} ms, max {ordered[-1]:.1f} ms "
+          f"({'within' if p95 <= BUDGET_MS else 'over'} the {BUDGET_MS} ms budget)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--drags", type=int, default=40)
+    args = parser.parse_args()
+    solver(args.patients)
+    slider_drag(args.drags)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Cost of picking up an edited monograph: full rebuild vs incremental reload.
+
+Copies ``monographs/entresto.json`` to a temporary directory, builds every
+derived cache the app holds (DataFrames, per-section search documents and
+the index, the interaction index and PK model) from scratch -- what a process
+restart pays before serving again -- and then edits one table and times the
+incremental path: ``monographs.refresh`` swapping in the new version and only
+the changed tables and sections being rebuilt::
+
+    python benchmarks/bench_reload.py [--table trials] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE = ROOT / "monographs" / "entresto.json"
+
+
+class Caches:
+    """The app's shared caches, keyed as in ``entresto_app.py`` and ``tools.py``."""
+
+    def __init__(self):
+        self.frames, self.documents, self.indexes, self.interactions, self.models = {}, {}, {}, {}, {}
+        self.built = 0
+
+    def _get(self, store, key, build):
+        if key not in store:
+            store[key] = build()
+            self.built += 1
+        return store[key]
+
+    def warm(self, monograph):
+        import pandas as pd
+
+        from druginfo import interactions, pk, search
+
+        for name, columns in monograph.tables.items():
+            self._get(self.frames, (name, monograph.table_versions[name]), lambda: pd.DataFrame(dict(columns)))
+        documents = [
+            self._get(self.documents, (section.key, monograph.section_versions[section.key]),
+                      lambda: search.section_documents(section, monograph.tables))
+            for section in monograph.sections
+        ]
+        self._get(self.indexes, monograph.version,
+                  lambda: search.SearchIndex(document for group in documents for document in group))
+        self._get(self.interactions, monograph.version_of(*interactions.TABLES),
+                  lambda: interactions.InteractionIndex(monograph.tables))
+        self._get(self.models, monograph.table_versions[pk.TABLE], lambda: pk.model_from_tables(monograph.tables))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--table", default="trials", help="table whose first cell is edited")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["ENTRESTO_MONOGRAPH_DIR"] = directory
+        sys.path.insert(0, str(ROOT))
+        import pandas  # noqa: F401  (imported once, as in a warm worker)
+
+        from druginfo import monographs
+
+        path = Path(directory) / SOURCE.name
+        document = json.loads(SOURCE.read_text(encoding="utf-8"))
+        path.write_text(json.dumps(document), encoding="utf-8")
+
+        full, incremental, rebuilt = [], [], []
+        for n in range(args.repeat):
+            monographs.cache_clear()
+            caches = Caches()
+            start = time.perf_counter()
+            caches.warm(monographs.load(path.stem))
+            full.append(time.perf_counter() - start)
+            total = caches.built
+
+            column = next(iter(document["tables"][args.table]))
+            document["tables"][args.table][column][0] = f"edit {n}"
+            path.write_text(json.dumps(document), encoding="utf-8")
+            caches.built = 0
+            start = time.perf_counter()
+            for _, new in monographs.refresh():
+                caches.warm(new)
+            incremental.append(time.perf_counter() - start)
+            rebuilt.append(caches.built)
+
+        print(f"edit to table {args.table!r}, {args.repeat} runs (median)\n")
+        print(f"full rebuild (restart):  {1000 * statistics.median(full):7.2f} ms, {total} cache entries built")
+        print(f"incremental reload:      {1000 * statistics.median(incremental):7.2f} ms, "
+              f"{max(rebuilt)} cache entries rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Time to estimate a cohort's adverse events (``druginfo.risk``).
+
+Generates a synthetic cohort with the fields of ENTRESTO's special
+populations and times ``RiskModel.estimate`` -- population masks, expected
+counts and the bootstrap intervals -- at 10k, 100k and 1M patients, and
+reading the cohort from CSV first, as an upload arrives::
+
+    python benchmarks/bench_risk.py [--sizes 10000 100000 1000000] [--samples 2000]
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from druginfo import monographs  # noqa: E402
+
+
+def synthetic_cohort(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "black": rng.random(n) < 0.12,
+        "age": rng.integers(25, 95, n),
+        "egfr": rng.uniform(10, 120, n).round(),
+        "diabetes": rng.random(n) < 0.35,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--samples", type=int, default=2000, help="bootstrap replicates")
+    args = parser.parse_args()
+
+    model = monographs.load().risk_model
+    print(f"{len(model.events)} adverse events, {len(model.populations)} populations, "
+          f"{args.samples} bootstrap replicates\n")
+    print(f"{'patients':>10} {'estimate (s)':>13} {'patients/s':>14} {'from CSV (s)':>13}")
+    for n in args.sizes:
+        cohort = synthetic_cohort(n)
+        payload = cohort.to_csv(index=False).encode()
+
+        start = time.perf_counter()
+        model.estimate(cohort, samples=args.samples)
+        estimate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model.estimate(pd.read_csv(io.BytesIO(payload)), samples=args.samples)
+        from_csv = time.perf_counter() - start
+
+        print(f"{n:>10,} {estimate:>13.3f} {n / estimate:>14,.0f} {from_csv:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
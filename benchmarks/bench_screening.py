@@ -0,0 +1,78 @@
+"""
+Throughput of contraindication screening (``druginfo.screening``).
+
+Compiles the rules of ``monographs/entresto.json`` and screens a synthetic
+cohort two ways: one patient record at a time (``RuleSet.screen``, what the
+app and the API do per request) and column-wise over the whole cohort
+(``RuleSet.screen_frame``), once with typed columns and once with every
+column as text, as a CSV upload without dtypes arrives::
+
+    python benchmarks/bench_screening.py [--sizes 10000 100000 1000000] [--records 100000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from druginfo import monographs  # noqa: E402
+
+
+def synthetic_cohort(n, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = rng.uniform(0, 120, n)
+    hours[rng.random(n) < 0.7] = np.nan  # not on an ACE inhibitor
+    return pd.DataFrame({
+        "hypersensitivity": rng.random(n) < 0.005,
+        "angioedema_history": rng.random(n) < 0.01,
+        "hours_since_acei": hours,
+        "aliskiren": rng.random(n) < 0.02,
+        "diabetes": rng.random(n) < 0.35,
+        "pregnant": rng.random(n) < 0.01,
+        "egfr": rng.integers(5, 120, n).astype(float),
+        "dialysis": rng.random(n) < 0.02,
+        "child_pugh": rng.choice(["", "A", "B", "C"], n, p=[0.85, 0.08, 0.05, 0.02]),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--records", type=int, default=100_000, help="patients screened one at a time")
+    args = parser.parse_args()
+
+    rules = monographs.load().rules
+    print(f"{len(rules)} rules, {len(rules.tests)} distinct tests\n")
+
+    records = synthetic_cohort(args.records).to_dict("records")
+    start = time.perf_counter()
+    for record in records:
+        rules.screen(record)
+    elapsed = time.perf_counter() - start
+    print(f"one record at a time: {args.records / elapsed:>12,.0f} screens/s "
+          f"({1e6 * elapsed / args.records:.1f} µs each)\n")
+
+    print(f"{'rows':>10} {'typed (s)':>10} {'screens/s':>14} {'text (s)':>10} {'screens/s':>14}")
+    for n in args.sizes:
+        cohort = synthetic_cohort(n)
+        text = cohort.astype(str)
+
+        start = time.perf_counter()
+        result = rules.screen_frame(cohort)
+        typed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rules.screen_frame(text)
+        untyped = time.perf_counter() - start
+
+        assert len(result) == n
+        print(f"{n:>10,} {typed:>10.3f} {n / typed:>14,.0f} {untyped:>10.3f} {n / untyped:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Throughput of the page as the number of worker processes grows.
+
+Each worker is a separate process, as behind ``python -m druginfo.cluster``,
+driving ``--sessions`` simulated users through ``AppTest`` (the sessions and
+actions of ``load_test.py``) with no think time. After every worker has
+warmed its caches, all of them run for ``--seconds`` and the total reruns
+per second is compared with one worker: within a process the GIL runs one
+script at a time, so throughput only grows with processes, up to the number
+of cores::
+
+    python benchmarks/bench_workers.py [--workers 1 2 4 8] [--seconds 20]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def worker(sessions, seconds, seed, ready, start, results):
+    sys.path.insert(0, str(HERE))
+    from load_test import User
+
+    users = [User(seed + n) for n in range(sessions)]
+    for user in users:
+        user.open()
+        user.step()
+    ready.wait()
+    start.wait()
+    reruns = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for user in users:
+            before = len(user.latencies)
+            user.step()
+            reruns += len(user.latencies) - before
+    errors = sum(user.errors for user in users)
+    results.put((reruns, errors))
+
+
+def run_level(workers, sessions, seconds, seed):
+    context = multiprocessing.get_context("spawn")
+    ready = context.Barrier(workers + 1)
+    start = context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(sessions, seconds, seed + 1000 * n, ready, start, results))
+                 for n in range(workers)]
+    for process in processes:
+        process.start()
+    ready.wait()
+    began = time.perf_counter()
+    start.wait()
+    totals = [results.get() for _ in processes]
+    wall = time.perf_counter() - began
+    for process in processes:
+        process.join()
+    reruns = sum(reruns for reruns, _ in totals)
+    return reruns / wall, sum(errors for _, errors in totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    cores = os.cpu_count() or 1
+    default = sorted({1, 2, 4, cores} & set(range(1, cores + 1))) or [1]
+    parser.add_argument("--workers", type=int, nargs="+", default=default)
+    parser.add_argument("--sessions", type=int, default=4, help="simulated users per worker")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{cores} CPU cores, {args.sessions} sessions per worker, {args.seconds:.0f} s per level\n")
+    print(f"{'workers':>8} {'reruns/s':>10} {'speedup':>8} {'efficiency':>11} {'errors':>7}")
+    baseline = None
+    for workers in args.workers:
+        throughput, errors = run_level(workers, args.sessions, args.seconds, args.seed)
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"{workers:>8} {throughput:>10.1f} {speedup:>7.2f}x {speedup / (workers / args.workers[0]):>10.0%} "
+              f"{errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
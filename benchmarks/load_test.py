@@ -0,0 +1,245 @@
+"""
+Concurrent-session load test for the Streamlit page.
+
+Simulates N users in one process with Streamlit's ``AppTest``: every user is
+its own session (own ``session_state``, shared ``st.cache_resource``), opens
+the page and then keeps switching sections, searching, checking interactions
+and changing calculator inputs, one rerun after another with no think time.
+Each load level reports rerun latency percentiles, throughput, CPU cores
+used and resident memory per open session; the whole run is written as JSON
+so results can be compared over time::
+
+    python benchmarks/load_test.py --users 1 5 10 25 --actions 30
+    python benchmarks/load_test.py --compare benchmarks/results/<earlier>.json
+
+``AppTest`` swaps process-global runtime state on every run, so reruns are
+serialized with a lock and a user's latency includes the time queued behind
+other sessions. That is also how one server process behaves: the GIL runs
+one script at a time, so the lock models a single core.
+
+"Max sessions per core" converts the best throughput that stayed within the
+p95 latency target into real users, assuming each user triggers one rerun
+every ``--think-time`` seconds.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "entresto_app.py"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SEARCHES = ("hyperkalemia", "washout", "warfarin", "angioedema", "paradigm", "renal")
+MEDICATIONS = ("Lisinopril", "Spironolactone", "Warfarin", "Ibuprofen", "Digoxin", "Lithium")
+
+_RUN_LOCK = threading.Lock()
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak, not current, RSS: an upper bound where /proc is unavailable.
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# ==================== SIMULATED USER ====================
+class User:
+    """One browser session driving the page through ``AppTest``."""
+
+    def __init__(self, seed):
+        from streamlit.testing.v1 import AppTest
+
+        self.random = random.Random(seed)
+        self.app = AppTest.from_file(str(APP), default_timeout=120)
+        self.latencies = []
+        self.errors = 0
+
+    def _rerun(self, action):
+        start = time.perf_counter()
+        with _RUN_LOCK:
+            action()
+        self.latencies.append(time.perf_counter() - start)
+        if self.app.exception:
+            self.errors += 1
+
+    def open(self):
+        self._rerun(self.app.run)
+
+    def _section(self, key):
+        nav = self.app.radio(key="section_nav")
+        if nav.value != key:
+            self._rerun(lambda: nav.set_value(key).run())
+
+    def step(self):
+        keys = self.app.radio(key="section_nav").options
+        action = self.random.choice(("section", "section", "search", "interactions", "calculator"))
+        if action == "section":
+            self._section(self.random.choice(keys))
+        elif action == "search":
+            query = self.random.choice(SEARCHES)
+            self._rerun(lambda: self.app.text_input(key="search_query").input(query).run())
+        elif action == "interactions":
+            self._section("interactions")
+            picks = self.random.sample(MEDICATIONS, self.random.randint(1, 3))
+            self._rerun(lambda: self.app.multiselect(key="ddi_selected").set_value(picks).run())
+        else:
+            self._section("dose_calculator")
+            egfr = self.random.randint(10, 110)
+            self._rerun(lambda: self.app.number_input(key="calc_egfr").set_value(egfr).run())
+
+
+def run_level(users, actions, seed):
+    """Open ``users`` sessions and drive them concurrently; return the level report."""
+    sessions = [User(seed + n) for n in range(users)]
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+
+    def drive(user):
+        user.open()
+        for _ in range(actions):
+            user.step()
+
+    threads = [threading.Thread(target=drive, args=(user,)) for user in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_before
+    rss_after = rss_bytes()
+    latencies = [latency for user in sessions for latency in user.latencies]
+    return {
+        "users": users,
+        "reruns": len(latencies),
+        "errors": sum(user.errors for user in sessions),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "cpu_cores_used": round(cpu / wall, 2),
+        "latency_ms": {
+            "p50": round(1000 * percentile(latencies, 0.50), 1),
+            "p90": round(1000 * percentile(latencies, 0.90), 1),
+            "p95": round(1000 * percentile(latencies, 0.95), 1),
+            "p99": round(1000 * percentile(latencies, 0.99), 1),
+            "max": round(1000 * max(latencies), 1),
+            "mean": round(1000 * statistics.fmean(latencies), 1),
+        },
+        "rss_mb_per_session": round((rss_after - rss_before) / users / 2**20, 2),
+    }
+
+
+def max_sessions_per_core(levels, slo_p95_ms, think_time_s):
+    within = [level for level in levels if level["latency_ms"]["p95"] <= slo_p95_ms and not level["errors"]]
+    if not within:
+        return 0
+    best = max(within, key=lambda level: level["throughput_rps"] / max(level["cpu_cores_used"], 0.01))
+    return int(best["throughput_rps"] / max(best["cpu_cores_used"], 0.01) * think_time_s)
+
+
+# ==================== REPORTING ====================
+def environment():
+    import streamlit
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "cpu_count": os.cpu_count(),
+        "env": {name: value for name, value in os.environ.items() if name.startswith("ENTRESTO_")},
+    }
+
+
+def print_levels(levels):
+    print(f"{'users':>6} {'reruns':>7} {'rps':>8} {'cores':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'MB/session':>11} {'errors':>7}")
+    for level in levels:
+        latency = level["latency_ms"]
+        print(f"{level['users']:>6} {level['reruns']:>7} {level['throughput_rps']:>8.1f} "
+              f"{level['cpu_cores_used']:>6.2f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+              f"{latency['p99']:>8.1f} {level['rss_mb_per_session']:>11.2f} {level['errors']:>7}")
+
+
+def compare(current, previous_path):
+    previous = json.loads(Path(previous_path).read_text())
+    by_users = {level["users"]: level for level in previous["levels"]}
+    print(f"\nvs {previous_path} ({previous['environment'].get('commit') or 'unknown commit'}):")
+    for level in current["levels"]:
+        old = by_users.get(level["users"])
+        if old is None:
+            continue
+        p95 = level["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1
+        rps = level["throughput_rps"] / old["throughput_rps"] - 1
+        print(f"{level['users']:>6} users: p95 {p95:+.0%}, throughput {rps:+.0%}")
+    print(f"max sessions/core: {previous['max_sessions_per_core']} -> {current['max_sessions_per_core']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--actions", type=int, default=30, help="interactions per user after opening the page")
+    parser.add_argument("--think-time", type=float, default=10.0, help="seconds between a real user's reruns")
+    parser.add_argument("--slo-p95-ms", type=float, default=500.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="JSON results path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    # One throwaway session fills the process-wide caches, so every level
+    # measures steady-state reruns rather than the cold start.
+    warm_up = User(args.seed - 1)
+    warm_up.open()
+    warm_up.step()
+
+    levels = [run_level(users, args.actions, args.seed) for users in args.users]
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "parameters": {
+            "actions": args.actions, "think_time_s": args.think_time,
+            "slo_p95_ms": args.slo_p95_ms, "seed": args.seed,
+        },
+        "levels": levels,
+        "max_sessions_per_core": max_sessions_per_core(levels, args.slo_p95_ms, args.think_time),
+    }
+
+    print_levels(levels)
+    print(f"\nmax sessions per core (p95 <= {args.slo_p95_ms:.0f} ms, one rerun every "
+          f"{args.think_time:.0f} s per user): {results['max_sessions_per_core']}")
+
+    output = args.output or RESULTS_DIR / f"{results['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
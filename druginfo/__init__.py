@@ -0,0 +1,14 @@
+"""
+Shared building blocks for the ENTRESTO drug information app.
+
+The Streamlit entry point (``entresto_app.py``) stays a thin page script; the
+content and the logic behind it live in this package so that they are built
+once per process instead of on every rerun.
+"""
+
+from pathlib import Path
+
+# Streamlit serves this folder (next to entresto_app.py) at /app/static/ when
+# server.enableStaticServing is on.
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+STATIC_URL = "app/static"
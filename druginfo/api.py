@@ -0,0 +1,310 @@
+"""
+Headless JSON API over the monograph data.
+
+A small ASGI (Starlette) app for EHR integrations and mobile clients that
+need the data without the Streamlit UI. Every drug in ``monographs/`` is
+served under ``/api/v1/drugs/<slug>``; the unprefixed ``/api/v1`` paths are
+the default drug. A drug's read-only resources are serialized on first
+request from its monograph -- the same data the app renders -- and kept as
+pre-encoded (and pre-gzipped) bytes with a strong ETag, so a request is a
+dict lookup and a conditional request is a 304 with no body. The computed
+endpoints -- dose calculation, interaction checking and contraindication
+screening -- go through the same memoized engines as the Streamlit tools.
+
+Run with::
+
+    uvicorn druginfo.api:app --host 0.0.0.0 --port 8000
+"""
+
+import gzip
+import hashlib
+import json
+from dataclasses import asdict
+from functools import lru_cache
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+
+from druginfo import data, dosing, interactions, monographs, screening
+
+PREFIX = "/api/v1"
+CACHE_CONTROL = "public, max-age=3600"
+MIN_GZIP_BYTES = 512
+
+# Resource name -> the tables it bundles, grouped the way the app's tabs are.
+RESOURCES = {
+    "strengths": ("strengths", "info"),
+    "dosing": ("adult_dosing", "renal", "hepatic"),
+    "pharmacokinetics": ("pk", "elimination"),
+    "contraindications": ("contraindications",),
+    "adverse-effects": ("adverse", "severity", "special_pop_ae"),
+    "interactions": ("contraind_interactions", "monitor", "safe"),
+    "trials": ("paradigm_results", "safety", "trials", "trial_endpoints"),
+    "references": ("references",),
+}
+
+# The thresholds the dose calculator applies, published with the dosing tables
+# of the drug whose monograph uses the calculator.
+DOSING_RULES = {
+    "adult_ladder": dosing.ADULT_LADDER,
+    "pediatric_weight_cutoff_kg": dosing.PEDIATRIC_WEIGHT_CUTOFF_KG,
+    "pediatric_mg_per_kg_ladder": dosing.PEDIATRIC_MG_PER_KG_LADDER,
+    "titration_interval_weeks": dosing.TITRATION_INTERVAL_WEEKS,
+    "acei_washout_hours": dosing.ACEI_WASHOUT_HOURS,
+    "egfr_not_recommended": dosing.EGFR_NOT_RECOMMENDED,
+    "egfr_reduced_start": dosing.EGFR_REDUCED_START,
+    "egfr_closer_monitoring": dosing.EGFR_CLOSER_MONITORING,
+    "sbp_minimum": dosing.SBP_MINIMUM,
+    "low_dose_threshold_mg": dosing.LOW_DOSE_THRESHOLD_MG,
+}
+
+
+# ==================== PAYLOADS ====================
+class Payload:
+    """A JSON document encoded once, with its ETag and gzip variant."""
+
+    __slots__ = ("body", "gzipped", "etag")
+
+    def __init__(self, document):
+        self.body = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gzipped = gzip.compress(self.body, mtime=0) if len(self.body) >= MIN_GZIP_BYTES else None
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+
+
+def build_payloads(monograph, prefix=PREFIX):
+    """Encode every static resource of a drug; keys are request paths under ``prefix``."""
+    tables, version = monograph.tables, monograph.version
+    tools = {section.tool for section in monograph.sections}
+    payloads = {}
+    for name, table_names in RESOURCES.items():
+        present = [table for table in table_names if table in tables]
+        if not present:
+            continue
+        document = {
+            "version": version,
+            "tables": {table: data.records(tables[table]) for table in present},
+        }
+        if name == "dosing" and "dose_calculator" in tools:
+            document["rules"] = DOSING_RULES
+        payloads[f"{prefix}/{name}"] = Payload(document)
+    for table, columns in tables.items():
+        payloads[f"{prefix}/tables/{table}"] = Payload(
+            {"version": version, "table": table, "rows": data.records(columns)}
+        )
+    endpoints = [f"{prefix}/dose"] if "dose_calculator" in tools else []
+    if "interaction_checker" in tools:
+        endpoints.append(f"{prefix}/interactions/check")
+    if monograph.rules:
+        endpoints.append(f"{prefix}/screen")
+    payloads[prefix] = Payload({
+        "drug": monograph.slug,
+        "name": monograph.name,
+        "version": version,
+        "resources": [path for path in payloads if path.count("/") == prefix.count("/") + 1],
+        "tables": [f"{prefix}/tables/{table}" for table in tables],
+        "tools": endpoints,
+    })
+    return payloads
+
+
+@lru_cache(maxsize=monographs.CACHE_SIZE)
+def _payloads(monograph):
+    return build_payloads(monograph, f"{PREFIX}/drugs/{monograph.slug}")
+
+
+def payloads_for(slug):
+    """The encoded resources of one drug (``KeyError`` if unknown).
+
+    Cached per loaded monograph, so an edited file is re-encoded on the
+    first request after ``monographs.load`` has swapped it in.
+    """
+    return _payloads(monographs.load(slug))
+
+
+@lru_cache(maxsize=monographs.CACHE_SIZE)
+def _interaction_index(slug, tables_version):
+    return interactions.InteractionIndex(monographs.load(slug).tables)
+
+
+def interaction_index(slug):
+    """The drug's interaction index, rebuilt only when its interaction tables change."""
+    return _interaction_index(slug, monographs.load(slug).version_of(*interactions.TABLES))
+
+
+@lru_cache(maxsize=1)
+def _drug_list(slugs):
+    drugs = [{"drug": slug, "name": monographs.display_name(slug), "href": f"{PREFIX}/drugs/{slug}"}
+             for slug in slugs]
+    return Payload({"default": monographs.DEFAULT_DRUG, "drugs": drugs})
+
+
+def _not_modified(request, etag):
+    candidates = request.headers.get("if-none-match", "")
+    return candidates.strip() == "*" or etag in (tag.strip() for tag in candidates.split(","))
+
+
+def serve(request, payload):
+    headers = {"ETag": payload.etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if _not_modified(request, payload.etag):
+        return Response(status_code=304, headers=headers)
+    if payload.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.gzipped, media_type="application/json", headers=headers)
+    return Response(payload.body, media_type="application/json", headers=headers)
+
+
+def error(status_code, message):
+    return Response(json.dumps({"error": message}), status_code=status_code, media_type="application/json")
+
+
+# ==================== ENDPOINTS ====================
+def _drug(request):
+    """Slug of the drug a request targets; the unprefixed paths mean the default."""
+    return request.path_params.get("slug", monographs.DEFAULT_DRUG)
+
+
+def _tools(slug):
+    return {section.tool for section in monographs.load(slug).sections}
+
+
+async def drug_list(request):
+    return serve(request, _drug_list(tuple(monographs.available())))
+
+
+async def static_resource(request):
+    slug = _drug(request)
+    try:
+        payloads = payloads_for(slug)
+    except KeyError:
+        return error(404, f"unknown drug: {slug}")
+    rest = request.path_params.get("rest", "").strip("/")
+    payload = payloads.get(f"{PREFIX}/drugs/{slug}" + (f"/{rest}" if rest else ""))
+    if payload is None:
+        return error(404, f"unknown resource: {request.url.path}")
+    return serve(request, payload)
+
+
+@lru_cache(maxsize=1024)
+def _dose_payload(version, normalized):
+    plan = dosing.plan_for(normalized)
+    return Payload({"version": version, "plan": asdict(plan)})
+
+
+async def dose(request):
+    """``GET /api/v1/dose?weight_kg=70&egfr=45[&child_pugh=B&prior_agent=acei...]``"""
+    slug = _drug(request)
+    try:
+        if "dose_calculator" not in _tools(slug):
+            return error(404, f"no dose calculator for drug: {slug}")
+    except KeyError:
+        return error(404, f"unknown drug: {slug}")
+    params = request.query_params
+
+    def number(name, default=None):
+        value = params[name] if default is None else params.get(name, default)
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+    try:
+        normalized = dosing.normalize_inputs(
+            number("weight_kg"),
+            number("egfr"),
+            child_pugh=params.get("child_pugh"),
+            prior_agent=params.get("prior_agent", "none"),
+            prior_daily_dose_mg=number("prior_daily_dose_mg", 0),
+            sbp=number("sbp", 120),
+            pediatric=params.get("pediatric", "").lower() in ("1", "true", "yes"),
+        )
+    except KeyError as missing:
+        return error(400, f"missing query parameter: {missing.args[0]}")
+    except (ValueError, OverflowError) as invalid:
+        return error(400, str(invalid))
+    return serve(request, _dose_payload(monographs.load(slug).version, normalized))
+
+
+@lru_cache(maxsize=1024)
+def _interaction_payload(slug, version, medications):
+    index = interaction_index(slug)
+    matches, unknown, suggestions = index.check(medications)
+    return Payload({
+        "version": version,
+        "matches": [{"query": m.query, "matched": index.display_names[m.term], **asdict(m.interaction)}
+                    for m in matches],
+        "unknown": unknown,
+        "did_you_mean": [{"query": s.query, "suggestion": index.display_names[s.term], "score": round(s.score, 3)}
+                         for s in suggestions],
+    })
+
+
+async def interaction_check(request):
+    """``GET /api/v1/interactions/check?drug=lisinopril&drug=spironolactone``"""
+    slug = _drug(request)
+    try:
+        if "interaction_checker" not in _tools(slug):
+            return error(404, f"no interaction checker for drug: {slug}")
+    except KeyError:
+        return error(404, f"unknown drug: {slug}")
+    medications = tuple(drug.strip() for drug in request.query_params.getlist("drug") if drug.strip())
+    if not medications:
+        return error(400, "pass one or more ?drug= parameters")
+    return serve(request, _interaction_payload(slug, monographs.load(slug).version, medications))
+
+
+@lru_cache(maxsize=1024)
+def _screen_payload(slug, version, record):
+    findings, unevaluated = monographs.load(slug).rules.screen(dict(record))
+    return Payload({
+        "version": version,
+        "findings": [{"rule": f.rule.id, "action": f.rule.action, "title": f.rule.title,
+                      "evidence": dict(f.evidence), "citations": [asdict(c) for c in f.rule.citations]}
+                     for f in findings],
+        "unevaluated": unevaluated,
+    })
+
+
+async def screen(request):
+    """``GET /api/v1/screen?egfr=12&child_pugh=C&hours_since_acei=20[&pregnant=yes...]``"""
+    slug = _drug(request)
+    try:
+        monograph = monographs.load(slug)
+    except KeyError:
+        return error(404, f"unknown drug: {slug}")
+    if not monograph.rules:
+        return error(404, f"no screening rules for drug: {slug}")
+    params = request.query_params
+    unknown = sorted(set(params) - set(monograph.rules.kinds))
+    if unknown:
+        return error(400, f"unknown field(s): {', '.join(unknown)}; expected {', '.join(monograph.rules.kinds)}")
+    for field in params:
+        try:
+            screening.parse(monograph.rules.kinds[field], params[field])
+        except ValueError as invalid:
+            return error(400, f"{field}: {invalid}")
+    record = tuple(sorted((field, params[field].strip().lower()) for field in params))
+    return serve(request, _screen_payload(slug, monograph.version, record))
+
+
+routes = [
+    Route(f"{PREFIX}/drugs", drug_list, methods=["GET"]),
+    Route(f"{PREFIX}/drugs/{{slug}}/dose", dose, methods=["GET"]),
+    Route(f"{PREFIX}/drugs/{{slug}}/interactions/check", interaction_check, methods=["GET"]),
+    Route(f"{PREFIX}/drugs/{{slug}}/screen", screen, methods=["GET"]),
+    Route(f"{PREFIX}/drugs/{{slug}}", static_resource, methods=["GET"]),
+    Route(f"{PREFIX}/drugs/{{slug}}/{{rest:path}}", static_resource, methods=["GET"]),
+    Route(f"{PREFIX}/dose", dose, methods=["GET"]),
+    Route(f"{PREFIX}/interactions/check", interaction_check, methods=["GET"]),
+    Route(f"{PREFIX}/screen", screen, methods=["GET"]),
+    Route(PREFIX, static_resource, methods=["GET"]),
+    Route(f"{PREFIX}/{{rest:path}}", static_resource, methods=["GET"]),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["GET"],
+                           expose_headers=["ETag"])],
+)
@@ -0,0 +1,224 @@
+"""
+Columnar Arrow bundle of the monograph tables.
+
+A build step compiles each drug's tables into uncompressed Arrow IPC
+(Feather v2) files, one per table and table version, under
+``bundles/<slug>/<table>-<version>.arrow``::
+
+    python -m druginfo.bundle            # every drug in monographs/
+    python -m druginfo.bundle entresto
+
+``load`` memory-maps one of those files read-only. A table's buffers are the
+mapped file pages themselves: they take no heap, the page cache shares them
+between every worker process on the host, and ``st.dataframe`` receives the
+``pyarrow.Table`` as is, with no pandas conversion. Compression would force a
+decoded copy per process, so the files are written uncompressed.
+
+Next to the tables, ``monograph-<version>.json`` holds the rest of that
+version of the data file plus every table's version. ``monographs.load``
+builds a bundled version from it (``load_monograph``) without parsing the
+file: each table is ``Columns``, a read-only view over the mapped table, so
+no worker keeps a heap copy of the column lists. A table whose Arrow form
+does not read back as the same lists (a column mixing numbers and text is
+stored as text) stays inline in the manifest.
+``python -m druginfo.cluster`` builds the bundle before it starts the
+workers; other deployments run ``python -m druginfo.bundle`` as a build step.
+Files are created world-readable (0644), so workers running as other users
+can map them.
+
+Files are named by their table's content hash and never rewritten in place:
+after an edit to the monograph, a rebuild writes only the tables that
+changed (each renamed into place once complete) and removes the others'
+superseded files. Unlinking a file does not unmap it, so workers still
+serving the previous version are unaffected until they reload.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+
+from druginfo import metrics, monographs
+
+BUNDLE_DIR = Path(os.environ.get(
+    "ENTRESTO_BUNDLE_DIR", Path(__file__).resolve().parent.parent / "bundles"
+))
+SUFFIX = ".arrow"
+MANIFEST_PREFIX = "monograph-"
+
+
+def bundle_path(slug, bundle_dir=None):
+    return Path(bundle_dir or BUNDLE_DIR) / slug
+
+
+def table_path(slug, name, version, bundle_dir=None):
+    return bundle_path(slug, bundle_dir) / f"{name}-{version}{SUFFIX}"
+
+
+def _column(values):
+    import pyarrow as pa
+
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # A column mixing numbers and text is shown as text, as the app does.
+        return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+
+def to_arrow(columns):
+    """Convert one table's column lists to a ``pyarrow.Table``."""
+    import pyarrow as pa
+
+    return pa.table({name: _column(values) for name, values in columns.items()})
+
+
+def _write(target, suffix, write):
+    """Write ``target`` through a staging file renamed into place once complete."""
+    descriptor, staging = tempfile.mkstemp(prefix=".build-", suffix=suffix, dir=target.parent)
+    os.close(descriptor)
+    try:
+        write(staging)
+        # mkstemp creates the file 0600; other workers or users must be able to map it.
+        os.chmod(staging, 0o644)
+        # Atomic on POSIX; a concurrent build of the same file writes identical bytes.
+        os.replace(staging, target)
+    finally:
+        if os.path.exists(staging):
+            os.unlink(staging)
+
+
+def _write_table(table):
+    import pyarrow as pa
+
+    def write(staging):
+        with pa.OSFile(staging, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return write
+
+
+def build(monograph, bundle_dir=None):
+    """Write the tables of ``monograph`` that have no file yet, and its manifest; return the drug's directory.
+
+    The manifest is only written when the drug's data file still holds this
+    version. Files of other versions are removed.
+    """
+    directory = bundle_path(monograph.slug, bundle_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    current = set()
+    for name, columns in monograph.tables.items():
+        target = table_path(monograph.slug, name, monograph.table_versions[name], bundle_dir)
+        current.add(target.name)
+        if not target.is_file():
+            _write(target, SUFFIX, _write_table(to_arrow(columns)))
+
+    manifest = directory / f"{MANIFEST_PREFIX}{monograph.version}.json"
+    current.add(manifest.name)
+    raw = monographs.path_for(monograph.slug).read_bytes()
+    if not manifest.is_file() and hashlib.sha256(raw).hexdigest()[:12] == monograph.version:
+        document = json.loads(raw)
+        document["tables"] = {
+            name: columns for name, columns in document.get("tables", {}).items()
+            if load(monograph.slug, name, monograph.table_versions[name], bundle_dir).to_pydict() != columns
+        }
+        document["table_versions"] = dict(monograph.table_versions)
+        body = json.dumps(document, ensure_ascii=False).encode("utf-8")
+        _write(manifest, ".json", lambda staging: Path(staging).write_bytes(body))
+
+    for other in directory.iterdir():
+        if other.name not in current and not other.name.startswith("."):
+            if other.is_dir():
+                shutil.rmtree(other, ignore_errors=True)
+            else:
+                other.unlink(missing_ok=True)
+    return directory
+
+
+def load(slug, name, version, bundle_dir=None):
+    """Memory-map one table of a drug's bundle.
+
+    Returns a ``pyarrow.Table``, or ``None`` when no file was built for this
+    version of the table (the caller falls back to a DataFrame built from the
+    monograph).
+    """
+    path = table_path(slug, name, version, bundle_dir)
+    if not path.is_file():
+        return None
+    import pyarrow as pa
+
+    try:
+        source = pa.memory_map(str(path))
+    except FileNotFoundError:  # pruned by a rebuild since the check
+        return None
+    # The table keeps the mapping alive after the file handle is closed.
+    with source:
+        table = pa.ipc.open_file(source).read_all()
+    metrics.REGISTRY.count_table()
+    return table
+
+
+# ==================== COLUMN VIEWS ====================
+class Columns(Mapping):
+    """Read-only column lists of one table, decoded from its mapped Arrow file.
+
+    Stands in for a table's parsed lists in ``Monograph.tables``. Each access
+    decodes the column again, so nothing outlives the caller's use of it;
+    ``table`` is the mapped ``pyarrow.Table`` itself.
+    """
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, name):
+        if name not in self.table.column_names:
+            raise KeyError(name)
+        return self.table.column(name).to_pylist()
+
+    def __iter__(self):
+        return iter(self.table.column_names)
+
+    def __len__(self):
+        return self.table.num_columns
+
+
+def load_monograph(slug, version, bundle_dir=None):
+    """Build ``version`` of a drug from its bundle, or ``None`` when it was not built.
+
+    Reads the manifest (the data file without its tables) and maps every
+    table, so the tables are ``Columns`` views and no column list is parsed.
+    """
+    path = bundle_path(slug, bundle_dir) / f"{MANIFEST_PREFIX}{version}.json"
+    try:
+        document = json.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    table_versions = document.pop("table_versions")
+    inline = document.get("tables", {})
+    tables = {}
+    for name, table_version in table_versions.items():
+        if name in inline:
+            tables[name] = inline[name]
+            continue
+        table = load(slug, name, table_version, bundle_dir)
+        if table is None:  # pruned by a rebuild since the manifest was read
+            return None
+        tables[name] = Columns(table)
+    document["tables"] = tables
+    return monographs.from_document(document, slug, version, table_versions)
+
+
+def main(slugs):
+    for slug in slugs or monographs.available():
+        monograph = monographs.load(slug)
+        directory = build(monograph)
+        size = sum(path.stat().st_size for path in directory.glob(f"*{SUFFIX}"))
+        print(f"{slug:<20} {len(monograph.tables):>3} tables {size:>10} bytes  {directory}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,195 @@
+"""
+Run several app workers behind the bundled reverse proxy.
+
+One ``streamlit run`` process serves every session with one interpreter, so
+one core. This starts ``--workers`` of them on consecutive local ports and
+nginx in front with ``deploy/nginx.conf`` (sticky sessions by cookie)::
+
+    python -m druginfo.cluster --workers 4 --port 8501
+    python -m druginfo.cluster --workers 4 --config-only > nginx.conf
+
+The workers share what can be shared: the monograph files and the Arrow
+bundle on disk (built here before any worker starts, so each maps it), one
+``server.cookieSecret`` (so a session that fails over to another worker
+keeps working uploads) and the session store of ``state.py``
+(``ENTRESTO_STATE_DIR``, by default ``.session_state/`` in the repo). A worker
+that exits is restarted; its sessions reconnect through the proxy to another
+worker and resume from the store. With ``ENTRESTO_METRICS=1`` worker ``n``
+serves ``/metrics`` on ``ENTRESTO_METRICS_PORT + n``.
+
+The proxy also serves the static export, written to the runtime directory at
+start, at ``/offline/``: an installable copy of the monograph that keeps
+working without a network (``export.py``). The app footer links to it.
+
+With one worker (the default, or ``ENTRESTO_WORKERS``) it simply execs
+``streamlit run`` on ``--port``, as the Procfile did before. So does a
+larger ``--workers`` when the proxy binary is not installed (e.g. on
+Heroku), with a warning, rather than failing to boot.
+"""
+
+import argparse
+import os
+import secrets
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from druginfo import bundle, export, metrics, monographs, state
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "entresto_app.py"
+TEMPLATE = ROOT / "deploy" / "nginx.conf"
+DEFAULT_STATE_DIR = ROOT / ".session_state"
+OFFLINE_URL = "/offline/"
+BASE_PORT = 8601
+RESTART_DELAY = 1.0
+PRUNE_SECONDS = 3600
+STOP_TIMEOUT = 10
+
+
+def worker_command(port, address="127.0.0.1"):
+    return [sys.executable, "-m", "streamlit", "run", str(APP),
+            f"--server.port={port}", f"--server.address={address}", "--server.headless=true"]
+
+
+def worker_environment(index, state_dir, cookie_secret):
+    # Streamlit only takes the cookie secret from its config or the environment.
+    environment = dict(os.environ, ENTRESTO_STATE_DIR=str(state_dir), STREAMLIT_SERVER_COOKIE_SECRET=cookie_secret)
+    environment.setdefault("ENTRESTO_OFFLINE_URL", OFFLINE_URL)
+    if environment.get("ENTRESTO_METRICS") == "1":
+        base = int(environment.get("ENTRESTO_METRICS_PORT", metrics.DEFAULT_PORT))
+        environment["ENTRESTO_METRICS_PORT"] = str(base + index)
+    return environment
+
+
+def render_config(ports, listen, runtime):
+    """``deploy/nginx.conf`` with the worker list, listen address and runtime directory filled in.
+
+    The offline copy is expected in ``<runtime>/offline``.
+    """
+    servers = "\n".join(f"        server 127.0.0.1:{port} max_fails=1 fail_timeout=5s;" for port in ports)
+    return (TEMPLATE.read_text(encoding="utf-8")
+            .replace("{{servers}}", servers)
+            .replace("{{listen}}", str(listen))
+            .replace("{{offline}}", str(Path(runtime) / "offline"))
+            .replace("{{runtime}}", str(runtime)))
+
+
+def build_bundles():
+    """Build the Arrow bundle of every drug (``bundle.py``), so the workers map their tables.
+
+    The release step of every deployment that goes through this launcher,
+    the Procfile included; a build that fails leaves the workers on the
+    parsed tables.
+    """
+    for slug in monographs.available():
+        try:
+            bundle.build(monographs.load(slug))
+        except (OSError, ValueError) as failed:
+            print(f"bundle for {slug} not built: {failed}", file=sys.stderr, flush=True)
+
+
+# ==================== SUPERVISOR ====================
+class Cluster:
+    def __init__(self, workers, port, base_port, proxy, state_dir):
+        self.ports = [base_port + n for n in range(workers)]
+        self.port = port
+        self.proxy_binary = proxy
+        self.state_dir = state_dir
+        self.cookie_secret = secrets.token_hex(32)
+        self.runtime = Path(tempfile.mkdtemp(prefix="entresto-cluster-"))
+        self.workers = {}
+        self.proxy = None
+        self.stopping = False
+
+    def _start_worker(self, index):
+        port = self.ports[index]
+        self.workers[index] = subprocess.Popen(
+            worker_command(port),
+            env=worker_environment(index, self.state_dir, self.cookie_secret), cwd=ROOT,
+        )
+        print(f"worker {index} on 127.0.0.1:{port} (pid {self.workers[index].pid})", flush=True)
+
+    def _start_proxy(self):
+        # Tool sections of the offline copy link back to the live app behind the same proxy.
+        export.export(self.runtime / "offline", app_url="/")
+        config = self.runtime / "nginx.conf"
+        config.write_text(render_config(self.ports, self.port, self.runtime), encoding="utf-8")
+        self.proxy = subprocess.Popen([self.proxy_binary, "-p", str(self.runtime), "-c", str(config),
+                                       "-g", "daemon off;"])
+        print(f"proxy on :{self.port} -> {len(self.ports)} workers (config {config})", flush=True)
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        store = state.FileStore(self.state_dir)
+        for index in range(len(self.ports)):
+            self._start_worker(index)
+        self._start_proxy()
+        pruned_at = 0.0
+        try:
+            while not self.stopping:
+                if self.proxy.poll() is not None:
+                    print(f"proxy exited with {self.proxy.returncode}; stopping", flush=True)
+                    return self.proxy.returncode or 1
+                for index, worker in list(self.workers.items()):
+                    if worker.poll() is not None:
+                        print(f"worker {index} exited with {worker.returncode}; restarting", flush=True)
+                        time.sleep(RESTART_DELAY)
+                        self._start_worker(index)
+                if time.monotonic() - pruned_at > PRUNE_SECONDS:
+                    store.prune()
+                    pruned_at = time.monotonic()
+                time.sleep(0.5)
+            return 0
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        processes = [process for process in (self.proxy, *self.workers.values()) if process is not None]
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for process in processes:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(self.runtime, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run several app workers behind the bundled reverse proxy.")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("ENTRESTO_WORKERS", 1)))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8501)), help="public port")
+    parser.add_argument("--base-port", type=int, default=BASE_PORT, help="port of the first worker")
+    parser.add_argument("--proxy", default="nginx", help="nginx binary")
+    parser.add_argument("--config-only", action="store_true", help="print the proxy config and exit")
+    args = parser.parse_args(argv)
+
+    if args.config_only:
+        sys.stdout.write(render_config([args.base_port + n for n in range(args.workers)], args.port,
+                                       Path(tempfile.gettempdir()) / "entresto-nginx"))
+        return 0
+    build_bundles()
+    if args.workers > 1 and shutil.which(args.proxy) is None:
+        print(f"{args.proxy} not found, running one worker: install nginx, or write the config with "
+              "--config-only and point another proxy at the workers", file=sys.stderr, flush=True)
+        args.workers = 1
+    if args.workers <= 1:
+        command = worker_command(args.port, address="0.0.0.0")
+        os.execv(command[0], command)
+    state_dir = Path(state.STATE_DIR or DEFAULT_STATE_DIR)
+    return Cluster(args.workers, args.port, args.base_port, args.proxy, state_dir).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Helpers for the monograph tables.
+
+Tables are stored in the drug data files as plain column lists (``{"column":
+[values...]}``) so monographs load without pandas; these helpers turn them
+into the shapes other consumers need.
+"""
+
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from druginfo import metrics
+
+
+def records(columns):
+    """Turn a column-dict table into a list of row dicts (for JSON consumers)."""
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def build_frame(columns):
+    """Build the pandas DataFrame of one column-dict table (counted in ``metrics``)."""
+    import pandas as pd
+
+    metrics.REGISTRY.count_table()
+    return pd.DataFrame(dict(columns))
+
+
+def build_frames(tables):
+    """Build one pandas DataFrame per table.
+
+    This is the expensive step the app caches and shares between sessions, so
+    the frames must be treated as read-only by every caller.
+    """
+    return MappingProxyType({name: build_frame(columns) for name, columns in tables.items()})
+
+
+class LazyTables(Mapping):
+    """Read-only table mapping that fetches each table on first access.
+
+    ``load(name)`` is typically a per-table cache lookup, so a rerun only
+    touches the tables of the section it draws, and a table whose content
+    changed is rebuilt without invalidating the others.
+    """
+
+    def __init__(self, names, load):
+        self._names = tuple(names)
+        self._load = load
+        self._fetched = {}
+
+    def __getitem__(self, name):
+        if name not in self._fetched:
+            if name not in self._names:
+                raise KeyError(name)
+            self._fetched[name] = self._load(name)
+        return self._fetched[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
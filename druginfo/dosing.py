@@ -0,0 +1,370 @@
+"""
+Dose calculation engine behind the Dose Calculator section.
+
+Pure Python, no Streamlit: the same rules the Dosage tab states in prose are
+encoded here once. ``calculate_dose`` normalizes its inputs before a memoized
+core, so the many near-identical calls a clinician makes while trying "what
+if" values are answered from cache. Every clinical threshold is compared
+against the raw value first: the cache key carries which side of each
+threshold the patient is on, and rounding only narrows the key (eGFR 14.6 is
+below 15 whatever it would round to).
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+# ==================== RULE CONSTANTS ====================
+# Adult ladder from the Dosage tab: double every 2-4 weeks up to the target.
+ADULT_LADDER = ("24/26 mg BID", "49/51 mg BID", "97/103 mg BID")
+STANDARD_START = 1
+REDUCED_START = 0
+
+# Pediatric (≥1 year) weight-based dosing; <40 kg uses mg/kg steps
+# (intermediate 2.3 mg/kg step per FDA label Table 1).
+PEDIATRIC_WEIGHT_CUTOFF_KG = 40
+PEDIATRIC_MG_PER_KG_LADDER = (1.6, 2.3, 3.1)
+
+TITRATION_INTERVAL_WEEKS = 2
+PEDIATRIC_TITRATION_INTERVAL_WEEKS = 2
+
+ACEI_WASHOUT_HOURS = 36
+
+EGFR_NOT_RECOMMENDED = 15
+EGFR_REDUCED_START = 30
+EGFR_CLOSER_MONITORING = 60
+# eGFR band of a patient: how many of these it is at or above, so
+# 0 = <15, 1 = 15-29, 2 = 30-59, 3 = ≥60.
+EGFR_BANDS = (EGFR_NOT_RECOMMENDED, EGFR_REDUCED_START, EGFR_CLOSER_MONITORING)
+SBP_MINIMUM = 100
+
+# The mg/kg ladder has no reduced start encoded here; say so when an adult
+# would have started low.
+PEDIATRIC_ADJUSTMENTS_NOTE = (
+    "Pediatric <40 kg: renal, hepatic, prior-therapy and blood-pressure starting-dose adjustments were "
+    "not evaluated for weight-based dosing; check the prescribing information before starting"
+)
+
+# Prior therapy at or below these daily doses counts as "low dose" and gets
+# the reduced starting dose (enalapril 10 mg/day, valsartan 160 mg/day).
+LOW_DOSE_THRESHOLD_MG = {"acei": 10, "arb": 160}
+PRIOR_AGENTS = ("none", "acei", "arb")
+CHILD_PUGH_CLASSES = ("A", "B", "C")
+# Spellings of "yes" accepted in the ``pediatric`` column of a patient list.
+TRUE_VALUES = ("true", "1", "yes", "y")
+# Accepted (inclusive) ranges of the numeric inputs, the calculator widgets'
+# limits. Shared by the single-patient and bulk paths; NaN and inf fall outside.
+INPUT_RANGES = {
+    "weight_kg": (1.0, 300.0),
+    "egfr": (0, 200),
+    "sbp": (50, 250),
+    "prior_daily_dose_mg": (0.0, 640.0),
+}
+
+
+@dataclass(frozen=True)
+class TitrationStep:
+    week: int
+    dose: str
+
+
+@dataclass(frozen=True)
+class DosePlan:
+    recommended: bool
+    starting_dose: str
+    target_dose: str
+    schedule: tuple
+    washout_hours: int
+    monitoring: tuple
+    notes: tuple
+
+
+# ==================== PUBLIC API ====================
+def normalize_inputs(weight_kg, egfr, child_pugh=None, prior_agent="none", prior_daily_dose_mg=0,
+                     sbp=120, pediatric=False):
+    """Return the canonical, hashable form of a calculator request: the key of
+    the memoized core (``plan_for``).
+
+    Thresholds are applied to the raw numbers here; the key keeps the side of
+    each threshold (eGFR band, weight-based dosing, low SBP, low-dose prior
+    therapy) and the weight rounded to 0.1 kg, which only the mg/kg dose text
+    uses. Raises ``ValueError`` for values the rules cannot interpret,
+    including non-finite numbers and numbers outside ``INPUT_RANGES``.
+    """
+    for name, value in (("weight_kg", weight_kg), ("egfr", egfr), ("sbp", sbp),
+                        ("prior_daily_dose_mg", prior_daily_dose_mg or 0)):
+        low, high = INPUT_RANGES[name]
+        if not low <= float(value) <= high:
+            raise ValueError(f"{name} must be a number from {low} to {high}")
+
+    child_pugh = (child_pugh or "").strip().upper() or None
+    if child_pugh is not None and child_pugh not in CHILD_PUGH_CLASSES:
+        raise ValueError(f"child_pugh must be one of {CHILD_PUGH_CLASSES} or None")
+
+    prior_agent = (prior_agent or "none").strip().lower()
+    if prior_agent not in PRIOR_AGENTS:
+        raise ValueError(f"prior_agent must be one of {PRIOR_AGENTS}")
+
+    pediatric = bool(pediatric)
+    weight_kg, egfr, sbp = float(weight_kg), float(egfr), float(sbp)
+    weight_based = pediatric and weight_kg < PEDIATRIC_WEIGHT_CUTOFF_KG
+    return (
+        round(weight_kg, 1) if weight_based else None,
+        sum(egfr >= threshold for threshold in EGFR_BANDS),
+        child_pugh,
+        prior_agent,
+        prior_agent != "none" and float(prior_daily_dose_mg or 0) <= LOW_DOSE_THRESHOLD_MG[prior_agent],
+        sbp < SBP_MINIMUM,
+        pediatric,
+        weight_based,
+    )
+
+
+def calculate_dose(weight_kg, egfr, child_pugh=None, prior_agent="none", prior_daily_dose_mg=0,
+                   sbp=120, pediatric=False):
+    """Return the ``DosePlan`` for one patient.
+
+    ``prior_agent`` is ``"none"``, ``"acei"`` or ``"arb"``; ``prior_daily_dose_mg``
+    is its total daily dose as enalapril (ACEi) or valsartan (ARB) equivalent.
+    """
+    return plan_for(normalize_inputs(weight_kg, egfr, child_pugh, prior_agent,
+                                     prior_daily_dose_mg, sbp, pediatric))
+
+
+def plan_for(key):
+    """Return the ``DosePlan`` of a ``normalize_inputs`` key (memoized)."""
+    return _calculate(*key)
+
+
+def cache_info():
+    """Expose hit/miss counters of the memoized core."""
+    return _calculate.cache_info()
+
+
+# ==================== RULES ====================
+def _mg_per_kg_dose(mg_per_kg, weight_kg):
+    return f"{mg_per_kg} mg/kg BID ({mg_per_kg * weight_kg:.0f} mg sacubitril/valsartan BID)"
+
+
+def _monitoring(egfr_band, prior_agent):
+    plan = [
+        "Baseline BP, K+, serum creatinine/eGFR",
+        "Recheck BP, K+ and creatinine 1-2 weeks after starting and after each dose increase",
+    ]
+    if egfr_band < 3:
+        plan.append("eGFR <60: more frequent K+ and SCr/eGFR checks")
+    if prior_agent == "acei":
+        plan.append("Watch for angioedema (face, lips, tongue, throat), especially in the first month")
+    return tuple(plan)
+
+
+@lru_cache(maxsize=4096)
+def _calculate(weight_kg, egfr_band, child_pugh, prior_agent, low_prior, low_sbp, pediatric, weight_based):
+    washout = ACEI_WASHOUT_HOURS if prior_agent == "acei" else 0
+    monitoring = _monitoring(egfr_band, prior_agent)
+    renal_reduced = egfr_band == 1
+
+    blockers = []
+    if egfr_band == 0:
+        blockers.append("eGFR <15 or dialysis: not recommended")
+    if child_pugh == "C":
+        blockers.append("Severe hepatic impairment (Child-Pugh C): not recommended")
+    if blockers:
+        return DosePlan(False, "Not recommended", "Not recommended", (), washout, monitoring, tuple(blockers))
+
+    notes = []
+    if washout:
+        notes.append(f"Stop the ACE inhibitor at least {ACEI_WASHOUT_HOURS} hours before the first dose")
+
+    if weight_based:
+        ladder = tuple(_mg_per_kg_dose(step, weight_kg) for step in PEDIATRIC_MG_PER_KG_LADDER)
+        schedule = tuple(
+            TitrationStep(i * PEDIATRIC_TITRATION_INTERVAL_WEEKS, dose) for i, dose in enumerate(ladder)
+        )
+        notes.append("Pediatric <40 kg: weight-based dosing, adjust every 2 weeks as tolerated")
+        if renal_reduced or child_pugh == "B" or prior_agent == "none" or low_prior or low_sbp:
+            notes.append(PEDIATRIC_ADJUSTMENTS_NOTE)
+        return DosePlan(True, ladder[0], ladder[-1], schedule, washout, monitoring, tuple(notes))
+
+    start = STANDARD_START
+    if renal_reduced:
+        start = REDUCED_START
+        notes.append("eGFR 15-29: start at 24/26 mg BID (AUC increases ~2-fold)")
+    if child_pugh == "B":
+        start = REDUCED_START
+        notes.append("Moderate hepatic impairment (Child-Pugh B): start at 24/26 mg BID")
+    if prior_agent == "none":
+        start = REDUCED_START
+        notes.append("Not on an ACE inhibitor/ARB: start at 24/26 mg BID")
+    elif low_prior:
+        start = REDUCED_START
+        notes.append("Low-dose prior ACE inhibitor/ARB: start at 24/26 mg BID")
+    if low_sbp:
+        start = REDUCED_START
+        notes.append("Systolic BP <100 mmHg: start low, correct volume depletion, titrate only if BP allows")
+    if pediatric:
+        notes.append("Pediatric ≥40 kg: adjust every 2 weeks as tolerated")
+
+    ladder = ADULT_LADDER[start:]
+    interval = PEDIATRIC_TITRATION_INTERVAL_WEEKS if pediatric else TITRATION_INTERVAL_WEEKS
+    schedule = tuple(TitrationStep(i * interval, dose) for i, dose in enumerate(ladder))
+    return DosePlan(True, ladder[0], ladder[-1], schedule, washout, monitoring, tuple(notes))
+
+
+# ==================== BULK EVALUATION ====================
+REQUIRED_COLUMNS = ("weight_kg", "egfr")
+OPTIONAL_COLUMNS = {
+    "child_pugh": None,
+    "prior_agent": "none",
+    "prior_daily_dose_mg": 0.0,
+    "sbp": 120,
+    "pediatric": False,
+}
+
+
+_INVALID_KEY = -2
+_NOT_RECOMMENDED_KEY = -1
+_MG_KEY_OFFSET = 1000
+
+
+def _decode(keys, render):
+    """Turn integer keys into a categorical column, rendering each distinct key once."""
+    import numpy as np
+    import pandas as pd
+
+    distinct, inverse = np.unique(keys, return_inverse=True)
+    return pd.Categorical.from_codes(inverse.reshape(-1), [render(int(key)) for key in distinct])
+
+
+def calculate_doses(frame):
+    """Evaluate the dosing rules for every row of a patient DataFrame.
+
+    Same rules and inputs as ``calculate_dose`` (columns named after its
+    arguments; only ``weight_kg`` and ``egfr`` are required), evaluated as
+    whole-column NumPy operations. Returns a new frame with the input columns
+    followed by ``status``, ``starting_dose``, ``target_dose``,
+    ``weeks_to_target``, ``washout_hours`` and ``notes`` (text columns are
+    categorical). Rows the rules cannot interpret get status
+    ``"invalid input"`` instead of failing the batch.
+    """
+    import numpy as np
+    import pandas as pd
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"missing required column(s): {', '.join(missing)}")
+
+    n = len(frame)
+
+    def column(name):
+        if name in frame.columns:
+            return frame[name]
+        return pd.Series([OPTIONAL_COLUMNS[name]] * n, index=frame.index, dtype=object)
+
+    def number(name, values):
+        """``(values, out of range)`` as floats, unrounded: thresholds apply to the raw values."""
+        values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+        low, high = INPUT_RANGES[name]
+        with np.errstate(invalid="ignore"):
+            return values, ~((values >= low) & (values <= high))
+
+    weight, weight_invalid = number("weight_kg", frame["weight_kg"])
+    egfr, egfr_invalid = number("egfr", frame["egfr"])
+    sbp, sbp_invalid = number("sbp", column("sbp"))
+    child_pugh = column("child_pugh").fillna("").astype(str).str.strip().str.upper().to_numpy()
+    prior = column("prior_agent").fillna("none").astype(str).str.strip().str.lower().replace("", "none").to_numpy()
+    prior_dose, prior_dose_invalid = number("prior_daily_dose_mg",
+                                            pd.to_numeric(column("prior_daily_dose_mg"), errors="coerce").fillna(0))
+    pediatric = column("pediatric").fillna(False).astype(str).str.strip().str.lower().isin(TRUE_VALUES).to_numpy()
+
+    invalid = (
+        weight_invalid | egfr_invalid | sbp_invalid | prior_dose_invalid
+        | ~np.isin(child_pugh, ("",) + CHILD_PUGH_CLASSES)
+        | ~np.isin(prior, PRIOR_AGENTS)
+    )
+
+    not_recommended = ~invalid & ((egfr < EGFR_NOT_RECOMMENDED) | (child_pugh == "C"))
+    active = ~invalid & ~not_recommended
+    mg_per_kg = active & pediatric & (weight < PEDIATRIC_WEIGHT_CUTOFF_KG)
+    fixed = active & ~mg_per_kg
+
+    renal_reduced = (egfr >= EGFR_NOT_RECOMMENDED) & (egfr < EGFR_REDUCED_START)
+    hepatic_reduced = child_pugh == "B"
+    no_prior = prior == "none"
+    low_prior = ((prior == "acei") & (prior_dose <= LOW_DOSE_THRESHOLD_MG["acei"])) | (
+        (prior == "arb") & (prior_dose <= LOW_DOSE_THRESHOLD_MG["arb"]))
+    low_sbp = sbp < SBP_MINIMUM
+    reduced = renal_reduced | hepatic_reduced | no_prior | low_prior | low_sbp
+    # The mg/kg dose text uses the weight to 0.1 kg, as in the single-patient key.
+    display_weight = weight.round(1)
+
+    # Doses are encoded as integer keys (ladder index, or mg for weight-based
+    # rows) and turned into text once per distinct key.
+    def dose_keys(ladder_index, step):
+        keys = np.full(n, ladder_index, dtype=np.int64)
+        keys[mg_per_kg] = _MG_KEY_OFFSET + np.round(display_weight[mg_per_kg] * step).astype(np.int64)
+        keys[not_recommended] = _NOT_RECOMMENDED_KEY
+        keys[invalid] = _INVALID_KEY
+        return keys
+
+    def dose_text(step):
+        def render(key):
+            if key == _INVALID_KEY:
+                return ""
+            if key == _NOT_RECOMMENDED_KEY:
+                return "Not recommended"
+            if key >= _MG_KEY_OFFSET:
+                return f"{step} mg/kg BID ({key - _MG_KEY_OFFSET} mg sacubitril/valsartan BID)"
+            return ADULT_LADDER[key]
+        return render
+
+    starting = _decode(
+        dose_keys(np.where(reduced, REDUCED_START, STANDARD_START), PEDIATRIC_MG_PER_KG_LADDER[0]),
+        dose_text(PEDIATRIC_MG_PER_KG_LADDER[0]),
+    )
+    target = _decode(
+        dose_keys(len(ADULT_LADDER) - 1, PEDIATRIC_MG_PER_KG_LADDER[-1]),
+        dose_text(PEDIATRIC_MG_PER_KG_LADDER[-1]),
+    )
+    steps = np.where(mg_per_kg, len(PEDIATRIC_MG_PER_KG_LADDER) - 1,
+                     np.where(reduced, len(ADULT_LADDER) - 1 - REDUCED_START, len(ADULT_LADDER) - 1 - STANDARD_START))
+    interval = np.where(pediatric, PEDIATRIC_TITRATION_INTERVAL_WEEKS, TITRATION_INTERVAL_WEEKS)
+    weeks_to_target = np.where(active, steps * interval, 0)
+    washout = np.where(~invalid & (prior == "acei"), ACEI_WASHOUT_HOURS, 0)
+
+    # Same notes, in the same order, as the single-patient path.
+    note_rules = (
+        (invalid, "Invalid input"),
+        (not_recommended & (egfr < EGFR_NOT_RECOMMENDED), "eGFR <15 or dialysis: not recommended"),
+        (not_recommended & (child_pugh == "C"), "Severe hepatic impairment (Child-Pugh C): not recommended"),
+        (active & (washout > 0), f"Stop the ACE inhibitor at least {ACEI_WASHOUT_HOURS} hours before the first dose"),
+        (mg_per_kg, "Pediatric <40 kg: weight-based dosing, adjust every 2 weeks as tolerated"),
+        (mg_per_kg & reduced, PEDIATRIC_ADJUSTMENTS_NOTE),
+        (fixed & renal_reduced, "eGFR 15-29: start at 24/26 mg BID (AUC increases ~2-fold)"),
+        (fixed & hepatic_reduced, "Moderate hepatic impairment (Child-Pugh B): start at 24/26 mg BID"),
+        (fixed & no_prior, "Not on an ACE inhibitor/ARB: start at 24/26 mg BID"),
+        (fixed & low_prior, "Low-dose prior ACE inhibitor/ARB: start at 24/26 mg BID"),
+        (fixed & low_sbp, "Systolic BP <100 mmHg: start low, correct volume depletion, titrate only if BP allows"),
+        (fixed & pediatric, "Pediatric ≥40 kg: adjust every 2 weeks as tolerated"),
+    )
+    # Pack the fired notes into one bit pattern per row so each distinct
+    # combination (a few dozen at most) is joined into text only once.
+    pattern = np.zeros(n, dtype=np.int64)
+    for bit, (mask, _) in enumerate(note_rules):
+        pattern |= mask.astype(np.int64) << bit
+    notes = _decode(
+        pattern,
+        lambda code: "; ".join(text for bit, (_, text) in enumerate(note_rules) if code >> bit & 1),
+    )
+    status = _decode(
+        np.select([invalid, not_recommended], [0, 1], 2),
+        ("invalid input", "not recommended", "recommended").__getitem__,
+    )
+
+    result = frame.copy()
+    result["status"] = status
+    result["starting_dose"] = starting
+    result["target_dose"] = target
+    result["weeks_to_target"] = weeks_to_target
+    result["washout_hours"] = washout
+    result["notes"] = notes
+    return result
@@ -0,0 +1,418 @@
+"""
+Static export of a drug monograph for nginx/CDN serving.
+
+Renders every section through ``HtmlRenderer``, a headless ``ui`` backend that
+turns the same calls the Streamlit page makes into HTML, and writes one page
+per section plus a JSON bundle of every table::
+
+    python -m druginfo.export dist/ --app-url https://entresto.example.org/
+    python -m druginfo.export dist/other/ --drug other
+
+Output layout::
+
+    dist/index.html                 the first section (Overview)
+    dist/<section>.html             every other section
+    dist/data.json                  {"version": ..., "tables": {name: [rows]}}
+    dist/app/static/...             stylesheets and header image variants
+    dist/manifest.webmanifest       web app manifest (install to home screen)
+    dist/sw.js                      service worker that keeps the site offline
+    dist/icon-<size>.png            app icons named by the manifest
+
+Static assets keep the ``app/static/`` prefix the Streamlit page uses, so the
+markup shared with the live app resolves unchanged. Interactive tools (the
+interaction checker and dose calculator) are not exported; their sections link
+to the live app instead when ``--app-url`` is given.
+
+Every page registers ``sw.js``. On its first visit a browser stores all the
+pages, ``data.json`` and the static files in one cache, and later visits are
+served from that cache without the network. The cache is named after the
+monograph's ``version`` (``entresto-2.2.0-<hash>``), where the hash covers
+every file written, so a new release or any edit to the export changes
+``sw.js``; the browser installs the new worker, which fills a new cache and
+deletes the old ones.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+import struct
+import textwrap
+import zlib
+from html import escape
+from pathlib import Path
+from urllib.parse import urlencode
+
+from druginfo import STATIC_DIR, STATIC_URL, data, images, monographs, theme
+
+EXPORT_STYLESHEET = "export.css"
+ARIA_CURRENT = ' aria-current="page"'
+SERVICE_WORKER = "sw.js"
+MANIFEST = "manifest.webmanifest"
+ICON_SIZES = (192, 512)
+THEME_COLOR = "#1e3a8a"
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BULLET = re.compile(r"^[-*]\s+(.*)$")
+_NUMBERED = re.compile(r"^\d+\.\s+(.*)$")
+_INLINE = (
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)"), r'<a href="\2">\1</a>'),
+    (re.compile(r"\*\*(.+?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])"), r"<em>\1</em>"),
+)
+
+
+# ==================== MARKDOWN ====================
+def inline(text):
+    """Escape ``text`` and apply the inline markdown the sections use."""
+    text = escape(text, quote=False)
+    for pattern, replacement in _INLINE:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def markdown_to_html(body):
+    """Convert the small markdown subset used in monograph files to HTML.
+
+    Headings, paragraphs with hard line breaks, bullet and numbered lists,
+    horizontal rules and inline bold/italic/code/links -- enough for the
+    monograph, not a general-purpose converter.
+    """
+    html, paragraph, items, list_tag = [], [], [], None
+
+    def flush_paragraph():
+        if paragraph:
+            # Two trailing spaces mark a hard line break, as in Streamlit.
+            breaks = ["<br>" if line.endswith("  ") else " " for line in paragraph[:-1]] + [""]
+            text = "".join(inline(line.strip()) + end for line, end in zip(paragraph, breaks))
+            html.append(f"<p>{text}</p>")
+            paragraph.clear()
+
+    def flush_list():
+        nonlocal list_tag
+        if items:
+            html.append(f"<{list_tag}>{''.join(f'<li>{item}</li>' for item in items)}</{list_tag}>")
+            items.clear()
+        list_tag = None
+
+    for line in textwrap.dedent(body).strip("\n").splitlines():
+        stripped = line.strip()
+        heading = _HEADING.match(stripped)
+        bullet = _BULLET.match(stripped)
+        numbered = _NUMBERED.match(stripped)
+        if not stripped:
+            flush_paragraph()
+            flush_list()
+        elif stripped == "---":
+            flush_paragraph()
+            flush_list()
+            html.append("<hr>")
+        elif heading:
+            flush_paragraph()
+            flush_list()
+            level = len(heading.group(1))
+            html.append(f"<h{level}>{inline(heading.group(2))}</h{level}>")
+        elif bullet or numbered:
+            flush_paragraph()
+            tag = "ul" if bullet else "ol"
+            if list_tag != tag:
+                flush_list()
+                list_tag = tag
+            items.append(inline((bullet or numbered).group(1)))
+        else:
+            flush_list()
+            paragraph.append(line)
+    flush_paragraph()
+    flush_list()
+    return "\n".join(html)
+
+
+# ==================== HEADLESS BACKEND ====================
+class _Column:
+    def __init__(self, renderer, weight):
+        self.renderer = renderer
+        self.weight = weight
+        self.parts = []
+
+    def __enter__(self):
+        self.renderer._stack.append(self.parts)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.renderer._stack.pop()
+
+
+class _Columns:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __str__(self):
+        template = " ".join(f"{column.weight}fr" for column in self.columns)
+        cells = "".join(f'<div class="column">{"".join(map(str, column.parts))}</div>'
+                        for column in self.columns)
+        return f'<div class="columns" style="grid-template-columns: {template};">{cells}</div>'
+
+
+class HtmlRenderer:
+    """Records what a section renders as HTML."""
+
+    def __init__(self):
+        self.parts = []
+        self._stack = [self.parts]
+
+    def _emit(self, html):
+        self._stack[-1].append(html)
+
+    def html(self):
+        return "\n".join(map(str, self.parts))
+
+    def header(self, body, **kwargs):
+        self._emit(f"<h2>{inline(body)}</h2>")
+
+    def markdown(self, body, unsafe_allow_html=False, **kwargs):
+        if unsafe_allow_html and body.lstrip().startswith("<"):
+            self._emit(textwrap.dedent(body).strip())
+        else:
+            self._emit(markdown_to_html(body))
+
+    def write(self, *args, **kwargs):
+        for arg in args:
+            if isinstance(arg, str) and arg.strip():
+                self.markdown(arg)
+
+    def caption(self, body, **kwargs):
+        self._emit(f'<div class="caption">{markdown_to_html(body)}</div>')
+
+    def _callout(kind):
+        def callout(self, body, **kwargs):
+            self._emit(f'<div class="callout {kind}">{markdown_to_html(body)}</div>')
+        return callout
+
+    info = _callout("info")
+    success = _callout("success")
+    warning = _callout("warning")
+    error = _callout("error")
+    del _callout
+
+    def dataframe(self, data, **kwargs):
+        self._emit(theme.table_html(data))
+
+    def columns(self, spec, **kwargs):
+        weights = [1] * spec if isinstance(spec, int) else list(spec)
+        columns = [_Column(self, weight) for weight in weights]
+        self._emit(_Columns(columns))
+        return columns
+
+
+# ==================== PAGES ====================
+def page_name(monograph, section):
+    return "index.html" if section is monograph.sections[0] else f"{section.key}.html"
+
+
+def _nav(monograph, current):
+    links = "".join(
+        f'<a href="{page_name(monograph, section)}"{ARIA_CURRENT if section is current else ""}>'
+        f'{escape(section.label)}</a>'
+        for section in monograph.sections
+    )
+    return f'<nav class="section-nav">{links}</nav>'
+
+
+def _tool_note(monograph, section, app_url):
+    if app_url:
+        href = f"{app_url.rstrip('/')}/?{urlencode({'drug': monograph.slug, 'tab': section.key})}"
+        link = f'<a href="{escape(href)}">Open the interactive tool</a>'
+    else:
+        link = "The interactive tool is available in the live app"
+    return f'<div class="callout info"><p>🧮 {link}.</p></div>'
+
+
+def render_page(monograph, section, app_url=None):
+    """Return the complete HTML page for one section."""
+    renderer = HtmlRenderer()
+    section.render(renderer, monograph.tables)
+    if section.tool is not None:
+        renderer.parts.append(_tool_note(monograph, section, app_url))
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{escape(section.label)} · {escape(monograph.meta["page_title"])}</title>
+<meta name="theme-color" content="{THEME_COLOR}">
+<link rel="manifest" href="{MANIFEST}">
+<link rel="icon" type="image/png" href="icon-{ICON_SIZES[0]}.png">
+{theme.stylesheet_tag(True)}
+{theme.stylesheet_tag(True, EXPORT_STYLESHEET)}
+</head>
+<body>
+<main class="page">
+{theme.title_html(monograph)}
+{theme.subtitle_html(monograph)}
+{images.header_picture_html(monograph.meta.get("header_image"))}
+<hr>
+{_nav(monograph, section)}
+<article id="{section.key}">
+{renderer.html()}
+</article>
+<hr>
+{theme.footer_html(monograph)}
+</main>
+<script>
+if ("serviceWorker" in navigator) navigator.serviceWorker.register("{SERVICE_WORKER}");
+</script>
+</body>
+</html>
+"""
+
+
+def data_bundle(monograph):
+    """Every table as JSON rows, stamped with the monograph version."""
+    return {
+        "drug": monograph.slug,
+        "version": monograph.version,
+        "tables": {name: data.records(columns) for name, columns in monograph.tables.items()},
+    }
+
+
+# ==================== OFFLINE ====================
+# Precache on install, serve from the cache first, drop other versions on
+# activate. Navigations that miss (an unexported URL, offline) get the index.
+_SERVICE_WORKER = """\
+const CACHE = {{cache}};
+const PREFIX = {{prefix}};
+const PRECACHE = {{precache}};
+
+self.addEventListener("install", event => {
+  event.waitUntil(caches.open(CACHE)
+    .then(cache => cache.addAll(PRECACHE.map(url => new Request(url, {cache: "reload"}))))
+    .then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", event => {
+  event.waitUntil(caches.keys()
+    .then(names => Promise.all(names.filter(name => name.startsWith(PREFIX) && name !== CACHE)
+                                    .map(name => caches.delete(name))))
+    .then(() => self.clients.claim()));
+});
+
+self.addEventListener("fetch", event => {
+  const request = event.request;
+  if (request.method !== "GET" || new URL(request.url).origin !== self.location.origin) return;
+  event.respondWith(caches.open(CACHE).then(cache =>
+    cache.match(request, {ignoreSearch: true}).then(hit => hit || fetch(request).catch(() =>
+      request.mode === "navigate" ? cache.match("index.html") : Response.error()))));
+});
+"""
+
+
+def cache_name(monograph, out_dir, files):
+    """``<slug>-<version>-<hash>``: the monograph's release version plus a hash of ``files``."""
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(path.relative_to(out_dir).as_posix().encode("utf-8") + b"\0" + path.read_bytes())
+    return f"{monograph.slug}-{monograph.meta.get('version', '0')}-{digest.hexdigest()[:12]}"
+
+
+def service_worker(cache, urls, prefix):
+    """``sw.js`` precaching ``urls`` (relative to the worker) in the cache ``cache``."""
+    return (_SERVICE_WORKER.replace("{{cache}}", json.dumps(cache))
+            .replace("{{prefix}}", json.dumps(prefix))
+            .replace("{{precache}}", json.dumps(urls, indent=2)))
+
+
+def web_manifest(monograph):
+    meta = monograph.meta
+    return {
+        "name": meta.get("page_title", monograph.name),
+        "short_name": monograph.name,
+        "description": meta.get("subtitle", ""),
+        "start_url": "index.html",
+        "scope": "./",
+        "display": "standalone",
+        "background_color": "#ffffff",
+        "theme_color": THEME_COLOR,
+        "icons": [{"src": f"icon-{size}.png", "sizes": f"{size}x{size}", "type": "image/png",
+                   "purpose": "any maskable"} for size in ICON_SIZES],
+    }
+
+
+def icon_png(size, color=THEME_COLOR):
+    """A square PNG icon: a white disc on ``color``, inside the maskable safe zone."""
+    background = bytes.fromhex(color.lstrip("#"))
+    centre, radius = (size - 1) / 2, size * 0.3
+    rows = []
+    for y in range(size):
+        row = bytearray(b"\0")  # filter type: none
+        for x in range(size):
+            row += b"\xff\xff\xff" if (x - centre) ** 2 + (y - centre) ** 2 <= radius ** 2 else background
+        rows.append(bytes(row))
+
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 9)) + chunk(b"IEND", b""))
+
+
+def export(out_dir, app_url=None, monograph=None):
+    """Write the static site to ``out_dir`` and return the files written."""
+    monograph = monograph or monographs.load()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    static_out = out_dir / STATIC_URL
+    if static_out.exists():
+        shutil.rmtree(static_out)
+    shutil.copytree(STATIC_DIR, static_out)
+
+    written = []
+    for section in monograph.sections:
+        path = out_dir / page_name(monograph, section)
+        path.write_text(render_page(monograph, section, app_url), encoding="utf-8")
+        written.append(path)
+
+    bundle = out_dir / "data.json"
+    bundle.write_text(json.dumps(data_bundle(monograph), ensure_ascii=False, separators=(",", ":")),
+                      encoding="utf-8")
+    written.append(bundle)
+
+    manifest = out_dir / MANIFEST
+    manifest.write_text(json.dumps(web_manifest(monograph), indent=2, ensure_ascii=False) + "\n",
+                        encoding="utf-8")
+    written.append(manifest)
+    for size in ICON_SIZES:
+        icon = out_dir / f"icon-{size}.png"
+        icon.write_bytes(icon_png(size))
+        written.append(icon)
+
+    # Stylesheets are precached under the exact ?v= URLs the pages request.
+    assets = sorted(path for path in static_out.rglob("*") if path.is_file())
+    precached = [*written, *assets]
+    urls = ["./", *(path.relative_to(out_dir).as_posix() for path in precached)]
+    for name in (theme.STYLESHEET, EXPORT_STYLESHEET):
+        plain = f"{STATIC_URL}/{name}"
+        urls[urls.index(plain)] = f"{plain}?v={theme.stylesheet_version(name)}"
+    worker = out_dir / SERVICE_WORKER
+    worker.write_text(service_worker(cache_name(monograph, out_dir, precached), urls, f"{monograph.slug}-"),
+                      encoding="utf-8")
+    written.append(worker)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the monograph as a static site.")
+    parser.add_argument("out_dir", nargs="?", default="dist")
+    parser.add_argument("--app-url", help="URL of the live Streamlit app, linked from tool sections")
+    parser.add_argument("--drug", default=monographs.DEFAULT_DRUG, choices=monographs.available())
+    args = parser.parse_args()
+
+    for path in export(args.out_dir, args.app_url, monographs.load(args.drug)):
+        print(f"{str(path):<40} {path.stat().st_size:>8} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Sanitized, shared cache of the monographs' raw-HTML blocks.
+
+A ``markdown`` block with ``"html": true`` (the info/warning/success boxes)
+is passed to ``st.markdown(..., unsafe_allow_html=True)``. Its HTML is run
+through an allowlist sanitizer once and kept in ``CACHE``, keyed by the
+SHA-256 of its source, for every session of the process: a rerun is a dict
+lookup, an edited block gets a new key, and identical boxes in different
+drugs share one entry. The key is computed when the monograph is parsed
+(``sections.build_section``), so the hot path does not even hash.
+
+The sanitizer keeps the tags and attributes the monograph boxes use, drops
+everything else (scripts, event handlers, ``javascript:`` links, CSS with
+``url()``) and leaves text and line structure untouched, so markdown that
+Streamlit applies around the HTML renders as before. The static export
+renders through the same cache, so both paths ship identical HTML; ``items``
+lists the fragments by key for moving them to static files.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from html import escape
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+MAX_ENTRIES = 4096
+
+ALLOWED_TAGS = frozenset(
+    "a b br code div em h1 h2 h3 h4 h5 h6 hr i li ol p small span strong sub sup "
+    "table tbody td th thead tr u ul".split()
+)
+VOID_TAGS = frozenset(("br", "hr"))
+DROP_CONTENT = frozenset(("script", "style", "iframe", "object", "embed", "template"))
+ALLOWED_ATTRIBUTES = frozenset(("class", "style", "title", "href", "colspan", "rowspan"))
+ALLOWED_CSS = frozenset((
+    "color", "background", "background-color", "font-size", "font-weight", "font-style", "text-align",
+    "text-decoration", "line-height", "margin", "margin-top", "margin-bottom", "margin-left", "margin-right",
+    "padding", "padding-top", "padding-bottom", "padding-left", "padding-right", "border", "border-left",
+    "border-radius", "display", "width",
+))
+_UNSAFE_CSS = re.compile(r"url\s*\(|expression\s*\(|javascript:|@import|[<>\\]", re.IGNORECASE)
+_SAFE_HREF = re.compile(r"^(https?:|mailto:|#|/|\./)", re.IGNORECASE)
+
+
+def fragment_key(source):
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+# ==================== SANITIZER ====================
+def _clean_style(value):
+    declarations = []
+    for declaration in value.split(";"):
+        name, _, css = declaration.partition(":")
+        name, css = name.strip().lower(), css.strip()
+        if name in ALLOWED_CSS and css and not _UNSAFE_CSS.search(css):
+            declarations.append(f"{name}: {css}")
+    return "; ".join(declarations) + (";" if declarations else "")
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.dropping = 0
+        self.removed = 0
+
+    def _attributes(self, tag, attrs):
+        kept = []
+        for name, value in attrs:
+            value = value or ""
+            if name not in ALLOWED_ATTRIBUTES:
+                self.removed += 1
+                continue
+            if name == "style":
+                value = _clean_style(value)
+                if not value:
+                    self.removed += 1
+                    continue
+            if name == "href" and (tag != "a" or not _SAFE_HREF.match(value.strip())):
+                self.removed += 1
+                continue
+            kept.append(f' {name}="{escape(value)}"')
+        if tag == "a" and any(part.startswith(" href=") for part in kept):
+            kept.append(' rel="noopener noreferrer" target="_blank"')
+        return "".join(kept)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT:
+            self.dropping += 1
+            self.removed += 1
+        elif self.dropping:
+            return
+        elif tag in ALLOWED_TAGS:
+            self.out.append(f"<{tag}{self._attributes(tag, attrs)}>")
+        else:
+            self.removed += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.dropping and tag in VOID_TAGS:
+            self.out.append(f"<{tag}{self._attributes(tag, attrs)}>")
+        elif tag not in VOID_TAGS:
+            self.removed += 1
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self.dropping = max(0, self.dropping - 1)
+        elif not self.dropping and tag in ALLOWED_TAGS and tag not in VOID_TAGS:
+            self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.out.append(escape(data, quote=False))
+
+
+def sanitize(source):
+    """Return ``(html, removed)``: allowlisted HTML and how many tags/attributes were dropped."""
+    parser = _Sanitizer()
+    parser.feed(source)
+    parser.close()
+    return "".join(parser.out), parser.removed
+
+
+# ==================== CACHE ====================
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    size_bytes: int
+    removed: int
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class FragmentCache:
+    """Thread-safe LRU of sanitized HTML by content key, shared by every session."""
+
+    def __init__(self, maxsize=MAX_ENTRIES):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.removed = 0
+
+    def html(self, key, source):
+        """Sanitized HTML of ``source``, whose ``fragment_key`` is ``key``."""
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return html
+        html, removed = sanitize(source)
+        with self._lock:
+            self.misses += 1
+            self.removed += removed
+            self._entries[key] = html
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return html
+
+    def items(self):
+        with self._lock:
+            return list(self._entries.items())
+
+    def cache_info(self):
+        with self._lock:
+            size = sum(len(html.encode("utf-8")) for html in self._entries.values())
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries), size, self.removed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.removed = 0
+
+
+CACHE = FragmentCache()
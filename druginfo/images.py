@@ -0,0 +1,143 @@
+"""
+Self-hosted, pre-sized header image.
+
+The header used to hot-link a 2560px image from a third-party CDN. Instead, a
+one-off build step turns a local copy of that image into WebP/AVIF variants at
+a few fixed widths under ``static/img/``; Streamlit serves that folder at
+``/app/static/`` and the page references the variants through a responsive
+``<picture>`` element, so browsers download only the size they need.
+
+Build the variants with::
+
+    python -m druginfo.images path/to/entresto.jpg [NAME]
+
+``NAME`` (default ``header``) prefixes the files and names the manifest; a
+monograph picks its image with ``"header_image": NAME``.
+
+Variant file names carry a content hash, so a reverse proxy can safely mark
+``/app/static/img/`` as immutable (see README).
+"""
+
+import hashlib
+import json
+import sys
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+
+from druginfo import STATIC_DIR, STATIC_URL
+
+IMAGE_DIR = STATIC_DIR / "img"
+IMAGE_URL = f"{STATIC_URL}/img"
+DEFAULT_NAME = "header"
+
+WIDTHS = (480, 960, 1440)
+FORMATS = (("avif", "image/avif", 50), ("webp", "image/webp", 80))
+FALLBACK_FORMAT = "webp"
+
+ALT_TEXT = "ENTRESTO® tablets"
+CAPTION = "ENTRESTO® - Available in 50mg, 100mg, and 200mg formulations"
+
+
+def build_variants(source, out_dir=IMAGE_DIR, name=DEFAULT_NAME):
+    """Write resized WebP/AVIF variants of ``source`` and their manifest.
+
+    Widths larger than the source are skipped rather than upscaled. AVIF is
+    skipped when the installed Pillow was built without it. Returns the
+    manifest dict that was written next to the images.
+    """
+    from PIL import Image, features
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(source) as original:
+        image = original.convert("RGB")
+
+    for stale in out_dir.glob(f"{name}-*"):
+        stale.unlink()
+
+    variants = []
+    for fmt, mime, quality in FORMATS:
+        if not features.check(fmt):
+            continue
+        for width in WIDTHS:
+            if width > image.width:
+                continue
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+            path = out_dir / f"{name}-{width}.{fmt}"
+            resized.save(path, format=fmt.upper(), quality=quality)
+
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()[:10]
+            hashed = path.with_name(f"{name}-{width}.{digest}.{fmt}")
+            path.replace(hashed)
+            variants.append({
+                "format": fmt,
+                "type": mime,
+                "width": width,
+                "height": height,
+                "file": hashed.name,
+                "bytes": hashed.stat().st_size,
+            })
+
+    manifest = {"alt": ALT_TEXT, "caption": CAPTION, "variants": variants}
+    (out_dir / f"{name}.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def load_manifest(name=DEFAULT_NAME, image_dir=IMAGE_DIR):
+    """Return the variant manifest, or ``None`` when no variants were built."""
+    try:
+        return json.loads((Path(image_dir) / f"{name}.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def _srcset(variants):
+    return ", ".join(f"{IMAGE_URL}/{v['file']} {v['width']}w" for v in variants)
+
+
+@lru_cache(maxsize=None)
+def header_picture_html(name=DEFAULT_NAME):
+    """Return the ``<picture>`` markup for the header image ``name``.
+
+    Returns an empty string when ``name`` is empty or its variants have not
+    been built, so an air-gapped deployment without the asset shows no broken
+    image.
+    """
+    manifest = load_manifest(name) if name else None
+    if not manifest or not manifest["variants"]:
+        return ""
+
+    by_format = {}
+    for variant in manifest["variants"]:
+        by_format.setdefault(variant["format"], []).append(variant)
+
+    sizes = "(max-width: 768px) 100vw, 50vw"
+    sources = "".join(
+        f'<source type="{mime}" srcset="{_srcset(by_format[fmt])}" sizes="{sizes}">'
+        for fmt, mime, _ in FORMATS
+        if fmt in by_format
+    )
+    fallback = by_format.get(FALLBACK_FORMAT) or next(iter(by_format.values()))
+    default = fallback[len(fallback) // 2]
+
+    return (
+        '<figure class="drug-image-container">'
+        f"<picture>{sources}"
+        f'<img src="{IMAGE_URL}/{default["file"]}" alt="{escape(manifest["alt"])}" '
+        f'width="{default["width"]}" height="{default["height"]}" '
+        'loading="lazy" decoding="async" style="width: 100%; height: auto;">'
+        "</picture>"
+        f'<figcaption>{escape(manifest["caption"])}</figcaption>'
+        "</figure>"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit("usage: python -m druginfo.images SOURCE_IMAGE [NAME]")
+    name = sys.argv[2] if len(sys.argv) == 3 else DEFAULT_NAME
+    for item in build_variants(sys.argv[1], name=name)["variants"]:
+        print(f"{item['file']:<32} {item['bytes']:>8} bytes")
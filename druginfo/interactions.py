@@ -0,0 +1,226 @@
+"""
+Drug-interaction lookup over the Interactions tab tables.
+
+``InteractionIndex`` is built once from the three interaction tables: every
+drug, drug class and listed example is normalized into an inverted index
+(term -> table rows), and every term is also broken into character trigrams
+for fuzzy matching of misspellings. Checking a medication list is then a
+handful of dict lookups.
+
+Only exact terms produce a result. A combination product ("amlodipine/
+benazepril", "hydrochlorothiazide lisinopril") is split into its components
+and each one is looked up, so no component is lost behind the first. A query
+that only resembles an indexed term is never reported as resolved: it comes
+back as a "did you mean" suggestion, since a near-miss such as "digitoxin"
+would otherwise be shown as the interaction-free digoxin.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+# Class members that the tables only hint at with "e.g.", so that checking
+# "ramipril" finds the ACE inhibitor row. Keyed by the normalized class name
+# as it appears in a Drug/Drug Class cell, so it applies to any monograph.
+CLASS_MEMBERS = {
+    "ace inhibitors": (
+        "ACE inhibitor", "ACEi", "benazepril", "captopril", "enalapril", "fosinopril", "lisinopril",
+        "moexipril", "perindopril", "quinapril", "ramipril", "trandolapril",
+    ),
+    "other arbs": (
+        "ARB", "angiotensin receptor blocker", "azilsartan", "candesartan", "eprosartan", "irbesartan",
+        "losartan", "olmesartan", "telmisartan",
+    ),
+    "aliskiren": ("Tekturna",),
+    "potassium sparing diuretics": ("eplerenone", "finerenone"),
+    "potassium supplements": (
+        "potassium chloride", "KCl", "potassium citrate", "potassium bicarbonate", "potassium gluconate",
+        "Klor-Con", "salt substitute", "potassium salt substitute",
+    ),
+    "nsaids": ("NSAID", "celecoxib", "diclofenac", "ketorolac", "meloxicam"),
+    "lithium": ("lithium citrate",),
+}
+
+SEVERITY_ORDER = ("contraindicated", "monitor", "no interaction")
+TABLES = ("contraind_interactions", "monitor", "safe")
+
+# Trigram Jaccard similarity a near-miss needs to be suggested
+# ("lisinoprill" 0.77, "furosemid" 0.75; "digitoxin" vs digoxin is 0.5).
+FUZZY_THRESHOLD = 0.65
+
+# Words of a medication entry that are dose, form or frequency rather than a
+# drug; any other word that names no indexed term is reported as unknown.
+DOSE_WORDS = frozenset((
+    "mg", "mcg", "g", "meq", "ml", "unit", "units", "tablet", "tablets", "tab", "tabs", "capsule", "capsules",
+    "cap", "caps", "er", "sr", "xr", "xl", "cr", "la", "oral", "po", "iv", "od", "qd", "bid", "tid", "qid",
+    "daily", "once", "twice", "and", "with", "plus",
+))
+
+_EXAMPLES = re.compile(r"\(e\.g\.,?\s*([^)]*)\)", re.IGNORECASE)
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+
+@dataclass(frozen=True)
+class Interaction:
+    severity: str
+    agent: str
+    effect: str
+    action: str
+    table: str
+    row: int
+
+
+@dataclass(frozen=True)
+class Match:
+    query: str
+    term: str
+    interaction: Interaction
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    query: str
+    term: str
+    score: float
+
+
+def normalize(name):
+    """Fold case, accents and punctuation: ``"K-Dur"`` -> ``"k dur"``."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name.lower()).split())
+
+
+def _trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _names(cell):
+    """Split a table cell into the agent name and any "e.g." examples."""
+    examples = _EXAMPLES.search(cell)
+    names = [_PARENTHETICAL.sub("", cell)]
+    if examples:
+        names.extend(examples.group(1).split(","))
+    return names
+
+
+def _entries(tables):
+    """Yield ``(Interaction, names)`` for every row of the interaction tables."""
+    table = tables["contraind_interactions"]
+    for row, drug, risk, management in zip(table["#"], table["Drug"], table["Risk"], table["Management"]):
+        yield (Interaction("contraindicated", drug, risk, management, "contraind_interactions", row),
+               _names(drug))
+
+    table = tables["monitor"]
+    for row, drug_class, examples, effect, action in zip(
+            table["#"], table["Drug Class"], table["Examples"], table["Effect"], table["Action"]):
+        yield (Interaction("monitor", f"{drug_class} ({examples})", effect, action, "monitor", row),
+               [drug_class, *examples.split(",")])
+
+    table = tables["safe"]
+    for row, drug, result in zip(table["#"], table["Drug"], table["Study Result"]):
+        yield Interaction("no interaction", drug, result, "No dose adjustment needed", "safe", row), [drug]
+
+
+class InteractionIndex:
+    """Inverted index plus trigram matcher over the interaction tables."""
+
+    def __init__(self, tables):
+        self.terms = {}
+        self.display_names = {}
+        for interaction, names in _entries(tables):
+            names = [*names, *(member for name in names for member in CLASS_MEMBERS.get(normalize(name), ()))]
+            for name in names:
+                term = normalize(name)
+                if not term:
+                    continue
+                self.terms.setdefault(term, [])
+                if interaction not in self.terms[term]:
+                    self.terms[term].append(interaction)
+                self.display_names.setdefault(term, name.strip())
+        self.terms = {term: tuple(rows) for term, rows in self.terms.items()}
+
+        self._trigram_index = {}
+        for term in self.terms:
+            for gram in _trigrams(term):
+                self._trigram_index.setdefault(gram, set()).add(term)
+        self._trigram_counts = {term: len(_trigrams(term)) for term in self.terms}
+
+    def options(self):
+        """Display names of every indexed drug and class, for pick lists."""
+        return sorted({name[:1].upper() + name[1:] for name in self.display_names.values()}, key=str.lower)
+
+    def resolve(self, query):
+        """Return ``(terms, unmatched)``: the indexed terms named in ``query``
+        and the words that name none.
+
+        The query is split on "/", "-", "+" and whitespace (``normalize``), and
+        at each word the longest run of words that is an indexed term is
+        taken, so "Potassium Chloride 20 mEq" gives ``["potassium chloride"]``
+        and "amlodipine/benazepril" gives both drugs. Doses, units and other
+        ``DOSE_WORDS`` are neither.
+        """
+        words = normalize(query).split()
+        terms, unmatched, start = [], [], 0
+        while start < len(words):
+            for end in range(len(words), start, -1):
+                term = " ".join(words[start:end])
+                if term in self.terms and not term.isdigit():
+                    if term not in terms:
+                        terms.append(term)
+                    start = end
+                    break
+            else:
+                word = words[start]
+                if word not in DOSE_WORDS and not any(character.isdigit() for character in word):
+                    unmatched.append(word)
+                start += 1
+        return terms, unmatched
+
+    def suggest(self, query):
+        """Return ``(term, score)`` for the most similar indexed term, or ``None``.
+
+        Trigram similarity of the whole query, then of each of its words; only
+        a suggestion, never a resolved drug.
+        """
+        term = normalize(query)
+        for candidate in (term, *term.split()):
+            best = self._similar(candidate)
+            if best is not None:
+                return best
+        return None
+
+    def _similar(self, term):
+        if not term or term.isdigit():
+            return None
+        grams = _trigrams(term)
+        shared = {}
+        for gram in grams:
+            for candidate in self._trigram_index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        best = None
+        for candidate, count in shared.items():
+            score = count / (len(grams) + self._trigram_counts[candidate] - count)
+            if score >= FUZZY_THRESHOLD and (best is None or score > best[1]):
+                best = candidate, score
+        return best
+
+    def check(self, medications):
+        """Check a medication list against the monograph's drug.
+
+        Returns ``(matches, unknown, suggestions)``: matches of every
+        component of every query, sorted most severe first; the queries (or,
+        next to a resolved component, the words) that named no indexed term;
+        and a ``Suggestion`` for those of them that resemble one.
+        """
+        matches, unknown, suggestions = [], [], []
+        for query in medications:
+            terms, unmatched = self.resolve(query)
+            matches.extend(Match(query, term, interaction) for term in terms for interaction in self.terms[term])
+            for name in (unmatched if terms else [query]):
+                unknown.append(name)
+                suggested = self.suggest(name)
+                if suggested is not None:
+                    suggestions.append(Suggestion(name, *suggested))
+        matches.sort(key=lambda match: SEVERITY_ORDER.index(match.interaction.severity))
+        return matches, unknown, suggestions
@@ -0,0 +1,472 @@
+"""
+Health check for the reference links of the monographs.
+
+Every ``URL`` cell of a monograph's tables is checked concurrently with
+asyncio: a pool of keep-alive connections per host (at most
+``PER_HOST`` open to any one server), ``CONCURRENCY`` requests in flight
+overall and a ``TIMEOUT`` per link, redirects included. A link is tried with
+``HEAD`` first and with ``GET`` when the server refuses ``HEAD`` (only the
+status line and headers are read). The client is the standard library's
+asyncio streams, so the check needs no extra dependency.
+
+Proxies come from the environment like urllib's (``HTTP_PROXY``,
+``HTTPS_PROXY``, ``NO_PROXY``): plain http requests go to the proxy with the
+absolute URL, https is tunnelled with ``CONNECT`` and TLS is negotiated with
+the publisher through it. Credentials in the proxy URL are sent as Basic
+``Proxy-Authorization``. Only ``http://`` proxies are supported; ``--stub``
+never uses one.
+
+Results are kept in a JSON file (``ENTRESTO_LINK_STATUS``, default
+``link_status.json`` at the repository root) that doubles as a TTL cache: a
+run re-checks only the links whose result is older than ``TTL_HOURS``. The
+app reads the file and shows a badge next to each reference::
+
+    python -m druginfo.links                # on demand, e.g. a daily cron job
+    python -m druginfo.links --force        # ignore the TTL
+    python -m druginfo.links --stub         # CI: against a local stub server
+
+``--stub`` starts an HTTP server on 127.0.0.1 and checks every reference
+URL against it (same host pooling, paths and redirects), so CI exercises the
+checker without reaching the publishers. The exit status is 1 when a link is
+broken. Publishers that turn away automated clients (401/403/429) are
+reported as "blocked", which is not a failure.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import ssl
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import quote, unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass_environment
+
+STATUS_FILE = Path(os.environ.get(
+    "ENTRESTO_LINK_STATUS", Path(__file__).resolve().parent.parent / "link_status.json"
+))
+URL_COLUMN = "URL"
+STATUS_COLUMN = "Status"
+
+CONCURRENCY = 8
+PER_HOST = 2
+TIMEOUT = 15.0
+TTL_HOURS = 24
+MAX_REDIRECTS = 5
+USER_AGENT = "entresto-drug-info-linkcheck/1.0 (+reference validation)"
+
+# Status codes after which HEAD is retried as GET.
+HEAD_REFUSED = (400, 403, 404, 405, 501)
+BLOCKED = (401, 403, 429)
+
+BADGES = {
+    "ok": "✅ Link OK",
+    "moved": "↪️ Moved",
+    "blocked": "🔒 Not verifiable (access restricted)",
+    "broken": "❌ Broken link",
+    "error": "⚠️ Unreachable",
+}
+
+
+@dataclass(frozen=True)
+class LinkResult:
+    url: str
+    state: str  # a key of BADGES
+    status: object = None  # final HTTP status, or None when no response
+    final_url: str = ""
+    error: str = ""
+    checked: str = ""  # ISO 8601, UTC
+    elapsed_ms: float = 0.0
+
+
+def classify(status, redirected):
+    if 200 <= status < 300:
+        return "moved" if redirected else "ok"
+    if status in BLOCKED:
+        return "blocked"
+    return "broken"
+
+
+# ==================== HTTP CLIENT ====================
+class ConnectionPool:
+    """Idle keep-alive connections per ``(scheme, host, port)``.
+
+    A semaphore per host caps the connections open to one server, so a page
+    with many links to one publisher does not look like a burst.
+    ``proxies`` maps a scheme to a proxy URL, plus ``"no"`` for the hosts to
+    reach directly (default: ``urllib.request.getproxies()``, the environment).
+    """
+
+    def __init__(self, per_host=PER_HOST, ssl_context=None, proxies=None):
+        self.per_host = per_host
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.proxies = getproxies() if proxies is None else proxies
+        self._idle = {}
+        self._limits = {}
+        self.opened = self.reused = 0
+
+    def limit(self, key):
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.per_host)
+        return self._limits[key]
+
+    def proxy_for(self, scheme, host):
+        """The split proxy URL for a request, or ``None`` to connect directly."""
+        proxy = self.proxies.get(scheme)
+        if not proxy or proxy_bypass_environment(host, self.proxies):
+            return None
+        parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"unsupported proxy: {proxy}")
+        return parts
+
+    async def acquire(self, key, proxy=None):
+        """Return ``(reader, writer, reused)``; the caller holds ``limit(key)``."""
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer, True
+            writer.close()
+        scheme, host, port = key
+        if proxy is None:
+            tls = self.ssl_context if scheme == "https" else None
+            reader, writer = await asyncio.open_connection(host, port, ssl=tls,
+                                                           server_hostname=host if tls else None)
+        elif scheme == "http":
+            reader, writer = await asyncio.open_connection(proxy.hostname, proxy.port or 80)
+        else:
+            tunnel = await open_tunnel(proxy, host, port)
+            reader, writer = await asyncio.open_connection(sock=tunnel, ssl=self.ssl_context,
+                                                           server_hostname=host)
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, key, reader, writer, reusable):
+        if reusable:
+            self._idle.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+
+    async def close(self):
+        writers = [writer for connections in self._idle.values() for _, writer in connections]
+        self._idle.clear()
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+
+def _proxy_authorization(proxy):
+    if proxy.username is None:
+        return ""
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}".encode("utf-8")
+    return f"Proxy-Authorization: Basic {base64.b64encode(credentials).decode('ascii')}\r\n"
+
+
+async def open_tunnel(proxy, host, port):
+    """A socket connected to ``host:port`` through the proxy's ``CONNECT``.
+
+    asyncio's streams cannot start TLS on an open connection before Python
+    3.11, so the tunnel is set up on a bare socket that is then handed to
+    ``asyncio.open_connection(sock=...)``.
+    """
+    loop = asyncio.get_running_loop()
+    family, kind, protocol, _, address = (await loop.getaddrinfo(
+        proxy.hostname, proxy.port or 80, type=socket.SOCK_STREAM))[0]
+    tunnel = socket.socket(family, kind, protocol)
+    tunnel.setblocking(False)
+    try:
+        await loop.sock_connect(tunnel, address)
+        await loop.sock_sendall(tunnel, (f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                                         f"{_proxy_authorization(proxy)}\r\n").encode("latin-1"))
+        response = b""
+        while b"\r\n\r\n" not in response:
+            chunk = await loop.sock_recv(tunnel, 4096)
+            if not chunk:
+                raise ConnectionResetError("connection closed by proxy")
+            response += chunk
+        status = response.split(None, 2)[1].decode("latin-1")
+        if status != "200":
+            raise ConnectionRefusedError(f"proxy refused CONNECT {host}:{port} (HTTP {status})")
+    except BaseException:
+        tunnel.close()
+        raise
+    return tunnel
+
+
+def _target(parts):
+    path = quote(parts.path or "/", safe="/%:@!$&'()*+,;=-._~")
+    return path + (f"?{parts.query}" if parts.query else "")
+
+
+async def _exchange(pool, method, url):
+    """One request; returns ``(status, headers)`` with lower-case header names."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"not an http(s) URL: {url}")
+    key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+    host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+    proxy = pool.proxy_for(parts.scheme, parts.hostname)
+    target, extra = _target(parts), ""
+    if proxy is not None and parts.scheme == "http":
+        # A forward proxy takes the absolute URL; https goes through a CONNECT tunnel instead.
+        target, extra = f"http://{host}{target}", _proxy_authorization(proxy)
+    request = (f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\n"
+               f"Accept: */*\r\n{extra}Connection: keep-alive\r\n\r\n").encode("ascii")
+
+    async with pool.limit(key):
+        for attempt in range(2):
+            reader, writer, reused = await pool.acquire(key, proxy)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("connection closed by server")
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # A pooled connection the server has since closed: retry once on a new one.
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            version, status = status_line.decode("latin-1").split()[:2]
+            # The body of a GET is not read, so that connection cannot be reused.
+            reusable = (method == "HEAD" and version == "HTTP/1.1"
+                        and headers.get("connection", "").lower() != "close")
+            pool.release(key, reader, writer, reusable)
+            return int(status), headers
+
+
+async def _follow(pool, method, url):
+    """Follow redirects; returns ``(status, final_url, redirected)``."""
+    redirected = False
+    for _ in range(MAX_REDIRECTS + 1):
+        status, headers = await _exchange(pool, method, url)
+        if status in (301, 302, 303, 307, 308) and "location" in headers:
+            url = urljoin(url, headers["location"])
+            redirected = redirected or status in (301, 308)
+            continue
+        return status, url, redirected
+    raise ValueError(f"more than {MAX_REDIRECTS} redirects")
+
+
+async def check_url(pool, url, timeout=TIMEOUT):
+    """Check one link; never raises (failures become an ``error`` result)."""
+    started = time.perf_counter()
+    checked = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+    async def attempt():
+        status, final_url, redirected = await _follow(pool, "HEAD", url)
+        if status in HEAD_REFUSED:
+            status, final_url, redirected = await _follow(pool, "GET", url)
+        return status, final_url, redirected
+
+    try:
+        status, final_url, redirected = await asyncio.wait_for(attempt(), timeout)
+    except asyncio.TimeoutError:
+        return LinkResult(url, "error", error=f"timed out after {timeout:g} s", checked=checked,
+                          elapsed_ms=round(1000 * (time.perf_counter() - started), 1))
+    except (OSError, ValueError, ssl.SSLError) as failure:
+        return LinkResult(url, "error", error=str(failure) or type(failure).__name__, checked=checked,
+                          elapsed_ms=round(1000 * (time.perf_counter() - started), 1))
+    return LinkResult(url, classify(status, redirected), status, final_url if final_url != url else "",
+                      checked=checked, elapsed_ms=round(1000 * (time.perf_counter() - started), 1))
+
+
+async def check_all(urls, concurrency=CONCURRENCY, per_host=PER_HOST, timeout=TIMEOUT, ssl_context=None,
+                    proxies=None):
+    """Check ``urls`` concurrently; returns ``{url: LinkResult}`` and the pool's counters."""
+    pool = ConnectionPool(per_host, ssl_context, proxies)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def bounded(url):
+        async with gate:
+            return await check_url(pool, url, timeout)
+
+    try:
+        results = await asyncio.gather(*(bounded(url) for url in dict.fromkeys(urls)))
+    finally:
+        await pool.close()
+    return {result.url: result for result in results}, {"opened": pool.opened, "reused": pool.reused}
+
+
+# ==================== RESULT CACHE ====================
+def read_results(path=None):
+    """``{url: LinkResult}`` from the status file; empty if there is none."""
+    try:
+        document = json.loads(Path(path or STATUS_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return {url: LinkResult(**entry) for url, entry in document.get("links", {}).items()}
+
+
+def write_results(results, path=None):
+    """Write the status file atomically (readers never see half of it)."""
+    path = Path(path or STATUS_FILE)
+    staging = path.with_name(f".{path.name}.tmp")
+    document = {"links": {url: asdict(result) for url, result in sorted(results.items())}}
+    staging.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(staging, path)
+
+
+def is_fresh(result, ttl_hours=TTL_HOURS, now=None):
+    """Whether a cached result can be reused; network errors are always retried."""
+    if not result.checked or result.state == "error":
+        return False
+    checked = datetime.fromisoformat(result.checked)
+    return (now or datetime.now(timezone.utc)) - checked < timedelta(hours=ttl_hours)
+
+
+def reference_urls(monograph):
+    """Every ``URL`` cell of the monograph's tables, in order, without duplicates."""
+    return list(dict.fromkeys(
+        url for columns in monograph.tables.values() for url in columns.get(URL_COLUMN, ()) if url
+    ))
+
+
+# ==================== DISPLAY ====================
+def badge(result):
+    """Short status text for a reference; empty when the link was never checked."""
+    if result is None:
+        return ""
+    text = BADGES[result.state]
+    if result.status is not None and not 200 <= result.status < 300:
+        text += f" (HTTP {result.status})"
+    return f"{text} · checked {result.checked[:10]}"
+
+
+def with_status(tables, results):
+    """Copies of the tables with a ``URL`` column, plus a ``Status`` column of badges.
+
+    Returns ``{name: columns}`` for just those tables, to be layered over the
+    page's table mapping (the reference renderer shows the column when present).
+    """
+    annotated = {}
+    for name, columns in tables.items():
+        if URL_COLUMN in columns:
+            annotated[name] = {**columns, STATUS_COLUMN: [badge(results.get(url)) for url in columns[URL_COLUMN]]}
+    return annotated
+
+
+# ==================== LOCAL STUB SERVER ====================
+async def _stub_handler(reader, writer):
+    """Minimal HTTP/1.1 server: 200 for any path, keep-alive, plus test routes.
+
+    ``/status/<code>`` answers with that code, ``/redirect/<path>`` sends a 301
+    to ``/<path>`` and ``/slow/<seconds>/<path>`` waits before answering. An
+    absolute URL (the form sent to a proxy) is served by its path.
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            method, path = request_line.decode("latin-1").split()[:2]
+            if "://" in path:
+                path = urlsplit(path).path
+            status, extra = 200, ""
+            if path.startswith("/status/"):
+                status = int(path.split("/")[2])
+            elif path.startswith("/redirect/"):
+                status, extra = 301, f"Location: /{path[len('/redirect/'):]}\r\n"
+            elif path.startswith("/slow/"):
+                await asyncio.sleep(float(path.split("/")[2]))
+            body = b"" if method == "HEAD" else b"stub\n"
+            writer.write((f"HTTP/1.1 {status} STUB\r\nContent-Length: 5\r\n{extra}\r\n").encode("latin-1") + body)
+            await writer.drain()
+    except (ConnectionError, ValueError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_stub_server(host="127.0.0.1", port=0):
+    """Start the stub server; returns ``(server, base_url)``."""
+    server = await asyncio.start_server(_stub_handler, host, port)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://{host}:{port}"
+
+
+def stub_url(base_url, url):
+    """Where ``url`` is served by the stub: its host becomes the first path segment."""
+    parts = urlsplit(url)
+    return f"{base_url}/{parts.hostname}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+
+
+# ==================== CLI ====================
+async def _run(urls, args):
+    if not args.stub:
+        return await check_all(urls, args.concurrency, args.per_host, args.timeout)
+    server, base_url = await start_stub_server()
+    try:
+        local = {stub_url(base_url, url): url for url in urls}
+        results, counters = await check_all(local, args.concurrency, args.per_host, args.timeout, proxies={})
+    finally:
+        server.close()
+        await server.wait_closed()
+    return {local[url]: LinkResult(**{**asdict(result), "url": local[url], "final_url": ""})
+            for url, result in results.items()}, counters
+
+
+def main(argv=None):
+    from druginfo import monographs
+
+    parser = argparse.ArgumentParser(description="Check the reference links of the monographs.")
+    parser.add_argument("drugs", nargs="*", help="drug slugs (default: every monograph)")
+    parser.add_argument("--stub", action="store_true", help="check against a local stub server (CI)")
+    parser.add_argument("--force", action="store_true", help="re-check links whose result is still fresh")
+    parser.add_argument("--ttl-hours", type=float, default=TTL_HOURS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=PER_HOST)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT)
+    parser.add_argument("--output", type=Path, default=None,
+                        help="status file (default: $ENTRESTO_LINK_STATUS or link_status.json)")
+    args = parser.parse_args(argv)
+
+    urls = list(dict.fromkeys(url for slug in args.drugs or monographs.available()
+                              for url in reference_urls(monographs.load(slug))))
+    # CI results are about the checker, not the links: never cache them.
+    cached = {} if args.stub else read_results(args.output)
+    stale = [url for url in urls if args.force or url not in cached or not is_fresh(cached[url], args.ttl_hours)]
+
+    started = time.perf_counter()
+    results, counters = asyncio.run(_run(stale, args)) if stale else ({}, {"opened": 0, "reused": 0})
+    elapsed = time.perf_counter() - started
+    if not args.stub:
+        write_results({**cached, **results}, args.output)
+
+    current = {**cached, **results}
+    for url in urls:
+        result = current[url]
+        source = "checked" if url in results else "cached"
+        print(f"{result.state:<8} {result.status or '-':>4} {source:<8} {url}"
+              + (f"  ({result.error})" if result.error else ""))
+    print(f"\n{len(results)} checked, {len(urls) - len(results)} from cache in {elapsed:.2f} s; "
+          f"{counters['opened']} connections opened, {counters['reused']} reused")
+    return 1 if any(current[url].state in ("broken", "error") for url in urls) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Opt-in render instrumentation (``ENTRESTO_METRICS=1``).
+
+When enabled, the page script times every section render, counts the bytes of
+markdown/HTML each section emits (through ``CountingUI``, a ``ui`` wrapper),
+counts the display tables each section builds (``data.build_frame`` and
+``bundle.load`` report to ``REGISTRY``) and counts reruns and sessions, next to the hit rate of the shared HTML fragment cache
+(``fragments.py``). Numbers accumulate in the process-wide ``REGISTRY`` and are exposed
+in two places: a diagnostics panel under the footer (add ``?diagnostics=1`` to
+the URL) and a Prometheus text endpoint served from a background thread::
+
+    curl http://localhost:9464/metrics
+
+The endpoint listens on loopback only; set ``ENTRESTO_METRICS_HOST`` (e.g.
+``0.0.0.0``) to let a scraper on another host reach it.
+
+Nothing here runs unless the app enables it; the table counter is a locked
+increment per table built, which the app caches once per process.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from druginfo import fragments
+
+DEFAULT_PORT = 9464
+DEFAULT_HOST = "127.0.0.1"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+TEXT_METHODS = ("header", "markdown", "write", "caption", "info", "success", "warning", "error")
+OTHER = "other"
+
+_current = threading.local()
+
+
+class SectionStats:
+    __slots__ = ("renders", "seconds", "max_seconds", "buckets", "bytes", "tables")
+
+    def __init__(self):
+        self.renders = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.bytes = 0
+        self.tables = 0
+
+
+class Registry:
+    """Thread-safe counters shared by every session of the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections = {}
+        self.reruns = 0
+        self.sessions = 0
+
+    def _stats(self, section):
+        stats = self.sections.get(section)
+        if stats is None:
+            stats = self.sections[section] = SectionStats()
+        return stats
+
+    @contextmanager
+    def timed(self, section):
+        """Time the block as one render of ``section`` and attribute counts to it."""
+        previous = getattr(_current, "section", None)
+        _current.section = section
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.section = previous
+            with self._lock:
+                stats = self._stats(section)
+                stats.renders += 1
+                stats.seconds += elapsed
+                stats.max_seconds = max(stats.max_seconds, elapsed)
+                for i, bound in enumerate(BUCKETS):
+                    if elapsed <= bound:
+                        stats.buckets[i] += 1
+
+    def count_bytes(self, section, size):
+        with self._lock:
+            self._stats(section).bytes += size
+
+    def count_table(self):
+        """Count one display table built, against the section being rendered."""
+        with self._lock:
+            self._stats(getattr(_current, "section", None) or OTHER).tables += 1
+
+    def count_rerun(self, new_session):
+        with self._lock:
+            self.reruns += 1
+            self.sessions += bool(new_session)
+
+    def snapshot(self):
+        """Return ``(sections, reruns, sessions)`` copied under the lock."""
+        with self._lock:
+            sections = {}
+            for key, stats in self.sections.items():
+                copy = SectionStats()
+                for name in SectionStats.__slots__:
+                    value = getattr(stats, name)
+                    setattr(copy, name, list(value) if isinstance(value, list) else value)
+                sections[key] = copy
+            return sections, self.reruns, self.sessions
+
+
+REGISTRY = Registry()
+
+
+# ==================== INSTRUMENTED BACKEND ====================
+class CountingUI:
+    """``ui`` wrapper that counts the bytes of text a section emits."""
+
+    def __init__(self, ui, section, registry=REGISTRY):
+        self._ui = ui
+        self._section = section
+        self._registry = registry
+
+    def __getattr__(self, name):
+        attribute = getattr(self._ui, name)
+        if name not in TEXT_METHODS:
+            return attribute
+
+        @functools.wraps(attribute)
+        def counted(*args, **kwargs):
+            size = sum(len(arg.encode("utf-8")) for arg in args if isinstance(arg, str))
+            self._registry.count_bytes(self._section, size)
+            return attribute(*args, **kwargs)
+        return counted
+
+
+# ==================== PROMETHEUS ====================
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(registry=REGISTRY):
+    """Render the registry in the Prometheus text exposition format."""
+    sections, reruns, sessions = registry.snapshot()
+    lines = [
+        "# HELP entresto_section_render_seconds Time to render one section, tool included.",
+        "# TYPE entresto_section_render_seconds histogram",
+    ]
+    for key, stats in sorted(sections.items()):
+        if not stats.renders:
+            continue
+        label = f'section="{_label(key)}"'
+        for bound, count in zip(BUCKETS, stats.buckets):
+            lines.append(f'entresto_section_render_seconds_bucket{{{label},le="{bound}"}} {count}')
+        lines.append(f'entresto_section_render_seconds_bucket{{{label},le="+Inf"}} {stats.renders}')
+        lines.append(f"entresto_section_render_seconds_sum{{{label}}} {stats.seconds:.6f}")
+        lines.append(f"entresto_section_render_seconds_count{{{label}}} {stats.renders}")
+
+    lines += [
+        "# HELP entresto_section_emitted_bytes_total Bytes of markdown/HTML text sent by a section.",
+        "# TYPE entresto_section_emitted_bytes_total counter",
+    ]
+    lines += [f'entresto_section_emitted_bytes_total{{section="{_label(key)}"}} {stats.bytes}'
+              for key, stats in sorted(sections.items()) if stats.renders]
+
+    lines += [
+        "# HELP entresto_tables_built_total Display tables built (DataFrame or mapped Arrow), by section.",
+        "# TYPE entresto_tables_built_total counter",
+    ]
+    lines += [f'entresto_tables_built_total{{section="{_label(key)}"}} {stats.tables}'
+              for key, stats in sorted(sections.items())]
+
+    lines += [
+        "# HELP entresto_reruns_total Script runs (page loads and widget interactions).",
+        "# TYPE entresto_reruns_total counter",
+        f"entresto_reruns_total {reruns}",
+        "# HELP entresto_sessions_total Browser sessions started.",
+        "# TYPE entresto_sessions_total counter",
+        f"entresto_sessions_total {sessions}",
+    ]
+
+    fragment_cache = fragments.CACHE.cache_info()
+    lines += [
+        "# HELP entresto_fragment_cache_requests_total Raw-HTML block lookups in the fragment cache.",
+        "# TYPE entresto_fragment_cache_requests_total counter",
+        f'entresto_fragment_cache_requests_total{{result="hit"}} {fragment_cache.hits}',
+        f'entresto_fragment_cache_requests_total{{result="miss"}} {fragment_cache.misses}',
+        "# HELP entresto_fragment_cache_entries Sanitized HTML fragments held.",
+        "# TYPE entresto_fragment_cache_entries gauge",
+        f"entresto_fragment_cache_entries {fragment_cache.currsize}",
+        "# HELP entresto_fragment_cache_bytes Size of the sanitized HTML fragments held.",
+        "# TYPE entresto_fragment_cache_bytes gauge",
+        f"entresto_fragment_cache_bytes {fragment_cache.size_bytes}",
+        "# HELP entresto_fragment_sanitized_removed_total Tags/attributes the sanitizer dropped.",
+        "# TYPE entresto_fragment_sanitized_removed_total counter",
+        f"entresto_fragment_sanitized_removed_total {fragment_cache.removed}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def serve(registry=REGISTRY, port=DEFAULT_PORT, host=DEFAULT_HOST):
+    """Serve ``/metrics`` from a daemon thread; returns the server.
+
+    Binds loopback by default: pass a wider ``host`` only where the port is
+    not reachable from untrusted networks.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text(registry).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
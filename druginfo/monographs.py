@@ -0,0 +1,356 @@
+"""
+Drug monographs loaded from structured data files.
+
+Each drug is one JSON file in ``monographs/`` named after its slug (see
+``entresto.json``): page metadata, the sections as lists of content blocks
+(``sections.py``) and the tables those blocks reference, stored as column
+lists, plus optional contraindication ``screening`` rules (``screening.py``)
+and ``adverse_risk`` modifiers (``risk.py``) compiled on load.
+``load(slug)`` parses, validates and caches a monograph in an LRU of
+``CACHE_SIZE`` entries, so one process can serve hundreds of drugs while
+holding only the recently used ones in memory.
+
+Files are watched: ``load`` re-checks a file's size and mtime at most every
+``POLL_SECONDS`` (``watch`` does it from a background thread instead) and
+swaps in the re-parsed monograph in one step. A ``Monograph`` is never
+modified, so a rerun that already holds one finishes on it and the next
+rerun gets the new one. A file that fails to parse is logged and the last
+good version stays in service.
+
+``Monograph.version`` hashes the whole file; ``table_versions`` and
+``section_versions`` hash each table and each section (its entry plus the
+tables its blocks show). Callers key their derived caches (DataFrames,
+search documents, tool indexes) on the narrowest of these, so an edit to one
+section rebuilds only what depends on it.
+
+Once ``python -m druginfo.bundle`` has built a file's bundle, ``load``
+builds that version from the bundle instead of parsing the file: the
+tables are views of the memory-mapped Arrow files and their column lists
+are never parsed (see ``bundle.py``).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
+
+from druginfo import risk, screening
+from druginfo.sections import BLOCK_TYPES, build_section
+
+MONOGRAPH_DIR = Path(os.environ.get(
+    "ENTRESTO_MONOGRAPH_DIR", Path(__file__).resolve().parent.parent / "monographs"
+))
+DEFAULT_DRUG = "entresto"
+CACHE_SIZE = 64
+POLL_SECONDS = float(os.environ.get("ENTRESTO_RELOAD_SECONDS", 2))
+
+_SLUG = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+log = logging.getLogger(__name__)
+
+
+def _digest(*parts):
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass(frozen=True, eq=False)
+class Monograph:
+    """One parsed version of a drug's file; hashed by identity, never modified."""
+
+    slug: str
+    meta: MappingProxyType
+    sections: tuple
+    tables: MappingProxyType
+    version: str
+    table_versions: MappingProxyType
+    section_versions: MappingProxyType
+    rules: object  # screening.RuleSet, compiled from the "screening" entries
+    risk_model: object  # risk.RiskModel from "adverse_risk", or None
+
+    @property
+    def name(self):
+        return self.meta["name"]
+
+    @cached_property
+    def sections_by_key(self):
+        return {section.key: section for section in self.sections}
+
+    def version_of(self, *tables):
+        """One version string for a group of tables (what a tool reads)."""
+        return _digest(*(f"{name}={self.table_versions.get(name, '')}" for name in tables))
+
+
+def available(directory=None):
+    """Slugs of every monograph file, sorted; reads no file contents."""
+    return sorted(path.stem for path in Path(directory or MONOGRAPH_DIR).glob("*.json")
+                  if _SLUG.match(path.stem))
+
+
+def path_for(slug, directory=None):
+    """Return the data file of ``slug``; ``KeyError`` if there is none."""
+    path = Path(directory or MONOGRAPH_DIR) / f"{slug}.json"
+    if not _SLUG.match(slug) or not path.is_file():
+        raise KeyError(slug)
+    return path
+
+
+# ==================== PARSING ====================
+def _validate(blocks, tables, where):
+    for number, block in enumerate(blocks, 1):
+        kind = block.get("type")
+        if kind not in BLOCK_TYPES:
+            raise ValueError(f"{where}, block {number}: unknown block type {kind!r}")
+        if kind in ("table", "references") and block.get("table") not in tables:
+            raise ValueError(f"{where}, block {number}: unknown table {block.get('table')!r}")
+        if kind == "columns":
+            for column in block["columns"]:
+                _validate(column, tables, where)
+
+
+def _tables_used(blocks):
+    for block in blocks:
+        if block["type"] in ("table", "references"):
+            yield block["table"]
+        elif block["type"] == "columns":
+            for column in block["columns"]:
+                yield from _tables_used(column)
+
+
+def parse(raw, slug):
+    """Build a ``Monograph`` from the bytes of its data file.
+
+    Raises ``ValueError`` for blocks of unknown type or that reference a
+    missing table, so a bad file fails on load rather than mid-render.
+    """
+    return from_document(json.loads(raw), slug, hashlib.sha256(raw).hexdigest()[:12])
+
+
+def from_document(document, slug, version, table_versions=None):
+    """Build a ``Monograph`` from a parsed data file whose bytes hash to ``version``.
+
+    ``table_versions`` is passed when the tables are not the file's lists
+    but views of the built bundle (``bundle.load_monograph``), hashed when
+    the bundle was built.
+    """
+    tables = document.get("tables", {})
+    for name, columns in tables.items():
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"{slug}: table {name!r} has columns of different lengths")
+    for entry in document["sections"]:
+        _validate(entry["blocks"], tables, f"{slug}: section {entry['key']!r}")
+
+    if table_versions is None:
+        table_versions = {name: _digest(json.dumps(columns, ensure_ascii=False)) for name, columns in tables.items()}
+    section_versions = {
+        entry["key"]: _digest(json.dumps(entry, ensure_ascii=False, sort_keys=True),
+                              *(f"{name}={table_versions[name]}" for name in sorted(set(_tables_used(entry["blocks"])))))
+        for entry in document["sections"]
+    }
+    rules = screening.compile_rules(document.get("screening", ()), tables,
+                                    [entry["key"] for entry in document["sections"]])
+    risk_model = risk.compile_model(document.get("adverse_risk"), tables)
+    meta = {key: value for key, value in document.items()
+            if key not in ("sections", "tables", "screening", "adverse_risk")}
+    meta.setdefault("name", slug)
+    return Monograph(
+        slug=slug,
+        meta=MappingProxyType(meta),
+        sections=tuple(build_section(entry) for entry in document["sections"]),
+        tables=MappingProxyType(tables),
+        version=version,
+        table_versions=MappingProxyType(table_versions),
+        section_versions=MappingProxyType(section_versions),
+        rules=rules,
+        risk_model=risk_model,
+    )
+
+
+_names = {}  # slug -> (file signature, name)
+
+
+def display_name(slug):
+    """A drug's ``name`` for pickers and listings, kept apart from the LRU.
+
+    Listing hundreds of drugs must not load (and evict) their monographs, so
+    only the name string of each file is held. It is keyed on the file's
+    signature like the loaded monographs: an edited file is read again, and a
+    half-written one keeps the last name until its next change.
+    """
+    try:
+        path = path_for(slug)
+        signature = _signature(path)
+    except (KeyError, FileNotFoundError):
+        _names.pop(slug, None)
+        raise KeyError(slug) from None
+    cached = _names.get(slug)
+    if cached is None or cached[0] != signature:
+        try:
+            name = json.loads(path.read_bytes()).get("name", slug)
+        except ValueError:
+            if cached is None:
+                raise
+            return cached[1]
+        cached = _names[slug] = (signature, name)
+    return cached[1]
+
+
+# ==================== LOADING AND RELOADING ====================
+def _from_bundle(slug, version):
+    """This version of ``slug`` from its built bundle, or ``None`` (``bundle.load_monograph``)."""
+    try:
+        from druginfo import bundle
+    except ImportError:  # pyarrow is not installed
+        return None
+    return bundle.load_monograph(slug, version)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    reloads: int
+    maxsize: int
+    currsize: int
+
+
+class _Entry:
+    __slots__ = ("monograph", "signature", "checked")
+
+    def __init__(self, monograph, signature, checked):
+        self.monograph, self.signature, self.checked = monograph, signature, checked
+
+
+_loaded = OrderedDict()  # slug -> _Entry, least recently used first
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "reloads": 0}
+
+
+def _signature(path):
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _refresh(slug, entry, now):
+    """Re-check ``slug``'s file; return its current ``_Entry``. Caller holds the lock."""
+    try:
+        path = path_for(slug)
+        signature = _signature(path)
+    except (KeyError, FileNotFoundError):
+        _loaded.pop(slug, None)
+        raise KeyError(slug) from None
+    if entry is not None and signature == entry.signature:
+        entry.checked = now
+        return entry
+
+    raw = path.read_bytes()
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    if entry is not None and version == entry.monograph.version:
+        # Touched or rewritten with the same bytes.
+        entry.signature, entry.checked = signature, now
+        return entry
+    try:
+        monograph = _from_bundle(slug, version) or parse(raw, slug)
+    except ValueError as invalid:  # json.JSONDecodeError is a ValueError
+        if entry is None:
+            raise
+        # Most likely an editor halfway through writing the file: keep the
+        # last good version; the next change of the file is tried again.
+        log.warning("keeping %s version %s: %s", slug, entry.monograph.version, invalid)
+        entry.signature, entry.checked = signature, now
+        return entry
+
+    _stats["misses" if entry is None else "reloads"] += 1
+    if entry is not None:
+        log.info("reloaded %s: version %s -> %s", slug, entry.monograph.version, monograph.version)
+    entry = _loaded[slug] = _Entry(monograph, signature, now)
+    _loaded.move_to_end(slug)
+    while len(_loaded) > CACHE_SIZE:
+        _loaded.popitem(last=False)
+    return entry
+
+
+def load(slug=DEFAULT_DRUG):
+    """Return the current monograph for ``slug`` (``KeyError`` if unknown)."""
+    now = time.monotonic()
+    with _lock:
+        entry = _loaded.get(slug)
+        if entry is not None and now - entry.checked < POLL_SECONDS:
+            _stats["hits"] += 1
+            _loaded.move_to_end(slug)
+            return entry.monograph
+        if entry is not None:
+            _stats["hits"] += 1
+        monograph = _refresh(slug, entry, now).monograph
+        _loaded.move_to_end(slug)
+        return monograph
+
+
+def refresh():
+    """Re-check every loaded monograph now; return the ``(old, new)`` pairs that changed."""
+    changed = []
+    with _lock:
+        now = time.monotonic()
+        for slug, entry in list(_loaded.items()):
+            old = entry.monograph
+            try:
+                new = _refresh(slug, entry, now).monograph
+            except KeyError:
+                log.info("%s was removed", slug)
+                continue
+            if new is not old:
+                changed.append((old, new))
+    return changed
+
+
+def watch(on_change=None, interval=None):
+    """Poll the loaded monographs from a daemon thread; return the thread.
+
+    Swaps happen off the request path, so no rerun pays for a re-parse.
+    ``on_change(old, new)`` runs after each swap, e.g. to rebuild the caches
+    of the sections that changed before a reader asks for them.
+    """
+    interval = POLL_SECONDS if interval is None else interval
+
+    def poll():
+        while True:
+            time.sleep(interval)
+            for old, new in refresh():
+                if on_change is not None:
+                    try:
+                        on_change(old, new)
+                    except Exception:
+                        log.exception("reload hook failed for %s", new.slug)
+
+    thread = threading.Thread(target=poll, name="monograph-watch", daemon=True)
+    thread.start()
+    return thread
+
+
+def changed_sections(old, new):
+    """Keys of the sections of ``new`` that differ from ``old`` (or are new)."""
+    return [key for key, version in new.section_versions.items() if old.section_versions.get(key) != version]
+
+
+def changed_tables(old, new):
+    """Names of the tables of ``new`` that differ from ``old`` (or are new)."""
+    return [name for name, version in new.table_versions.items() if old.table_versions.get(name) != version]
+
+
+def cache_info():
+    with _lock:
+        return CacheInfo(_stats["hits"], _stats["misses"], _stats["reloads"], CACHE_SIZE, len(_loaded))
+
+
+def cache_clear():
+    with _lock:
+        _loaded.clear()
+        _stats.update(hits=0, misses=0, reloads=0)
@@ -0,0 +1,182 @@
+"""
+Concentration-time simulator behind the Pharmacokinetics section.
+
+Each analyte (sacubitril, LBQ657, valsartan) is a one-compartment model with
+first-order input and elimination (Bateman function). The elimination rate
+comes from the half-life in the monograph's ``pk`` table and the input rate
+is solved so the single-dose peak falls at the table's Tmax; for LBQ657 that
+input is its apparent formation rate from sacubitril. Doses every ``TAU_H``
+hours add up by superposition, which has a closed form (a geometric series
+per exponential), so a whole profile is a few NumPy array expressions,
+broadcast over patients, analytes and time points at once.
+
+Impairment is applied as an AUC fold-change (clearance divided by the fold,
+volume unchanged), per the Special Populations notes: eGFR <30 and Child-Pugh
+B each raise AUC ~2-fold. Concentrations are relative, as a percentage of
+the steady-state peak of each analyte at 97/103 mg BID with normal organ
+function; the monograph gives no volumes, so absolute units would be
+invented.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+TABLE = "pk"
+ANALYTES = ("Sacubitril", "LBQ657", "Valsartan")
+PK_COLUMNS = ("Sacubitril", "LBQ657 (Active)", "Valsartan")
+TMAX_ROW = "Tmax"
+HALF_LIFE_ROW = "Half-life"
+
+TAU_H = 12.0  # BID
+REFERENCE_DOSE = "97/103 mg BID"
+DOSES_MG = {"24/26 mg BID": 24, "49/51 mg BID": 49, "97/103 mg BID": 97}
+
+# Analytes whose AUC the Special Populations notes' "~2-fold" applies to.
+# Renal: LBQ657 is the renally excreted analyte (elimination table: 52-68%
+# urine vs 13% for valsartan). Hepatic: all three.
+RENAL_AUC_FOLD = {"Sacubitril": 1.0, "LBQ657": 2.0, "Valsartan": 1.0}
+HEPATIC_AUC_FOLD = {"Sacubitril": 2.0, "LBQ657": 2.0, "Valsartan": 2.0}
+EGFR_AUC_THRESHOLD = 30
+
+_HOURS = re.compile(r"(\d+(?:\.\d+)?)\s*hours?")
+
+
+class Model(NamedTuple):
+    """Per-analyte rate constants (1/h), in ``ANALYTES`` order."""
+
+    ka: tuple
+    ke: tuple
+
+
+# ==================== PARAMETERS ====================
+def _hours(cell):
+    match = _HOURS.search(cell)
+    if not match:
+        raise ValueError(f"no duration in {cell!r}")
+    return float(match.group(1))
+
+
+def _input_rate(tmax, ke):
+    """Solve ``tmax = ln(ka/ke) / (ka - ke)`` for ``ka > ke`` by bisection."""
+    if tmax >= 1 / ke:
+        raise ValueError(f"Tmax {tmax} h is not reachable with t½ {math.log(2) / ke:.1f} h")
+    low, high = ke * (1 + 1e-9), 2 * ke
+    while math.log(high / ke) / (high - ke) > tmax:
+        high *= 2
+    for _ in range(100):
+        middle = (low + high) / 2
+        if math.log(middle / ke) / (middle - ke) > tmax:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def model_from_tables(tables):
+    """Build the ``Model`` from the ``pk`` table's Tmax and half-life rows."""
+    pk = tables[TABLE]
+    rows = {parameter: n for n, parameter in enumerate(pk["Parameter"])}
+    tmax_row = next(n for parameter, n in rows.items() if parameter.startswith(TMAX_ROW))
+    half_life_row = next(n for parameter, n in rows.items() if parameter.startswith(HALF_LIFE_ROW))
+
+    ka, ke = [], []
+    for column in PK_COLUMNS:
+        elimination = math.log(2) / _hours(pk[column][half_life_row])
+        ke.append(elimination)
+        ka.append(_input_rate(_hours(pk[column][tmax_row]), elimination))
+    return Model(tuple(ka), tuple(ke))
+
+
+def auc_folds(egfr=90, child_pugh=None):
+    """Per-analyte AUC fold-change for a patient, in ``ANALYTES`` order."""
+    folds = []
+    for analyte in ANALYTES:
+        fold = 1.0
+        if egfr < EGFR_AUC_THRESHOLD:
+            fold *= RENAL_AUC_FOLD[analyte]
+        if child_pugh == "B":
+            fold *= HEPATIC_AUC_FOLD[analyte]
+        folds.append(fold)
+    return tuple(folds)
+
+
+# ==================== SOLVER ====================
+def concentrations(model, hours, dose_scale, folds, steady_state=False):
+    """Closed-form superposition of BID doses, vectorized.
+
+    ``hours`` (T,) is time since the first dose (or, at steady state, time
+    into a dosing interval); ``dose_scale`` (P,) is each patient's dose
+    relative to the reference dose and ``folds`` (P, 3) the AUC fold-changes.
+    Returns unnormalized concentrations of shape (P, 3, T).
+    """
+    import numpy as np
+
+    t = np.asarray(hours, dtype=float)[None, None, :]
+    ka = np.asarray(model.ka)[None, :, None]
+    ke = np.asarray(model.ke)[None, :, None] / np.asarray(folds, dtype=float)[:, :, None]
+    amplitude = np.asarray(dose_scale, dtype=float)[:, None, None] * ka / (ka - ke)
+
+    if steady_state:
+        since_dose = np.mod(t, TAU_H)
+        doses = np.inf
+    else:
+        doses = np.floor(t / TAU_H) + 1
+        since_dose = t - (doses - 1) * TAU_H
+
+    def accumulated(rate):
+        # Sum over j < doses of exp(-rate * (since_dose + j * tau)).
+        decay = np.exp(-rate * TAU_H)
+        remaining = 0.0 if steady_state else np.exp(-rate * TAU_H * doses)
+        return np.exp(-rate * since_dose) * (1 - remaining) / (1 - decay)
+
+    return amplitude * (accumulated(ke) - accumulated(ka))
+
+
+@lru_cache(maxsize=8)
+def _reference_peaks(model):
+    import numpy as np
+
+    grid = np.linspace(0, TAU_H, 1201)
+    return concentrations(model, grid, [1.0], [(1.0,) * len(ANALYTES)], steady_state=True)[0].max(axis=1)
+
+
+def relative_concentrations(model, hours, dose_scale, folds, steady_state=False):
+    """``concentrations`` as % of each analyte's reference steady-state peak."""
+    return 100 * concentrations(model, hours, dose_scale, folds, steady_state) / _reference_peaks(model)[None, :, None]
+
+
+@lru_cache(maxsize=256)
+def profile(model, dose, folds, days, steady_state=False, points_per_hour=4):
+    """One patient's curves, memoized per parameter set.
+
+    Returns ``(hours, curves)``: ``hours`` (T,) and ``curves`` (3, T) in % of
+    the reference peak; both arrays are read-only because they are shared.
+    """
+    import numpy as np
+
+    span = TAU_H if steady_state else 24.0 * days
+    hours = np.linspace(0, span, int(span * points_per_hour) + 1)
+    curves = relative_concentrations(model, hours, [DOSES_MG[dose] / DOSES_MG[REFERENCE_DOSE]], [folds],
+                                     steady_state)[0]
+    hours.flags.writeable = curves.flags.writeable = False
+    return hours, curves
+
+
+def steady_state_summary(model, dose, folds):
+    """Per-analyte steady-state peak, trough, accumulation and time to 90 % of steady state."""
+    import numpy as np
+
+    _, curves = profile(model, dose, folds, 1, steady_state=True)
+    ke = np.asarray(model.ke) / np.asarray(folds)
+    accumulation = 1 / (1 - np.exp(-ke * TAU_H))
+    # Trough-to-trough approach is 1 - exp(-ke * n * tau); 90 % after n doses.
+    doses_to_90 = np.ceil(np.log(10) / (ke * TAU_H))
+    return [
+        {"Analyte": analyte, "Peak (%)": round(float(curves[i].max()), 1),
+         "Trough (%)": round(float(curves[i].min()), 1),
+         "Accumulation ratio": round(float(accumulation[i]), 2),
+         "90% of steady state": f"{doses_to_90[i] * TAU_H / 24:.1f} days"}
+        for i, analyte in enumerate(ANALYTES)
+    ]
@@ -0,0 +1,217 @@
+"""
+Expected adverse-event counts for a patient cohort.
+
+A monograph's ``"adverse_risk"`` entry says which table holds the incidence
+rates and which special populations change them::
+
+    "adverse_risk": {
+      "table": "adverse", "event": "Adverse Reaction",
+      "rate": "ENTRESTO (%)", "comparator": "Enalapril (%)", "n": 4203,
+      "populations": [
+        {"row": 1, "when": {"black": true}, "rates": [{"event": 6, "rate": "2.4%"}]},
+        {"row": 2, "when": {"age": {"ge": 65}}, "events": [1]}
+      ]
+    }
+
+``n`` is the number of patients the rates were observed in; ``row`` is the
+population's row in ``special_pop_ae`` and ``event`` a row of the rate
+table. ``when`` uses the screening condition language (``screening.py``). A
+population with ``rates`` replaces the overall rate for its patients (the
+highest applies when a patient is in several); one with only ``events`` has
+a raised risk the label does not quantify, so its patients are counted for
+monitoring but the rate is left as is.
+
+``compile_model`` runs when the monograph is loaded. ``RiskModel.estimate``
+evaluates the population masks once per cohort, then works on the distinct
+population combinations rather than on patients: the expected count is
+``counts @ rates`` and the bootstrap resamples the cohort as a multinomial
+draw over the combinations, the rates as binomial draws of ``n`` (when the
+population gives its own ``n``; otherwise its rate is taken as exact) and
+the events as binomial draws per combination -- the same distribution as
+resampling patients one by one, at a cost independent of cohort size.
+"""
+
+import re
+from dataclasses import dataclass
+
+from druginfo import screening
+
+BOOTSTRAP_SAMPLES = 2000
+CONFIDENCE = 0.95
+SPECIAL_POPULATIONS = "special_pop_ae"
+
+_PERCENT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*%\s*$")
+
+
+def percent(text):
+    """``"18%"`` -> ``0.18``."""
+    match = _PERCENT.match(str(text))
+    if match is None:
+        raise ValueError(f"not a percentage: {text!r}")
+    return float(match.group(1)) / 100
+
+
+@dataclass(frozen=True)
+class Population:
+    id: str
+    label: str  # the special_pop_ae "Population" cell
+    risks: str
+    monitoring: str
+    rates: tuple  # ((event index, rate, n or None), ...)
+    events: tuple  # event indexes whose risk is raised but not quantified
+
+
+# ==================== COMPILATION ====================
+def compile_model(spec, tables):
+    """Validate a monograph's ``adverse_risk`` entry into a ``RiskModel`` (``None`` if absent)."""
+    if not spec:
+        return None
+    table = tables.get(spec["table"])
+    if table is None:
+        raise ValueError(f"adverse_risk: unknown table {spec['table']!r}")
+    for column in (spec["event"], spec["rate"], spec.get("comparator")):
+        if column is not None and column not in table:
+            raise ValueError(f"adverse_risk: {spec['table']!r} has no column {column!r}")
+    rows = list(table["#"])
+    events = tuple(table[spec["event"]])
+    rates = tuple(percent(value) for value in table[spec["rate"]])
+    comparator = tuple(percent(value) for value in table[spec["comparator"]]) if spec.get("comparator") else None
+
+    def event_index(row, where):
+        if row not in rows:
+            raise ValueError(f"{where}: no row #{row!r} in {spec['table']!r}")
+        return rows.index(row)
+
+    special = tables.get(SPECIAL_POPULATIONS, {"#": ()})
+    kinds, conditions, populations = {}, [], []
+    for entry in spec.get("populations", ()):
+        where = f"adverse_risk population #{entry.get('row')!r}"
+        if entry.get("row") not in special["#"]:
+            raise ValueError(f"{where}: no such row in {SPECIAL_POPULATIONS!r}")
+        index = list(special["#"]).index(entry["row"])
+        conditions.append(screening.compile_condition(entry["when"], kinds, where))
+        populations.append(Population(
+            id=str(entry.get("id", entry["row"])),
+            label=special["Population"][index],
+            risks=special["Specific Risks"][index],
+            monitoring=special["Monitoring"][index],
+            rates=tuple((event_index(item["event"], where), percent(item["rate"]), item.get("n"))
+                        for item in entry.get("rates", ())),
+            events=tuple(event_index(row, where) for row in entry.get("events", ())),
+        ))
+    return RiskModel(events, rates, comparator, spec.get("n"), tuple(populations),
+                     screening.ConditionSet(tuple(conditions), kinds))
+
+
+# ==================== ESTIMATION ====================
+@dataclass(frozen=True)
+class Estimate:
+    patients: int
+    # DataFrame, one row per adverse event.
+    events: object
+    # DataFrame, one row per special population.
+    populations: object
+    missing_fields: list
+
+
+class RiskModel:
+    """Incidence rates and population modifiers of one monograph."""
+
+    def __init__(self, events, rates, comparator, n, populations, conditions):
+        self.events = events
+        self.rates = rates
+        self.comparator = comparator
+        self.n = n
+        self.populations = populations
+        self.conditions = conditions
+
+    @property
+    def fields(self):
+        return dict(self.conditions.kinds)
+
+    def _combinations(self, columns):
+        """Distinct population memberships in the cohort and how many patients have each."""
+        import numpy as np
+
+        masks, missing = self.conditions.masks(columns)
+        codes = np.zeros(len(masks[0]) if masks else screening.cohort_length(columns), dtype=np.int64)
+        for bit, mask in enumerate(masks):
+            codes |= mask.astype(np.int64) << bit
+        combinations, counts = np.unique(codes, return_counts=True)
+        return masks, combinations, counts, missing
+
+    def _rate_matrix(self, combinations, base, modifiers):
+        """Per-combination event rates: ``base`` (..., events) with each matching
+        population's rate in ``modifiers`` (..., modifiers) raised over it."""
+        import numpy as np
+
+        rates = np.broadcast_to(base[..., None, :], base.shape[:-1] + (len(combinations), len(self.events))).copy()
+        column = 0
+        for bit, population in enumerate(self.populations):
+            member = (combinations >> bit & 1).astype(bool)
+            for event, _, _ in population.rates:
+                current = rates[..., member, event]
+                rates[..., member, event] = np.maximum(current, modifiers[..., column, None])
+                column += 1
+        return rates
+
+    def estimate(self, columns, samples=BOOTSTRAP_SAMPLES, confidence=CONFIDENCE, seed=0):
+        """Expected event counts for a cohort (a DataFrame or mapping of columns)."""
+        import numpy as np
+        import pandas as pd
+
+        masks, combinations, counts, missing = self._combinations(columns)
+        patients = int(counts.sum())
+        base = np.array(self.rates)
+        quantified = [(rate, n) for population in self.populations for _, rate, n in population.rates]
+        modifiers = np.array([rate for rate, _ in quantified])
+        expected = counts @ self._rate_matrix(combinations, base, modifiers)
+
+        rng = np.random.default_rng(seed)
+        low = high = np.full(len(self.events), np.nan)
+        if patients and samples:
+            drawn_base = rng.binomial(self.n, base, size=(samples, len(base))) / self.n if self.n else \
+                np.broadcast_to(base, (samples, len(base)))
+            drawn_modifiers = np.column_stack([
+                rng.binomial(n, rate, size=samples) / n if n else np.full(samples, rate) for rate, n in quantified
+            ]) if quantified else np.empty((samples, 0))
+            rates = self._rate_matrix(combinations, drawn_base, drawn_modifiers)  # (samples, combinations, events)
+            cohorts = rng.multinomial(patients, counts / patients, size=samples)  # (samples, combinations)
+            totals = rng.binomial(cohorts[:, :, None], rates).sum(axis=1)  # (samples, events)
+            tail = (1 - confidence) / 2 * 100
+            low, high = np.percentile(totals, [tail, 100 - tail], axis=0)
+
+        level = f"{confidence:.0%}"
+
+        def patients_in(selects):
+            """Per event, the patients in any population that ``selects`` it."""
+            total = np.zeros(len(self.events), dtype=np.int64)
+            for event in range(len(self.events)):
+                bits = [bit for bit, population in enumerate(self.populations) if selects(population, event)]
+                if bits:
+                    member = np.bitwise_or.reduce([combinations >> bit & 1 for bit in bits]).astype(bool)
+                    total[event] = counts[member].sum()
+            return total
+        events = pd.DataFrame({
+            "Adverse Reaction": self.events,
+            "Rate": [f"{rate:.1%}" for rate in self.rates],
+            "Patients at a population rate": patients_in(
+                lambda population, event: any(item[0] == event for item in population.rates)),
+            "Patients at unquantified higher risk": patients_in(lambda population, event: event in population.events),
+            "Expected events": expected.round(1),
+            f"{level} interval": [f"{a:,.0f}–{b:,.0f}" if a == a else "" for a, b in zip(low, high)],
+            "Per 1,000 patients": (1000 * expected / patients).round(1) if patients else np.nan,
+        })
+        if self.comparator is not None:
+            events["Expected on comparator"] = (patients * np.array(self.comparator)).round(1)
+
+        populations = pd.DataFrame({
+            "Population": [population.label for population in self.populations],
+            "Patients": [int(mask.sum()) for mask in masks],
+            "Share": [f"{mask.mean():.1%}" if patients else "" for mask in masks],
+            "Rate change": ["applied" if population.rates else "not quantified (monitor)"
+                            for population in self.populations],
+            "Specific Risks": [population.risks for population in self.populations],
+            "Monitoring": [population.monitoring for population in self.populations],
+        })
+        return Estimate(patients, events, populations, missing)
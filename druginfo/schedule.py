@@ -0,0 +1,206 @@
+"""
+Washout and titration timeline on top of the dosing rules.
+
+Turns a ``DosePlan`` into dated events: the earliest safe first dose (the
+36-hour ACE inhibitor washout counted from the last ACEi dose), each dose
+increase, the target dose and the BP/K+/creatinine checks around them.
+``to_ical`` exports a schedule as an iCalendar file for the clinic's
+calendar; ``calculate_schedules`` plans a whole patient list in one
+vectorized pass on top of ``dosing.calculate_doses``.
+
+Times are naive local clinic times unless the caller passes aware datetimes
+(single patient only); the two must not be mixed.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+
+from druginfo import dosing
+
+# ==================== RULE CONSTANTS ====================
+# "Recheck BP, K+ and creatinine 1-2 weeks after starting and after each
+# dose increase" (Dosage tab): planned at the early end of that window.
+LAB_RECHECK_DAYS = 7
+DEFAULT_START_TIME = time(8, 0)
+FIRST_DOSE_MINUTES = 30
+
+# A cohort plan has one column per possible dose increase / lab recheck.
+MAX_INCREASES = max(len(dosing.ADULT_LADDER), len(dosing.PEDIATRIC_MG_PER_KG_LADDER)) - 1
+
+PRODID = "-//entresto-drug-info//Titration Schedule//EN"
+
+
+@dataclass(frozen=True)
+class Event:
+    when: datetime
+    kind: str  # "start", "labs", "increase" or "target"
+    summary: str
+    detail: str = ""
+
+
+@dataclass(frozen=True)
+class Schedule:
+    plan: dosing.DosePlan
+    washout_ends: object  # datetime, or None when no washout applies
+    first_dose: object  # datetime, or None when not recommended
+    events: tuple
+
+
+# ==================== SINGLE PATIENT ====================
+def build_schedule(weight_kg, egfr, child_pugh=None, prior_agent="none", prior_daily_dose_mg=0,
+                   sbp=120, pediatric=False, last_acei_dose=None, not_before=None):
+    """Return the ``Schedule`` for one patient.
+
+    Patient arguments are those of ``dosing.calculate_dose``. The first dose
+    is the later of ``not_before`` (default: now) and, after an ACE
+    inhibitor, ``last_acei_dose`` plus the washout. Raises ``ValueError`` if
+    the washout applies but ``last_acei_dose`` is missing.
+    """
+    plan = dosing.calculate_dose(weight_kg, egfr, child_pugh, prior_agent, prior_daily_dose_mg, sbp, pediatric)
+    if not_before is None:
+        not_before = datetime.now(last_acei_dose.tzinfo if last_acei_dose else None).replace(second=0, microsecond=0)
+
+    washout_ends = None
+    if plan.washout_hours:
+        if last_acei_dose is None:
+            raise ValueError("last_acei_dose is required to time the ACE inhibitor washout")
+        washout_ends = last_acei_dose + timedelta(hours=plan.washout_hours)
+    if not plan.recommended:
+        return Schedule(plan, washout_ends, None, ())
+
+    start = max(not_before, washout_ends) if washout_ends else not_before
+    events = [
+        Event(start, "start", f"First dose: {plan.starting_dose}",
+              f"{plan.washout_hours} h after the last ACE inhibitor dose" if washout_ends else ""),
+        Event(start, "labs", "Baseline BP, K+ and creatinine/eGFR", "Before the first dose"),
+    ]
+    for number, step in enumerate(plan.schedule):
+        when = start + timedelta(weeks=step.week)
+        if number:
+            last = number == len(plan.schedule) - 1
+            events.append(Event(when, "target" if last else "increase",
+                                f"{'Target dose' if last else 'Dose increase'}: {step.dose}",
+                                "If BP, K+ and renal function allow"))
+        events.append(Event(when + timedelta(days=LAB_RECHECK_DAYS), "labs", "Recheck BP, K+ and creatinine",
+                            f"{LAB_RECHECK_DAYS} days on {step.dose}"))
+    events.sort(key=lambda event: event.when)
+    return Schedule(plan, washout_ends, start, tuple(events))
+
+
+# ==================== ICALENDAR ====================
+def _escape(text):
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line):
+    """Fold a content line at 75 octets (RFC 5545 3.1) without splitting a character."""
+    parts, current = [], ""
+    for char in line:
+        if len((current + char).encode("utf-8")) > (75 if not parts else 74):
+            parts.append(current)
+            current = ""
+        current += char
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _datetime(value):
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def to_ical(schedule, calendar_name="ENTRESTO titration", stamp=None):
+    """Return ``schedule`` as an iCalendar (``.ics``) document.
+
+    The first dose is a timed event (the washout makes the hour matter);
+    dose changes and lab checks are all-day events on their date. Event UIDs
+    are derived from their content, so re-importing an unchanged schedule
+    updates the events instead of duplicating them.
+    """
+    stamp = _datetime((stamp or datetime.now(timezone.utc)).astimezone(timezone.utc))
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN", "METHOD:PUBLISH",
+             f"X-WR-CALNAME:{_escape(calendar_name)}"]
+    for event in schedule.events:
+        uid = hashlib.sha256(f"{event.when.isoformat()}|{event.kind}|{event.summary}".encode("utf-8")).hexdigest()
+        lines += ["BEGIN:VEVENT", f"UID:{uid[:24]}@entresto-drug-info", f"DTSTAMP:{stamp}"]
+        if event.kind == "start":
+            lines += [f"DTSTART:{_datetime(event.when)}", f"DURATION:PT{FIRST_DOSE_MINUTES}M"]
+        else:
+            day = event.when.date()
+            lines += [f"DTSTART;VALUE=DATE:{day:%Y%m%d}", f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+                      "TRANSP:TRANSPARENT"]
+        lines += [f"SUMMARY:{_escape(event.summary)}", f"CATEGORIES:{event.kind.upper()}"]
+        if event.detail:
+            lines.append(f"DESCRIPTION:{_escape(event.detail)}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+# ==================== COHORT ====================
+def calculate_schedules(frame, not_before=None):
+    """Plan every patient of a DataFrame in one vectorized pass.
+
+    Takes the columns of ``dosing.calculate_doses`` plus an optional
+    ``last_acei_dose`` (date/time; required for rows with
+    ``prior_agent=acei``) and returns its result with ``washout_ends``,
+    ``first_dose``, ``dose_increase_1..N``, ``target_reached`` and
+    ``lab_check_1..N+1`` appended. ``not_before`` (default: today at
+    ``DEFAULT_START_TIME``) is the earliest first dose for every row. Dates
+    are ``NaT`` where they do not apply; ``schedule_note`` says why a
+    recommended patient has no first dose.
+    """
+    import numpy as np
+    import pandas as pd
+
+    result = dosing.calculate_doses(frame)
+    n = len(result)
+    if not_before is None:
+        not_before = datetime.combine(date.today(), DEFAULT_START_TIME)
+    not_before = np.datetime64(pd.Timestamp(not_before).tz_localize(None), "m")
+    nat = np.datetime64("NaT", "m")
+
+    if "last_acei_dose" in frame.columns:
+        last = pd.to_datetime(frame["last_acei_dose"], errors="coerce")
+        if getattr(last.dt, "tz", None) is not None:
+            last = last.dt.tz_localize(None)
+        last = last.to_numpy(dtype="datetime64[m]")
+    else:
+        last = np.full(n, nat)
+
+    recommended = (result["status"] == "recommended").to_numpy()
+    washout_hours = result["washout_hours"].to_numpy()
+    needs_washout = washout_hours > 0
+    washout_ends = np.where(needs_washout, last + washout_hours.astype("timedelta64[h]"), nat)
+    # np.maximum propagates NaT, so a missing last ACEi dose leaves no start.
+    first_dose = np.where(needs_washout, np.maximum(washout_ends, not_before), not_before)
+    first_dose = np.where(recommended, first_dose, nat)
+
+    pediatric = result["pediatric"] if "pediatric" in result.columns else pd.Series(False, index=result.index)
+    pediatric = pediatric.fillna(False).astype(str).str.strip().str.lower().isin(dosing.TRUE_VALUES).to_numpy()
+    interval_weeks = np.where(pediatric, dosing.PEDIATRIC_TITRATION_INTERVAL_WEEKS, dosing.TITRATION_INTERVAL_WEEKS)
+    weeks_to_target = result["weeks_to_target"].to_numpy()
+    increases = weeks_to_target // interval_weeks
+
+    start_day = first_dose.astype("datetime64[D]")
+    interval = (interval_weeks * 7).astype("timedelta64[D]")
+    day_nat = np.datetime64("NaT", "D")
+    planned = {
+        "washout_ends": washout_ends,
+        "first_dose": first_dose,
+    }
+    for k in range(1, MAX_INCREASES + 1):
+        planned[f"dose_increase_{k}"] = np.where(increases >= k, start_day + k * interval, day_nat)
+    planned["target_reached"] = start_day + (weeks_to_target * 7).astype("timedelta64[D]")
+    for k in range(MAX_INCREASES + 1):
+        planned[f"lab_check_{k + 1}"] = np.where(
+            increases >= k, start_day + k * interval + np.timedelta64(LAB_RECHECK_DAYS, "D"), day_nat)
+
+    for name, values in planned.items():
+        result[name] = values.astype("datetime64[s]")
+    result["schedule_note"] = pd.Categorical(
+        np.where(recommended & np.isnat(first_dose), "last_acei_dose needed to time the washout", ""))
+    return result
@@ -0,0 +1,404 @@
+"""
+Contraindication screening compiled from a monograph's rule set.
+
+A monograph lists its screening rules declaratively under ``"screening"``:
+each rule has an ``id``, an ``action`` (see ``ACTIONS``), a ``title``, a
+``when`` condition over patient fields and the table rows or section
+headings it comes from (``cite``). A condition maps fields to tests::
+
+    {"egfr": {"lt": 15}}                       egfr < 15
+    {"aliskiren": true, "diabetes": true}      both (all tests must hold)
+    [{"egfr": {"lt": 15}}, {"dialysis": true}] either (a list is any-of)
+
+Tests are a literal (equality) or ``{op: value}`` with ``eq ne lt le gt ge
+in``. A field's kind (yes/no, number or text) follows from the literals it
+is tested against; text compares case-insensitively.
+
+``compile_rules`` runs when the monograph is loaded (``monographs.parse``),
+so an unknown operator, a field used as two kinds or a citation of a
+missing table row fails the load. It returns a ``RuleSet`` that screens:
+
+* one record (a dict) with per-test closures, returning the ``Finding``s and
+  the rules that could not be evaluated because a field was missing;
+* a cohort (DataFrame or mapping of columns) with NumPy: every distinct
+  test is one vectorized comparison, shared by the rules that use it, and
+  each rule is a few boolean ANDs/ORs over those masks.
+
+The condition language and its evaluation (``compile_condition``,
+``ConditionSet``) are shared with ``risk.py``.
+
+A missing value never fires a rule; single-record screening reports it.
+"""
+
+import math
+import operator
+from dataclasses import dataclass
+from types import MappingProxyType
+
+# Most to least severe; a patient's screen result is the most severe action fired.
+ACTIONS = ("contraindicated", "avoid", "not_recommended")
+CLEAR = "clear"
+# Prefix of the per-rule columns of a cohort screen: rule ids such as
+# "hypersensitivity" are also input field names.
+RULE_COLUMN_PREFIX = "rule_"
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "in": lambda value, options: value in options,
+}
+BOOL, NUMBER, TEXT = "yes/no", "number", "text"
+
+# Spellings of "yes"/"no" accepted for yes/no fields, as in the bulk dose upload.
+TRUE_VALUES = ("true", "1", "yes", "y")
+FALSE_VALUES = ("false", "0", "no", "n")
+
+
+@dataclass(frozen=True)
+class Citation:
+    table: str  # or "" for a section citation
+    row: object  # the row's "#" value
+    section: str
+    text: str
+
+    def __str__(self):
+        where = f"{self.table} #{self.row}" if self.table else f"section {self.section}"
+        return f"{where}: {self.text}"
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    action: str
+    title: str
+    citations: tuple
+
+
+@dataclass(frozen=True)
+class Finding:
+    rule: Rule
+    # The fields and values that made the rule fire.
+    evidence: MappingProxyType
+
+
+# ==================== COMPILATION ====================
+def _kind(value):
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, (int, float)):
+        return NUMBER
+    if isinstance(value, str):
+        return TEXT
+    if isinstance(value, list) and value:
+        kinds = {_kind(item) for item in value}
+        if len(kinds) == 1:
+            return kinds.pop()
+    raise ValueError(f"unsupported test value {value!r}")
+
+
+def _literal(kind, value):
+    if isinstance(value, list):
+        return frozenset(_literal(kind, item) for item in value)
+    return value.strip().lower() if kind == TEXT else value
+
+
+def _tests(condition, where):
+    """``[(field, op, value)]`` of one all-of condition."""
+    if not isinstance(condition, dict) or not condition:
+        raise ValueError(f"{where}: a condition is a non-empty object of field tests")
+    tests = []
+    for field, test in condition.items():
+        for op, value in (test.items() if isinstance(test, dict) else [("eq", test)]):
+            if op not in OPERATORS:
+                raise ValueError(f"{where}: unknown operator {op!r} for {field!r}")
+            if (op == "in") != isinstance(value, list):
+                raise ValueError(f"{where}: {field!r} {op} needs {'a list' if op == 'in' else 'a single value'}")
+            tests.append((field, op, value))
+    return tests
+
+
+def _citation(cite, tables, sections, where):
+    if "table" in cite:
+        table = tables.get(cite["table"])
+        if table is None or cite.get("row") not in table.get("#", ()):
+            raise ValueError(f"{where}: cites missing row {cite.get('table')!r} #{cite.get('row')!r}")
+        index = list(table["#"]).index(cite["row"])
+        first_text = next(name for name in table if name != "#")
+        return Citation(cite["table"], cite["row"], cite.get("section", ""), str(table[first_text][index]))
+    if cite.get("section") not in sections:
+        raise ValueError(f"{where}: cites missing section {cite.get('section')!r}")
+    return Citation("", None, cite["section"], cite.get("heading", ""))
+
+
+def compile_condition(when, kinds, where):
+    """One ``when`` as a tuple of alternatives, each a tuple of ``(field, op, literal)``.
+
+    Records each field's kind in ``kinds`` (shared by the conditions of one
+    set) and rejects a field tested as two kinds.
+    """
+    compiled = []
+    for alternative in when if isinstance(when, list) else [when]:
+        tests = []
+        for field, op, value in _tests(alternative, where):
+            kind = _kind(value)
+            if kinds.setdefault(field, kind) != kind:
+                raise ValueError(f"{where}: field {field!r} is tested as {kind} and as {kinds[field]}")
+            if kind == BOOL and op not in ("eq", "ne"):
+                raise ValueError(f"{where}: yes/no field {field!r} only supports eq/ne")
+            tests.append((field, op, _literal(kind, value)))
+        compiled.append(tuple(tests))
+    return tuple(compiled)
+
+
+def compile_rules(entries, tables, sections=()):
+    """Validate and compile a monograph's ``screening`` entries into a ``RuleSet``.
+
+    ``tables`` are the monograph's column lists and ``sections`` its section
+    keys, for resolving citations.
+    """
+    kinds, rules, conditions = {}, [], []
+    for number, entry in enumerate(entries, 1):
+        where = f"screening rule {entry.get('id', number)!r}"
+        if entry.get("action") not in ACTIONS:
+            raise ValueError(f"{where}: action must be one of {ACTIONS}")
+        conditions.append(compile_condition(entry["when"], kinds, where))
+        citations = tuple(_citation(cite, tables, sections, where) for cite in entry.get("cite", ()))
+        rules.append(Rule(entry["id"], entry["action"], entry["title"], citations))
+    if len({rule.id for rule in rules}) != len(rules):
+        raise ValueError("screening rule ids must be unique")
+    return RuleSet(tuple(rules), tuple(conditions), MappingProxyType(kinds))
+
+
+# ==================== SCALAR COERCION ====================
+def _missing(value):
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    try:
+        return bool(value != value)  # NaN, NaT
+    except TypeError:  # pandas.NA
+        return True
+
+
+def parse(kind, value):
+    """One record value as the field's kind, or ``None`` when missing.
+
+    Raises ``ValueError`` for a value that is not of the kind (``"maybe"``
+    for a yes/no field, ``"abc"`` or ``inf`` for a number).
+    """
+    if _missing(value):
+        return None
+    if kind == BOOL:
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError(f"expected {kind} ({'/'.join(TRUE_VALUES + FALSE_VALUES)}), got {value!r}")
+    if kind == NUMBER:
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"expected a {kind}, got {value!r}") from None
+        if math.isnan(number):
+            return None
+        if math.isinf(number):
+            raise ValueError(f"expected a finite {kind}, got {value!r}")
+        return number
+    return str(value).strip().lower()
+
+
+def coerce(kind, value):
+    """One record value as the field's kind, or ``None`` when missing/unreadable."""
+    try:
+        return parse(kind, value)
+    except ValueError:
+        return None
+
+
+# ==================== CONDITION SET ====================
+def cohort_length(columns):
+    """Number of patients in a cohort: a DataFrame's rows, or the length of a
+    mapping's first column (``len`` of a mapping counts its columns)."""
+    import pandas as pd
+
+    return len(columns) if isinstance(columns, pd.DataFrame) else len(next(iter(columns.values()), ()))
+
+
+class ConditionSet:
+    """Compiled ``when`` conditions over a shared set of patient fields.
+
+    The evaluation engine behind ``RuleSet``; other record/cohort estimators
+    (``risk.py``) use it for their population definitions.
+    """
+
+    def __init__(self, conditions, kinds):
+        self.conditions = conditions
+        self.kinds = kinds
+        # Distinct tests, numbered, so a cohort screen evaluates each once.
+        self.tests = tuple(dict.fromkeys(test for condition in conditions for tests in condition for test in tests))
+        index = {test: n for n, test in enumerate(self.tests)}
+        self._plans = tuple(tuple(tuple(index[test] for test in tests) for tests in condition)
+                            for condition in conditions)
+        self._checks = tuple(self._scalar_check(field, op, value) for field, op, value in self.tests)
+
+    def _scalar_check(self, field, op, literal):
+        kind, compare = self.kinds[field], OPERATORS[op]
+
+        def check(record):
+            value = coerce(kind, record.get(field))
+            return None if value is None else compare(value, literal)
+        return check
+
+    # ---------- one record ----------
+    def match(self, record):
+        """Per condition: the fields of the alternative that held, ``None``
+        when it could only be decided with missing fields, or ``()`` when it
+        does not hold."""
+        results = [check(record) for check in self._checks]
+        matches = []
+        for plan in self._plans:
+            outcome = ()
+            for tests in plan:
+                outcomes = [results[n] for n in tests]
+                if all(outcomes):
+                    outcome = tuple(dict.fromkeys(self.tests[n][0] for n in tests))
+                    break
+                if False not in outcomes:
+                    outcome = None
+            matches.append(outcome)
+        return matches
+
+    # ---------- cohort ----------
+    def _column(self, columns, field, length):
+        import numpy as np
+        import pandas as pd
+
+        kind = self.kinds[field]
+        if field not in columns:
+            return None
+        # Check the dtype before converting: a text column as a NumPy array is
+        # a million Python strings.
+        series = pd.Series(columns[field], copy=False).reset_index(drop=True)
+        if kind == BOOL:
+            if series.dtype == bool:
+                return series.to_numpy(), np.ones(length, dtype=bool)
+            text = series.astype("string").str.strip().str.lower()
+            yes, no = text.isin(TRUE_VALUES).to_numpy(), text.isin(FALSE_VALUES).to_numpy()
+            return yes, yes | no
+        if kind == NUMBER:
+            if not pd.api.types.is_numeric_dtype(series) or series.dtype == bool:
+                series = pd.to_numeric(series, errors="coerce")
+            array = series.to_numpy(dtype=float, na_value=np.nan)
+            return array, ~np.isnan(array)
+        text = series.astype("string").str.strip().str.lower()
+        known = text.notna() & (text != "")
+        # Text stays a pandas string Series: its comparisons run in Arrow.
+        return text.fillna(""), known.to_numpy()
+
+    def masks(self, columns):
+        """Evaluate every condition over a cohort (a DataFrame or a mapping of
+        equal-length columns).
+
+        Returns ``(masks, missing_fields)``: one boolean array per condition
+        and the fields absent from the input, whose tests never hold.
+        """
+        import numpy as np
+        import pandas as pd
+
+        length = cohort_length(columns)
+        fields = {field: self._column(columns, field, length) for field in self.kinds}
+
+        tested = []
+        for field, op, literal in self.tests:
+            column = fields[field]
+            if column is None:
+                tested.append(np.zeros(length, dtype=bool))
+                continue
+            values, known = column
+            if op == "in":
+                hit = values.isin(list(literal)) if isinstance(values, pd.Series) else np.isin(values, list(literal))
+            else:
+                with np.errstate(invalid="ignore"):
+                    hit = OPERATORS[op](values, literal)
+            tested.append(np.asarray(hit, dtype=bool) & known)
+
+        masks = []
+        for plan in self._plans:
+            hit = np.zeros(length, dtype=bool)
+            for tests in plan:
+                hit |= np.logical_and.reduce([tested[n] for n in tests]) if len(tests) > 1 else tested[tests[0]]
+            masks.append(hit)
+        return masks, [field for field, column in fields.items() if column is None]
+
+
+# ==================== RULE SET ====================
+class RuleSet(ConditionSet):
+    """Compiled screening rules of one monograph."""
+
+    def __init__(self, rules, conditions, kinds):
+        super().__init__(conditions, kinds)
+        self.rules = rules
+        self.by_id = MappingProxyType({rule.id: rule for rule in rules})
+
+    def __len__(self):
+        return len(self.rules)
+
+    def screen(self, record):
+        """Return ``(findings, unevaluated)`` for one patient record (a mapping).
+
+        ``unevaluated`` are the ids of rules that did not fire but might
+        have, had the missing fields been given.
+        """
+        findings, unevaluated = [], []
+        for rule, fields in zip(self.rules, self.match(record)):
+            if fields:
+                findings.append(Finding(rule, MappingProxyType({field: record.get(field) for field in fields})))
+            elif fields is None:
+                unevaluated.append(rule.id)
+        return findings, unevaluated
+
+    def screen_frame(self, columns):
+        """Screen a cohort: a DataFrame or a mapping of equal-length columns.
+
+        Returns a DataFrame (same index for a DataFrame input) with one
+        boolean column per rule (``rule_<id>``), ``screen_result`` (the most severe action
+        fired, or ``"clear"``) and ``screen_findings`` (the fired rule ids,
+        comma-separated). Fields absent from the input are listed in
+        ``result.attrs["missing_fields"]``; their tests never fire.
+        """
+        import numpy as np
+        import pandas as pd
+
+        masks, missing = self.masks(columns)
+        index = columns.index if isinstance(columns, pd.DataFrame) else None
+        length = len(masks[0]) if masks else cohort_length(columns)
+        mask_codes = np.zeros(length, dtype=np.int64)
+        for bit, hit in enumerate(masks):
+            mask_codes |= hit.astype(np.int64) << bit
+
+        result = pd.DataFrame({RULE_COLUMN_PREFIX + rule.id: hit for rule, hit in zip(self.rules, masks)},
+                              index=index)
+        # Every distinct combination of fired rules maps to one label, so the
+        # text columns are categoricals built from a handful of strings.
+        combinations, codes = np.unique(mask_codes, return_inverse=True)
+        findings, worst = [], []
+        for combination in combinations.tolist():
+            ids = [rule.id for bit, rule in enumerate(self.rules) if combination >> bit & 1]
+            findings.append(", ".join(ids))
+            actions = {self.by_id[rule_id].action for rule_id in ids}
+            worst.append(next((action for action in ACTIONS if action in actions), CLEAR))
+        codes = codes.reshape(-1)
+        result["screen_result"] = pd.Categorical.from_codes(
+            np.array([ACTIONS.index(w) if w != CLEAR else len(ACTIONS) for w in worst])[codes],
+            categories=[*ACTIONS, CLEAR])
+        result["screen_findings"] = pd.Categorical.from_codes(codes, categories=findings)
+        result.attrs["missing_fields"] = missing
+        return result
@@ -0,0 +1,188 @@
+"""
+Full-text search across every section of the monograph.
+
+The index is built by running each section's render function against
+``TextCollector``, a headless ``ui`` backend that records text instead of
+drawing it. Every markdown block, callout and table row becomes a document
+tagged with its section and nearest heading, so hits can deep-link to the
+right section. Building takes a few milliseconds and is done once per
+monograph version; queries are dictionary lookups plus a small ranking step.
+"""
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+_TAG = re.compile(r"<[^>]+>")
+_MARKDOWN = re.compile(r"[*_`#>|]+")
+_TOKEN = re.compile(r"[a-z0-9]+(?:[+.][a-z0-9]+)*\+?")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or the to vs with".split()
+)
+HEADING_BOOST = 2.0
+PREFIX_EXPANSIONS = 50
+
+
+@dataclass(frozen=True)
+class Document:
+    section: str
+    heading: str
+    text: str
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    section: str
+    heading: str
+    snippet: str
+    score: float
+
+
+def plain_text(body):
+    """Strip HTML tags and markdown markup, collapsing whitespace."""
+    return " ".join(_MARKDOWN.sub(" ", _TAG.sub(" ", body)).split())
+
+
+def tokenize(text):
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return [token for token in _TOKEN.findall(text) if token not in STOPWORDS]
+
+
+# ==================== HEADLESS BACKEND ====================
+class TextCollector:
+    """Records what a section renders as ``(heading, text)`` blocks."""
+
+    def __init__(self):
+        self.blocks = []
+        self.heading = ""
+
+    def _add(self, text):
+        text = plain_text(text)
+        if text:
+            self.blocks.append((self.heading, text))
+
+    def header(self, body, **kwargs):
+        # Headings are not documents of their own; they tag and boost the
+        # blocks that follow them.
+        self.heading = plain_text(body)
+
+    def markdown(self, body, unsafe_allow_html=False, **kwargs):
+        stripped = body.strip()
+        if stripped.startswith("#") and "\n" not in stripped:
+            self.header(stripped)
+        elif stripped != "---":
+            self._add(body)
+
+    def write(self, *args, **kwargs):
+        for arg in args:
+            if isinstance(arg, str):
+                self._add(arg)
+
+    info = success = warning = error = caption = markdown
+
+    def dataframe(self, data, **kwargs):
+        columns = data.to_dict("list") if hasattr(data, "to_dict") else data
+        names = [name for name in columns if name != "#"]
+        for row in zip(*(columns[name] for name in names)):
+            self._add(" · ".join(f"{name}: {value}" for name, value in zip(names, row)))
+
+    def columns(self, spec, **kwargs):
+        return [nullcontext() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+
+def section_documents(section, tables):
+    """Render one section headlessly into its ``Document``s.
+
+    This is the costly part of a build; the app caches it per section
+    version, so a content reload re-renders only the sections that changed.
+    """
+    collector = TextCollector()
+    section.render(collector, tables)
+    return tuple(Document(section.key, heading, text) for heading, text in collector.blocks)
+
+
+# ==================== INDEX ====================
+class SearchIndex:
+    """Inverted index with tf-idf ranking and prefix matching on the last word."""
+
+    def __init__(self, documents):
+        self.documents = tuple(documents)
+        postings = {}
+        for doc_id, document in enumerate(self.documents):
+            weights = {}
+            for token in tokenize(document.text):
+                weights[token] = weights.get(token, 0) + 1
+            for token in tokenize(document.heading):
+                weights[token] = weights.get(token, 0) + HEADING_BOOST
+            length_norm = 1 / math.sqrt(sum(weights.values()) or 1)
+            for token, weight in weights.items():
+                postings.setdefault(token, []).append((doc_id, weight * length_norm))
+
+        total = len(self.documents)
+        self.postings = {
+            token: tuple((doc_id, weight * math.log(1 + total / len(entries))) for doc_id, weight in entries)
+            for token, entries in postings.items()
+        }
+        self.vocabulary = sorted(self.postings)
+
+    @classmethod
+    def build(cls, sections, tables):
+        return cls(document for section in sections for document in section_documents(section, tables))
+
+    def _expand(self, token):
+        start = bisect_left(self.vocabulary, token)
+        matches = []
+        for candidate in self.vocabulary[start:start + PREFIX_EXPANSIONS]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query, limit=8):
+        """Return the best ``SearchHit``s; every query word must match.
+
+        The last word also matches as a prefix, so results appear while the
+        user is still typing ("hyperkal" finds "hyperkalemia").
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores = None
+        for position, token in enumerate(tokens):
+            candidates = self._expand(token) if position == len(tokens) - 1 else [token]
+            token_scores = {}
+            for candidate in candidates:
+                for doc_id, weight in self.postings.get(candidate, ()):
+                    token_scores[doc_id] = max(token_scores.get(doc_id, 0), weight)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items()
+                          if doc_id in token_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+        return [
+            SearchHit(self.documents[doc_id].section, self.documents[doc_id].heading,
+                      snippet(self.documents[doc_id].text, tokens), score)
+            for doc_id, score in ranked
+        ]
+
+
+def snippet(text, tokens, width=160):
+    """Cut ``text`` around the first query word and bold the matches."""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(token) for token in tokens) + r")\w*", re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(0, (first.start() if first else 0) - width // 3)
+    excerpt = text[start:start + width]
+    if start > 0:
+        excerpt = "…" + excerpt
+    if start + width < len(text):
+        excerpt += "…"
+    return pattern.sub(lambda match: f"**{match.group(0)}**", excerpt)
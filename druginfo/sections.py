@@ -0,0 +1,97 @@
+"""
+Monograph sections and the block renderer that draws them.
+
+A section's content is a list of blocks from the drug's data file (see
+``monographs.py``): headers, markdown, callouts, tables, column layouts and
+the reference list. Raw-HTML blocks are sanitized once and shared through
+``fragments.CACHE``. ``render_blocks`` draws them through ``ui``, which is the
+``streamlit`` module in the app and a headless backend with the same methods
+elsewhere (search indexing, static export, metrics), so the page script can
+run only the section the reader has selected instead of every tab on every
+rerun. Interactive widgets live in ``tools.py`` and are named per section.
+"""
+
+from functools import partial
+from itertools import repeat
+from typing import Callable, NamedTuple, Optional
+
+from druginfo import fragments
+
+TEXT_BLOCKS = ("header", "write", "caption", "info", "success", "warning", "error")
+BLOCK_TYPES = (*TEXT_BLOCKS, "markdown", "table", "columns", "references")
+
+
+class Section(NamedTuple):
+    key: str
+    label: str
+    render: Callable
+    tool: Optional[str] = None
+
+
+def block_text(block):
+    """Block text; data files may store multi-line text as a list of lines."""
+    text = block.get("text", "")
+    return "\n".join(text) if isinstance(text, list) else text
+
+
+def render_blocks(blocks, ui, tables):
+    for block in blocks:
+        kind = block["type"]
+        if kind == "markdown" and "fragment" in block:
+            ui.markdown(fragments.CACHE.html(block["fragment"], block["text"]), unsafe_allow_html=True)
+        elif kind == "markdown":
+            ui.markdown(block_text(block), unsafe_allow_html=block.get("html", False))
+        elif kind in TEXT_BLOCKS:
+            getattr(ui, kind)(block_text(block))
+        elif kind == "table":
+            ui.dataframe(tables[block["table"]], use_container_width=True, hide_index=True)
+        elif kind == "columns":
+            for column, children in zip(ui.columns(block["spec"]), block["columns"]):
+                with column:
+                    render_blocks(children, ui, tables)
+        elif kind == "references":
+            render_references(ui, tables[block["table"]])
+        else:
+            raise ValueError(f"unknown block type: {kind!r}")
+
+
+def render_references(ui, references):
+    """Numbered reference list, grouped under a heading per ``Group``.
+
+    A ``Status`` column (link-check badges added by the app, see
+    ``links.py``) is shown after each URL when present.
+    """
+    names = getattr(references, "column_names", references)
+    statuses = references["Status"] if "Status" in names else repeat("")
+    rows = zip(references["#"], references["Group"], references["Title"],
+               references["Description"], references["URL"], statuses)
+    group = None
+    for number, row_group, title, description, url, status in rows:
+        if row_group != group:
+            if group is not None:
+                ui.markdown("---")
+            group = row_group
+            ui.markdown(f"### {group}")
+            ui.write("")
+        else:
+            ui.markdown("---")
+        ui.markdown(f"**{number}. {title}**  \n{description}  \n🔗 [{url}]({url})"
+                    + (f"  \n{status}" if status else ""))
+
+
+def _compile(blocks):
+    """Copy ``blocks`` with each raw-HTML block's text joined and keyed for ``fragments.CACHE``."""
+    compiled = []
+    for block in blocks:
+        if block["type"] == "markdown" and block.get("html"):
+            text = block_text(block)
+            block = {**block, "text": text, "fragment": fragments.fragment_key(text)}
+        elif block["type"] == "columns":
+            block = {**block, "columns": [_compile(column) for column in block["columns"]]}
+        compiled.append(block)
+    return compiled
+
+
+def build_section(entry):
+    """Turn one ``sections`` entry of a data file into a ``Section``."""
+    return Section(entry["key"], entry["label"], partial(render_blocks, _compile(entry["blocks"])), entry.get("tool"))
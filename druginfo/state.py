@@ -0,0 +1,150 @@
+"""
+Interactive state kept outside the worker process.
+
+Streamlit holds a session's widget values in the memory of the process that
+serves its websocket. Behind several workers (``cluster.py``) a session is
+pinned to one of them, and if that worker restarts the browser reconnects to
+another with an empty session. With ``ENTRESTO_STATE_DIR`` set to a directory
+every worker can read (a shared volume), the app keeps the tools' inputs in
+``<dir>/<sid>.json``. The session id comes from the ``entresto_affinity``
+cookie that nginx sets (``deploy/nginx.conf``: random, HttpOnly), never from
+the URL, so a shared or bookmarked link does not carry anyone's inputs and
+a link cannot plant a session id in another browser. The file is named by a
+hash of the cookie, so the directory listing does not reveal cookie values.
+Without the cookie (no proxy in front) the inputs stay in the process. Any
+worker that gets the session restores it before the first widget is drawn,
+and a rerun writes the file only when a value changed. The cookie is per
+browser, so tabs of one browser share their inputs.
+
+Only widget values are stored (the keys of ``PERSISTED_PREFIXES``): shared
+caches are rebuilt per process from the monograph files, and uploaded files
+are not kept.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import date, datetime, time as time_of_day
+from pathlib import Path
+
+STATE_DIR = os.environ.get("ENTRESTO_STATE_DIR")
+MAX_AGE_HOURS = float(os.environ.get("ENTRESTO_STATE_MAX_AGE_HOURS", 24 * 7))
+
+# Widget keys are prefixed by tool (see tools.py). File uploaders and
+# download buttons cannot be given a value, so their keys are skipped.
+PERSISTED_PREFIXES = ("calc_", "sched_", "ddi_", "pk_", "screen_", "trial_", "risk_", "search_query")
+EXCLUDED_SUFFIXES = ("_upload", "_download")
+
+# Set by nginx to its $request_id: 32 hex digits.
+SESSION_COOKIE = "entresto_affinity"
+
+_SID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def valid_sid(sid):
+    return isinstance(sid, str) and _SID.match(sid) is not None
+
+
+def session_id(cookies):
+    """Store id of the browser session in ``cookies`` (``None`` without a valid cookie)."""
+    cookie = cookies.get(SESSION_COOKIE)
+    if not valid_sid(cookie):
+        return None
+    return hashlib.sha256(cookie.encode("ascii")).hexdigest()[:32]
+
+
+def persisted(key):
+    return key.startswith(PERSISTED_PREFIXES) and not key.endswith(EXCLUDED_SUFFIXES)
+
+
+# ==================== ENCODING ====================
+def _encode(value):
+    # datetime before date: a datetime is a date.
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, time_of_day):
+        return {"$time": value.isoformat()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"cannot store {type(value).__name__}")
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        (tag, text), = value.items()
+        return {"$datetime": datetime, "$date": date, "$time": time_of_day}[tag].fromisoformat(text)
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def snapshot(session_state):
+    """The storable widget values of a session, as a JSON-ready dict."""
+    values = {}
+    for key in session_state:
+        if isinstance(key, str) and persisted(key):
+            try:
+                values[key] = _encode(session_state[key])
+            except TypeError:
+                continue
+    return values
+
+
+def restore(session_state, values):
+    """Put stored values into a session that has not drawn those widgets yet."""
+    for key, value in values.items():
+        if persisted(key) and key not in session_state:
+            session_state[key] = _decode(value)
+
+
+# ==================== STORE ====================
+class FileStore:
+    """One JSON file per session id in a directory shared by the workers."""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or STATE_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, sid):
+        if not valid_sid(sid):
+            raise ValueError(f"invalid session id: {sid!r}")
+        return self.directory / f"{sid}.json"
+
+    def get(self, sid):
+        """Stored values of ``sid`` (``{}`` if there are none or the file is unreadable)."""
+        try:
+            return json.loads(self._path(sid).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def put(self, sid, values):
+        path = self._path(sid)
+        descriptor, staging = tempfile.mkstemp(prefix=".state-", suffix=".json", dir=self.directory)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as out:
+                json.dump(values, out, ensure_ascii=False, separators=(",", ":"))
+            # Atomic on POSIX: a worker reading the session sees the old or the new values.
+            os.replace(staging, path)
+        finally:
+            if os.path.exists(staging):
+                os.unlink(staging)
+
+    def prune(self, max_age_hours=MAX_AGE_HOURS):
+        """Delete sessions not written for ``max_age_hours``; return how many."""
+        cutoff = time.time() - max_age_hours * 3600
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
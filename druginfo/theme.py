@@ -0,0 +1,118 @@
+"""
+Theming layer: one static stylesheet instead of an inline <style> per rerun.
+
+The colours Streamlit itself owns (primary colour, backgrounds, font) stay in
+``.streamlit/config.toml``; everything else lives in ``static/entresto.css``.
+The page emits a ``<link>`` to that file with a content-hash query string, so
+the browser downloads it once, reruns re-send only a ~100 byte tag, and a CSS
+edit busts the cache automatically.
+"""
+
+import hashlib
+from collections.abc import Mapping
+from functools import lru_cache
+from html import escape
+
+from druginfo import STATIC_DIR, STATIC_URL
+
+STYLESHEET = "entresto.css"
+
+
+@lru_cache(maxsize=None)
+def stylesheet_version(name=STYLESHEET):
+    """Return a short hash of the stylesheet contents."""
+    return hashlib.sha256((STATIC_DIR / name).read_bytes()).hexdigest()[:10]
+
+
+@lru_cache(maxsize=None)
+def stylesheet_tag(static_serving=True, name=STYLESHEET):
+    """Return the markup that applies the stylesheet to the page.
+
+    With static serving enabled this is a cache-busted ``<link>``. Without it
+    the file is inlined once per process as a ``<style>`` block, which keeps
+    the page styled at the old per-rerun cost.
+    """
+    if static_serving:
+        href = f"{STATIC_URL}/{name}?v={stylesheet_version(name)}"
+        return f'<link rel="stylesheet" href="{escape(href)}">'
+    return f"<style>\n{(STATIC_DIR / name).read_text(encoding='utf-8')}</style>"
+
+
+# ==================== PAGE CHROME ====================
+# Title and footer markup, shared by the Streamlit page and the static export.
+def title_html(monograph):
+    title = monograph.meta.get("title", monograph.name)
+    return f'<h1 class="main-header">{escape(title)}</h1>'
+
+
+def subtitle_html(monograph):
+    return f'<p class="sub-header">{escape(monograph.meta.get("subtitle", ""))}</p>'
+
+
+def footer_html(monograph):
+    meta = monograph.meta
+    return f"""
+<div style="text-align: center; color: #64748b; padding: 2rem 0;">
+    <p><strong>{escape(monograph.name)} Professional Drug Information</strong></p>
+    <p>{escape(meta.get("tagline", ""))}</p>
+    <p>Version {escape(meta.get("version", ""))} | Last Updated: {escape(meta.get("last_updated", ""))}</p>
+    <p style="font-size: 0.9rem; margin-top: 1rem;">
+        ⚠️ <em>This information is for healthcare professionals only. 
+        Always consult the full prescribing information and clinical judgment when making treatment decisions.</em>
+    </p>
+</div>
+"""
+
+
+# ==================== STATIC TABLES ====================
+def table_html(data):
+    """Render a table (DataFrame or column dict) as a plain HTML table."""
+    columns = data.to_dict("list") if hasattr(data, "to_dict") else data
+    head = "".join(f"<th>{escape(str(name))}</th>" for name in columns)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{escape(str(value))}</td>" for value in row) + "</tr>"
+        for row in zip(*columns.values())
+    )
+    return (f'<div class="table-wrap"><table class="dataframe"><thead><tr>{head}</tr></thead>'
+            f"<tbody>{body}</tbody></table></div>")
+
+
+class RenderedTable(Mapping):
+    """A table's column lists together with their HTML, rendered once.
+
+    Reads like the columns (the references list iterates them); the app
+    caches one per table version, so ``StaticTables`` does not rebuild the
+    markup on every rerun.
+    """
+
+    def __init__(self, columns, html=None):
+        self._columns = columns
+        self.html = table_html(columns) if html is None else html
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+
+class StaticTables:
+    """``ui`` backend that forwards to Streamlit but draws tables as HTML.
+
+    ``st.dataframe`` imports pandas (~0.4 s) on first use even for a handful
+    of rows; the monograph tables are read-only, so fast-start mode shows
+    them as static markup straight from the column lists instead.
+    """
+
+    def __init__(self, st):
+        self._st = st
+
+    def __getattr__(self, name):
+        return getattr(self._st, name)
+
+    def dataframe(self, data, **kwargs):
+        html = data.html if isinstance(data, RenderedTable) else table_html(data)
+        self._st.markdown(html, unsafe_allow_html=True)
@@ -0,0 +1,490 @@
+"""
+Interactive tools shown below a section's static content.
+
+Unlike the content blocks rendered by ``sections.py`` these need live Streamlit
+widgets, so they only run in the app and are left out of anything that
+renders the monograph headlessly (search indexing, static export). A
+monograph names the tool of a section (``"tool": "dose_calculator"``); each
+tool is called with the current ``Monograph``.
+"""
+
+from datetime import date, datetime
+
+import streamlit as st
+
+from druginfo import dosing, interactions, pk, schedule, trials
+
+
+def _seed(**defaults):
+    """Give keyed widgets their initial values through session state.
+
+    ``state.restore`` may already have set a widget's value; a widget created
+    with its own ``value=``/``index=`` as well makes Streamlit warn. So the
+    tools seed defaults here, for absent keys only, and pass none to widgets.
+    """
+    for key, value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = value
+
+
+# ==================== INTERACTION CHECKER ====================
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _interaction_index(slug, tables_version, _tables):
+    return interactions.InteractionIndex(_tables)
+
+
+def interaction_checker(monograph):
+    st.markdown("---")
+    st.markdown("### 🔎 Interaction Checker")
+    index = _interaction_index(monograph.slug, monograph.version_of(*interactions.TABLES), monograph.tables)
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        selected = st.multiselect(
+            f"{monograph.name} + current medications",
+            index.options(),
+            placeholder="Choose drugs or drug classes",
+            key="ddi_selected"
+        )
+    with col2:
+        other = st.text_input("Other (comma-separated; combinations like amlodipine/benazepril OK)", key="ddi_other")
+
+    medications = selected + [name.strip() for name in other.split(",") if name.strip()]
+    if not medications:
+        return
+
+    matches, unknown, suggestions = index.check(medications)
+    boxes = {"contraindicated": st.error, "monitor": st.warning, "no interaction": st.success}
+    for match in matches:
+        interaction = match.interaction
+        # Name the component when the entry was a combination or carried a dose.
+        matched = ("" if match.term == interactions.normalize(match.query)
+                   else f" (*{index.display_names[match.term]}*)")
+        boxes[interaction.severity](
+            f"**{match.query}**{matched} → **{interaction.severity.upper()}**: {interaction.agent}\n\n"
+            f"{interaction.effect}. {interaction.action}."
+        )
+    for suggestion in suggestions:
+        st.warning(
+            f"**{suggestion.query}** was not recognized, so it was not checked. Did you mean "
+            f"**{index.display_names[suggestion.term]}**? Choose it from the list to check it."
+        )
+    if unknown:
+        st.info(
+            "No documented interaction found for: " + ", ".join(unknown)
+            + ". Not listed here does not mean safe; check the full prescribing information."
+        )
+
+
+# ==================== DOSE CALCULATOR ====================
+def dose_calculator(monograph):
+    # The rules in dosing.py are ENTRESTO's; only its monograph names this tool.
+    _seed(calc_weight=70.0, calc_egfr=60, calc_sbp=120, calc_prior_dose=0.0)
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        weight_kg = st.number_input("Weight (kg)", min_value=1.0, max_value=300.0, step=0.5, key="calc_weight")
+        pediatric = st.checkbox("Pediatric patient (≥1 year)", key="calc_pediatric")
+        egfr = st.number_input("eGFR (mL/min/1.73m²)", min_value=0, max_value=200, key="calc_egfr")
+
+    with col2:
+        child_pugh = st.selectbox(
+            "Hepatic function",
+            [None, "A", "B", "C"],
+            format_func=lambda value: "Normal" if value is None else f"Child-Pugh {value}",
+            key="calc_child_pugh"
+        )
+        sbp = st.number_input("Systolic BP (mmHg)", min_value=50, max_value=250, key="calc_sbp")
+
+    with col3:
+        prior_agent = st.selectbox(
+            "Prior RAAS therapy",
+            list(dosing.PRIOR_AGENTS),
+            format_func={"none": "None", "acei": "ACE inhibitor", "arb": "ARB"}.get,
+            key="calc_prior_agent"
+        )
+        prior_dose = st.number_input(
+            "Prior total daily dose (mg, enalapril/valsartan equivalent)",
+            min_value=0.0, max_value=640.0, step=2.5,
+            disabled=prior_agent == "none",
+            key="calc_prior_dose"
+        )
+
+    plan = dosing.calculate_dose(weight_kg, egfr, child_pugh, prior_agent, prior_dose, sbp, pediatric)
+
+    if not plan.recommended:
+        st.error("**ENTRESTO is not recommended for this patient.**\n\n" + "\n".join(f"- {note}" for note in plan.notes))
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Starting dose", plan.starting_dose)
+        col2.metric("Target dose", plan.target_dose)
+        col3.metric("ACEi washout", f"{plan.washout_hours} h" if plan.washout_hours else "Not needed")
+
+        st.markdown("### 📈 Titration Schedule")
+        st.dataframe(
+            [{"Week": step.week, "Dose": step.dose} for step in plan.schedule],
+            use_container_width=True,
+            hide_index=True
+        )
+        if plan.notes:
+            st.warning("\n".join(f"- {note}" for note in plan.notes))
+
+        _timeline(monograph, weight_kg, egfr, child_pugh, prior_agent, prior_dose, sbp, pediatric)
+
+    st.markdown("### 🩺 Monitoring Plan")
+    st.info("\n".join(f"- {item}" for item in plan.monitoring))
+
+    with st.expander("📂 Bulk dosing for a patient list (CSV or Parquet)"):
+        st.caption(
+            "Columns: `weight_kg`, `egfr` (required), `child_pugh`, `prior_agent` (none/acei/arb), "
+            "`prior_daily_dose_mg`, `sbp`, `pediatric`, `last_acei_dose` (date and time). Missing optional "
+            "columns use the calculator defaults. Results include each patient's first dose, dose increase "
+            "and lab check dates, starting no earlier than today."
+        )
+        upload = st.file_uploader("Patient list", type=["csv", "parquet"], key="calc_bulk_upload")
+        if upload is not None:
+            try:
+                result, summary = _bulk_dosing(upload.getvalue(), upload.name, date.today())
+            except ValueError as exc:
+                st.error(f"Could not process {upload.name}: {exc}")
+            else:
+                st.dataframe(summary, use_container_width=True, hide_index=True)
+                stem, _, extension = upload.name.rpartition(".")
+                st.download_button(
+                    "⬇️ Download results",
+                    result,
+                    file_name=f"{stem}_dosing.{extension}",
+                    mime="text/csv" if extension == "csv" else "application/octet-stream",
+                    key="calc_bulk_download"
+                )
+
+
+def _timeline(monograph, weight_kg, egfr, child_pugh, prior_agent, prior_dose, sbp, pediatric):
+    st.markdown("### 📅 Washout & Titration Timeline")
+    _seed(sched_start_date=date.today(), sched_start_time=schedule.DEFAULT_START_TIME,
+          sched_acei_date=date.today(), sched_acei_time=schedule.DEFAULT_START_TIME)
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("Planned first dose", key="sched_start_date")
+        start_time = st.time_input("Time of first dose", key="sched_start_time")
+    last_acei_dose = None
+    if prior_agent == "acei":
+        with col2:
+            acei_date = st.date_input("Last ACE inhibitor dose", key="sched_acei_date")
+            acei_time = st.time_input("Time of last ACE inhibitor dose", key="sched_acei_time")
+        last_acei_dose = datetime.combine(acei_date, acei_time)
+
+    timeline = schedule.build_schedule(
+        weight_kg, egfr, child_pugh, prior_agent, prior_dose, sbp, pediatric,
+        last_acei_dose=last_acei_dose, not_before=datetime.combine(start_date, start_time)
+    )
+    if timeline.washout_ends is not None:
+        message = f"Washout complete: **{timeline.washout_ends:%a %d %b %Y, %H:%M}**"
+        if timeline.first_dose == timeline.washout_ends:
+            st.warning(message + " — the first dose cannot be given earlier.")
+        else:
+            st.success(message)
+
+    st.dataframe(
+        [{"Date": f"{event.when:%a %d %b %Y}" + (f", {event.when:%H:%M}" if event.kind == "start" else ""),
+          "Event": event.summary, "Details": event.detail} for event in timeline.events],
+        use_container_width=True,
+        hide_index=True
+    )
+    st.download_button(
+        "📅 Add to calendar (.ics)",
+        schedule.to_ical(timeline, f"{monograph.name} titration"),
+        file_name=f"{monograph.slug}-titration.ics",
+        mime="text/calendar",
+        key="sched_ics_download"
+    )
+
+
+@st.cache_data(show_spinner="Evaluating dosing rules...", max_entries=4)
+def _bulk_dosing(payload, name, today):
+    """Run the bulk dosing rules and schedules on an uploaded file; cached per file content and day."""
+    import io
+
+    import pandas as pd
+
+    if name.lower().endswith(".parquet"):
+        frame = pd.read_parquet(io.BytesIO(payload))
+    else:
+        frame = pd.read_csv(io.BytesIO(payload))
+    result = schedule.calculate_schedules(frame, datetime.combine(today, schedule.DEFAULT_START_TIME))
+
+    summary = result["status"].value_counts().rename_axis("Status").reset_index(name="Patients")
+    out = io.BytesIO()
+    if name.lower().endswith(".parquet"):
+        result.to_parquet(out, index=False)
+    else:
+        result.to_csv(out, index=False)
+    return out.getvalue(), summary
+
+
+# ==================== PK SIMULATOR ====================
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _pk_model(slug, table_version, _tables):
+    return pk.model_from_tables(_tables)
+
+
+def _pk_chart(hours, curves, x_title):
+    """Vega-Lite spec over a long-format Arrow table.
+
+    ``st.line_chart`` reshapes through pandas and Altair on every rerun
+    (~100 ms); a fixed spec plus an Arrow table built from the cached arrays
+    keeps a slider drag to a few milliseconds.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    data = pa.table({
+        "Hours": np.tile(hours, len(pk.ANALYTES)),
+        "Analyte": np.repeat(pk.ANALYTES, len(hours)),
+        "Concentration": curves.ravel(),
+    })
+    spec = {
+        "mark": {"type": "line", "tooltip": True},
+        "encoding": {
+            "x": {"field": "Hours", "type": "quantitative", "title": x_title},
+            "y": {"field": "Concentration", "type": "quantitative", "title": "% of reference steady-state peak"},
+            "color": {"field": "Analyte", "type": "nominal", "sort": list(pk.ANALYTES),
+                      "legend": {"orient": "bottom", "title": None}},
+        },
+        "height": 320,
+    }
+    return data, spec
+
+
+def pk_simulator(monograph):
+    st.markdown("---")
+    st.markdown("### 📈 Concentration-Time Simulator")
+    model = _pk_model(monograph.slug, monograph.table_versions[pk.TABLE], monograph.tables)
+
+    _seed(pk_dose=list(pk.DOSES_MG)[-1], pk_egfr=90, pk_days=5)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        dose = st.selectbox("Dose", list(pk.DOSES_MG), key="pk_dose")
+        steady_state = st.toggle("Steady state (one dosing interval)", key="pk_steady_state")
+    with col2:
+        egfr = st.slider("eGFR (mL/min/1.73m²)", min_value=15, max_value=120, key="pk_egfr")
+        child_pugh = st.selectbox(
+            "Hepatic function",
+            [None, "A", "B"],
+            format_func=lambda value: "Normal" if value is None else f"Child-Pugh {value}",
+            key="pk_child_pugh"
+        )
+    with col3:
+        days = st.slider("Days from first dose", min_value=1, max_value=10, disabled=steady_state, key="pk_days")
+
+    folds = pk.auc_folds(egfr, child_pugh)
+    hours, curves = pk.profile(model, dose, folds, days, steady_state)
+    data, spec = _pk_chart(hours, curves, "Hours into a dosing interval" if steady_state else "Hours since first dose")
+    st.vega_lite_chart(data, spec, use_container_width=True)
+    st.dataframe(pk.steady_state_summary(model, dose, folds), use_container_width=True, hide_index=True)
+    st.caption(
+        "Relative concentrations: % of each analyte's steady-state peak at 97/103 mg BID with normal renal and "
+        "hepatic function, from the Tmax and half-life above. eGFR <30 doubles LBQ657 AUC and Child-Pugh B "
+        "doubles all three (Special Populations). Educational model, not for dosing decisions."
+    )
+
+
+# ==================== CONTRAINDICATION SCREENER ====================
+def contraindication_screener(monograph):
+    st.markdown("---")
+    st.markdown("### 🛡️ Contraindication Screener")
+    rules = monograph.rules
+
+    _seed(screen_egfr=60)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        hypersensitivity = st.checkbox("Hypersensitivity to any component", key="screen_hypersensitivity")
+        angioedema = st.checkbox("History of ACEi/ARB angioedema", key="screen_angioedema")
+        pregnant = st.checkbox("Pregnant", key="screen_pregnant")
+    with col2:
+        aliskiren = st.checkbox("Taking aliskiren", key="screen_aliskiren")
+        diabetes = st.checkbox("Diabetes", key="screen_diabetes")
+        on_acei = st.checkbox("ACE inhibitor in the last few days", key="screen_on_acei")
+        hours_since_acei = st.number_input(
+            "Hours since last ACE inhibitor dose", min_value=0, max_value=720,
+            disabled=not on_acei, key="screen_hours_since_acei"
+        )
+    with col3:
+        egfr = st.number_input("eGFR (mL/min/1.73m²)", min_value=0, max_value=200, key="screen_egfr")
+        dialysis = st.checkbox("On dialysis", key="screen_dialysis")
+        child_pugh = st.selectbox(
+            "Hepatic function",
+            [None, "A", "B", "C"],
+            format_func=lambda value: "Normal" if value is None else f"Child-Pugh {value}",
+            key="screen_child_pugh"
+        )
+
+    record = {
+        "hypersensitivity": hypersensitivity, "angioedema_history": angioedema, "pregnant": pregnant,
+        "aliskiren": aliskiren, "diabetes": diabetes, "hours_since_acei": hours_since_acei if on_acei else None,
+        "egfr": egfr, "dialysis": dialysis, "child_pugh": child_pugh,
+    }
+    findings, _ = rules.screen(record)
+    boxes = {"contraindicated": st.error, "avoid": st.error, "not_recommended": st.warning}
+    for finding in findings:
+        rule = finding.rule
+        sources = "\n".join(f"- {citation}" for citation in rule.citations)
+        boxes[rule.action](f"**{rule.action.replace('_', ' ').upper()}**: {rule.title}\n\n{sources}")
+    if not findings:
+        st.success(f"None of the {len(rules)} screening rules apply to these answers.")
+
+    with st.expander("📂 Screen a patient list (CSV or Parquet)"):
+        st.caption(
+            "Columns (any subset): " + ", ".join(f"`{field}` ({kind})" for field, kind in rules.kinds.items())
+            + ". Each row gets one yes/no column per rule, the most severe result and the rules that fired."
+        )
+        upload = st.file_uploader("Patient list", type=["csv", "parquet"], key="screen_bulk_upload")
+        if upload is not None:
+            try:
+                result, summary, missing = _bulk_screening(
+                    monograph.slug, monograph.version, upload.getvalue(), upload.name, _rules=rules
+                )
+            except ValueError as exc:
+                st.error(f"Could not process {upload.name}: {exc}")
+            else:
+                if missing:
+                    st.warning("Not in the file, so never flagged: " + ", ".join(f"`{field}`" for field in missing))
+                st.dataframe(summary, use_container_width=True, hide_index=True)
+                stem, _, extension = upload.name.rpartition(".")
+                st.download_button(
+                    "⬇️ Download results",
+                    result,
+                    file_name=f"{stem}_screening.{extension}",
+                    mime="text/csv" if extension == "csv" else "application/octet-stream",
+                    key="screen_bulk_download"
+                )
+
+
+@st.cache_data(show_spinner="Screening patients...", max_entries=4)
+def _bulk_screening(slug, version, payload, name, _rules):
+    """Screen an uploaded file against the monograph's rules; cached per file content and rule version."""
+    import io
+
+    import pandas as pd
+
+    if name.lower().endswith(".parquet"):
+        frame = pd.read_parquet(io.BytesIO(payload))
+    else:
+        frame = pd.read_csv(io.BytesIO(payload))
+    screened = _rules.screen_frame(frame)
+    # A re-uploaded result file: its old screen columns are replaced.
+    result = pd.concat([frame.drop(columns=screened.columns, errors="ignore"), screened], axis=1)
+
+    summary = screened["screen_result"].value_counts().rename_axis("Result").reset_index(name="Patients")
+    out = io.BytesIO()
+    if name.lower().endswith(".parquet"):
+        result.to_parquet(out, index=False)
+    else:
+        result.to_csv(out, index=False)
+    return out.getvalue(), summary, screened.attrs["missing_fields"]
+
+
+# ==================== ADVERSE-EVENT RISK ESTIMATOR ====================
+def adverse_risk_estimator(monograph):
+    model = monograph.risk_model
+    if model is None:
+        # No "adverse_risk" entry in this monograph: nothing to estimate with.
+        return
+    st.markdown("---")
+    st.markdown("### 📉 Cohort Adverse-Event Estimator")
+    st.caption(
+        "Upload a patient list (CSV or Parquet) with any of these columns: "
+        + ", ".join(f"`{field}` ({kind})" for field, kind in model.fields.items())
+        + ". Expected events apply the incidence rates above, with the special-population rates where the "
+        "label gives one; intervals come from bootstrap resampling of the cohort, the trial rates and the events."
+    )
+    upload = st.file_uploader("Patient cohort", type=["csv", "parquet"], key="risk_upload")
+    if upload is None:
+        return
+    try:
+        estimate = _risk_estimate(monograph.slug, monograph.version, upload.getvalue(), upload.name, _model=model)
+    except ValueError as exc:
+        st.error(f"Could not process {upload.name}: {exc}")
+        return
+    if not estimate.patients:
+        st.error(f"{upload.name} has no patient rows.")
+        return
+    if estimate.missing_fields:
+        st.warning("Not in the file, so nobody counts as in these populations: "
+                   + ", ".join(f"`{field}`" for field in estimate.missing_fields))
+    st.metric("Patients", f"{estimate.patients:,}")
+    st.dataframe(estimate.events, use_container_width=True, hide_index=True)
+    st.markdown("#### 🩺 Special populations in this cohort")
+    st.dataframe(estimate.populations, use_container_width=True, hide_index=True)
+    stem, _, _ = upload.name.rpartition(".")
+    st.download_button(
+        "⬇️ Download expected events (CSV)",
+        estimate.events.to_csv(index=False),
+        file_name=f"{stem}_adverse_events.csv",
+        mime="text/csv",
+        key="risk_download"
+    )
+
+
+@st.cache_data(show_spinner="Estimating adverse events...", max_entries=4)
+def _risk_estimate(slug, version, payload, name, _model):
+    """Estimate an uploaded cohort's adverse events; cached per file content and monograph version."""
+    import io
+
+    import pandas as pd
+
+    if name.lower().endswith(".parquet"):
+        frame = pd.read_parquet(io.BytesIO(payload))
+    else:
+        frame = pd.read_csv(io.BytesIO(payload))
+    return _model.estimate(frame)
+
+
+# ==================== TRIAL EXPLORER ====================
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _trial_explorer(slug, table_version, _tables):
+    return trials.Explorer(_tables)
+
+
+def trial_explorer(monograph):
+    st.markdown("---")
+    st.markdown("### 🌲 Trial Explorer")
+    explorer = _trial_explorer(monograph.slug, monograph.table_versions[trials.TABLE], monograph.tables)
+
+    endpoint = st.selectbox("Endpoint", explorer.endpoints, key="trial_endpoint")
+    table, (data, spec) = explorer.view(endpoint)
+    st.vega_lite_chart(data, spec, use_container_width=True)
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption(
+        "Effect: the published estimate. Risks, ARR (Wald 95% CI), NNT and RR (log-scale CI) are crude, from "
+        "patients with an event over the median follow-up; endpoints reported as total events or as a "
+        "continuous ratio have no patient counts, so only their published estimate is shown."
+    )
+
+
+TOOLS = {
+    "interaction_checker": interaction_checker,
+    "dose_calculator": dose_calculator,
+    "pk_simulator": pk_simulator,
+    "contraindication_screener": contraindication_screener,
+    "adverse_risk_estimator": adverse_risk_estimator,
+    "trial_explorer": trial_explorer,
+}
+
+
+# ==================== WARM-UP ====================
+def warm_caches(monograph):
+    """Build the shared state of the monograph's tools ahead of first use.
+
+    Also imports pandas, which ``st.dataframe`` (titration schedule) and the
+    bulk upload need, so that cost is paid in the background instead of on a
+    reader's first click.
+    """
+    names = {section.tool for section in monograph.sections}
+    if "interaction_checker" in names:
+        _interaction_index(monograph.slug, monograph.version_of(*interactions.TABLES), monograph.tables)
+    if "pk_simulator" in names:
+        _pk_model(monograph.slug, monograph.table_versions[pk.TABLE], monograph.tables)
+    if "trial_explorer" in names:
+        _trial_explorer(monograph.slug, monograph.table_versions[trials.TABLE], monograph.tables)
+    import pandas  # noqa: F401
@@ -0,0 +1,162 @@
+"""
+Trial endpoint analytics behind the Clinical Trials explorer.
+
+The monograph's ``trial_endpoints`` table stores each reported endpoint as
+numbers: the published effect estimate with its 95% CI (``HR``, ``Rate
+ratio``, ...) and, where the trial reports patients with an event per arm,
+the event counts and arm sizes. From those counts ``derive`` adds the
+crude risks, absolute risk reduction (Wald CI), number needed to treat (the
+reciprocal of the ARR limits, reported as NNTB/NNTH across zero, after
+Altman) and relative risk (log-scale CI). Endpoints reported as total events
+or as a continuous ratio have no patient counts and keep only their
+published estimate.
+
+``Explorer`` computes every metric and every forest plot once, when it is
+built; the app caches one per version of the table (``tools.py``), so
+switching the endpoint in the explorer is a dict lookup.
+"""
+
+import math
+from collections import OrderedDict
+
+TABLE = "trial_endpoints"
+ALL = "All endpoints"
+Z95 = 1.959963984540054
+
+
+def _count(value):
+    return None if value is None or (isinstance(value, float) and math.isnan(value)) else value
+
+
+# ==================== METRICS ====================
+def risk_difference(events_t, n_t, events_c, n_c):
+    """``(arr, low, high)``: control minus treatment risk with its 95% Wald CI."""
+    risk_t, risk_c = events_t / n_t, events_c / n_c
+    arr = risk_c - risk_t
+    se = math.sqrt(risk_t * (1 - risk_t) / n_t + risk_c * (1 - risk_c) / n_c)
+    return arr, arr - Z95 * se, arr + Z95 * se
+
+
+def relative_risk(events_t, n_t, events_c, n_c):
+    """``(rr, low, high)`` with the CI on the log scale."""
+    rr = (events_t / n_t) / (events_c / n_c)
+    se = math.sqrt(1 / events_t - 1 / n_t + 1 / events_c - 1 / n_c)
+    return rr, rr * math.exp(-Z95 * se), rr * math.exp(Z95 * se)
+
+
+def nnt_text(arr, low, high):
+    """NNT and its CI from an ARR and its CI; a CI crossing zero spans benefit (NNTB) and harm (NNTH)."""
+    if arr == 0:
+        return "∞"
+    label = "NNTB" if arr > 0 else "NNTH"
+    point = f"{label} {math.ceil(1 / abs(arr))}"
+    if low > 0 or high < 0:
+        near, far = sorted((abs(low), abs(high)), reverse=True)
+        return f"{point} ({math.ceil(1 / near)}–{math.ceil(1 / far)})"
+    return f"{point} (NNTH {math.ceil(1 / abs(low))} to ∞ to NNTB {math.ceil(1 / high)})"
+
+
+def derive(columns):
+    """One dict per endpoint row with the published estimate and the derived metrics."""
+    rows = []
+    for n in range(len(columns["#"])):
+        row = {name: values[n] for name, values in columns.items()}
+        counts = [_count(row[name]) for name in
+                  ("Events (ENTRESTO)", "N (ENTRESTO)", "Events (Comparator)", "N (Comparator)")]
+        row["Effect (95% CI)"] = f"{row['Measure']} {row['Estimate']:.2f} ({row['CI Lower']:.2f}–{row['CI Upper']:.2f})"
+        row.update({"Risk (ENTRESTO)": None, "Risk (Comparator)": None, "ARR": None, "ARR (95% CI)": "",
+                    "NNT (95% CI)": "", "RR (95% CI)": ""})
+        if None not in counts and counts[0] and counts[2]:
+            events_t, n_t, events_c, n_c = counts
+            arr, low, high = risk_difference(events_t, n_t, events_c, n_c)
+            rr, rr_low, rr_high = relative_risk(events_t, n_t, events_c, n_c)
+            row.update({
+                "Risk (ENTRESTO)": events_t / n_t,
+                "Risk (Comparator)": events_c / n_c,
+                "ARR": arr,
+                "ARR (95% CI)": f"{arr:.1%} ({low:.1%} to {high:.1%})",
+                "NNT (95% CI)": nnt_text(arr, low, high),
+                "RR (95% CI)": f"{rr:.2f} ({rr_low:.2f}–{rr_high:.2f})",
+            })
+        rows.append(row)
+    return rows
+
+
+# ==================== FOREST PLOTS ====================
+def _forest_panel(rows, measure):
+    """One layered forest plot of rows sharing ``measure``, on its own log axis."""
+    labels = [f"{row['Trial']}: {row['Definition']}" for row in rows]
+    lowest = min([0.5, *(row["CI Lower"] for row in rows)])
+    highest = max([1.5, *(row["CI Upper"] for row in rows)])
+    y = {"field": "Label", "type": "nominal", "sort": labels, "title": None, "axis": {"labelLimit": 360}}
+    x_scale = {"type": "log", "domain": [lowest * 0.9, highest * 1.1], "nice": False}
+    return {
+        "height": 34 * len(rows) + 20,
+        "transform": [{"filter": {"field": "Measure", "equal": measure}}],
+        "layer": [
+            {"mark": {"type": "rule"},
+             "encoding": {"y": y, "x": {"field": "Lower", "type": "quantitative", "scale": x_scale,
+                                        "title": f"{measure} vs. comparator (95% CI, log scale; 1 = no difference)"},
+                          "x2": {"field": "Upper"}}},
+            {"mark": {"type": "point", "filled": True, "size": 90, "tooltip": {"content": "data"}},
+             "encoding": {"y": y, "x": {"field": "Estimate", "type": "quantitative", "scale": x_scale},
+                          "color": {"field": "Trial", "type": "nominal", "legend": None}}},
+            {"mark": {"type": "rule", "strokeDash": [4, 4]},
+             "encoding": {"x": {"datum": 1}}},
+        ],
+    }
+
+
+def forest_plot(rows, title):
+    """``(data, spec)`` for ``st.vega_lite_chart``: estimate and CI per row on a log axis.
+
+    Hazard, rate and other ratios are not comparable on one axis, so rows
+    with different ``Measure`` values get one panel each, stacked.
+    """
+    import pyarrow as pa
+
+    data = pa.table({
+        "Label": [f"{row['Trial']}: {row['Definition']}" for row in rows],
+        "Trial": [row["Trial"] for row in rows],
+        "Measure": [row["Measure"] for row in rows],
+        "Effect": [row["Effect (95% CI)"] for row in rows],
+        "Estimate": [float(row["Estimate"]) for row in rows],
+        "Lower": [float(row["CI Lower"]) for row in rows],
+        "Upper": [float(row["CI Upper"]) for row in rows],
+    })
+    by_measure = OrderedDict()
+    for row in rows:
+        by_measure.setdefault(row["Measure"], []).append(row)
+    if len(by_measure) == 1:
+        (measure, members), = by_measure.items()
+        return data, {"title": title, **_forest_panel(members, measure)}
+    panels = [{"title": measure, **_forest_panel(members, measure)} for measure, members in by_measure.items()]
+    return data, {"title": title, "vconcat": panels}
+
+
+# ==================== EXPLORER ====================
+class Explorer:
+    """Every endpoint's metrics and every forest plot of one version of the table."""
+
+    def __init__(self, tables):
+        import pandas as pd
+
+        rows = derive(tables[TABLE])
+        self.trials = tuple(dict.fromkeys(row["Trial"] for row in rows))
+        groups = OrderedDict([(ALL, rows)])
+        for row in rows:
+            groups.setdefault(row["Endpoint"], []).append(row)
+        self.endpoints = tuple(groups)
+
+        shown = ["Trial", "Definition", "Comparator", "Effect (95% CI)", "Risk (ENTRESTO)", "Risk (Comparator)",
+                 "ARR (95% CI)", "NNT (95% CI)", "RR (95% CI)"]
+        self.views = {}
+        for endpoint, members in groups.items():
+            frame = pd.DataFrame(members)[shown]
+            for column in ("Risk (ENTRESTO)", "Risk (Comparator)"):
+                frame[column] = frame[column].map(lambda risk: "" if risk is None or risk != risk else f"{risk:.1%}")
+            self.views[endpoint] = (frame, forest_plot(members, endpoint))
+
+    def view(self, endpoint):
+        """``(table, (chart data, chart spec))`` of one endpoint group."""
+        return self.views[endpoint]
@@ -4,1097 +4,327 @@ Pre-Pharmacode V2.0 Standard
 FDA-verified | Evidence-based | Updated 2026-02-14
 """
 
+import os
+import threading
+from collections import ChainMap
+
 import streamlit as st
-import pandas as pd
-from datetime import datetime
+
+from druginfo import bundle, data, fragments, images, links, metrics, monographs, search, state, theme, tools
+
+# ==================== DRUG SELECTION ====================
+# Every file in monographs/ is one drug; ``?drug=<slug>`` picks it and the
+# selector appears once there is more than one.
+drugs = monographs.available()
+if st.session_state.get("drug") not in drugs:
+    requested = st.query_params.get("drug")
+    st.session_state["drug"] = requested if requested in drugs else monographs.DEFAULT_DRUG
+monograph = monographs.load(st.session_state["drug"])
+SECTIONS, SECTIONS_BY_KEY = monograph.sections, monograph.sections_by_key
 
 # ==================== PAGE CONFIGURATION ====================
 st.set_page_config(
-    page_title="ENTRESTO (Sacubitril/Valsartan) Info",
-    page_icon="💊",
+    page_title=monograph.meta["page_title"],
+    page_icon=monograph.meta.get("icon", "💊"),
     layout="wide",
     initial_sidebar_state="collapsed"
 )
 
+# ==================== SHARED SESSION STATE ====================
+# With ENTRESTO_STATE_DIR (a directory shared by the workers, see
+# druginfo/cluster.py) the tools' inputs are stored under the proxy's HttpOnly
+# session cookie, so whichever worker serves the session next resumes it.
+# The id is never put in the URL. The values are also put back after a lazy
+# tab switch drops its widgets.
+@st.cache_resource(show_spinner=False)
+def state_store(directory):
+    return state.FileStore(directory)
+
+
+store = state_store(state.STATE_DIR) if state.STATE_DIR else None
+sid = state.session_id(st.context.cookies) if store is not None else None
+if "sid" in st.query_params:
+    # Links from before the cookie carried the id in the URL.
+    del st.query_params["sid"]
+if sid is not None:
+    if st.session_state.get("state_sid") != sid:
+        st.session_state["state_sid"] = sid
+        st.session_state["state_values"] = store.get(sid)
+    state.restore(st.session_state, st.session_state["state_values"])
+
 # ==================== CUSTOM CSS ====================
-st.markdown("""
-<style>
-    /* إخفاء القائمة الجانبية تماماً */
-    [data-testid="stSidebar"] {
-        display: none;
-    }
-    
-    /* إخفاء زر المشاركة والقائمة العلوية */
-    #MainMenu {visibility: hidden;}
-    header {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #1e3a8a;
-        text-align: center;
-        padding: 1rem 0;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-    .sub-header {
-        font-size: 1.2rem;
-        color: #475569;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .info-box {
-        background-color: #f0f9ff;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid #3b82f6;
-        margin: 1rem 0;
-    }
-    .warning-box {
-        background-color: #fef2f2;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid #ef4444;
-        margin: 1rem 0;
-    }
-    .success-box {
-        background-color: #f0fdf4;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid #22c55e;
-        margin: 1rem 0;
-    }
-    .metric-card {
-        background: white;
-        padding: 1rem;
-        border-radius: 8px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        text-align: center;
-    }
-    
-    /* تحسين التبويبات للموبايل - عرض على سطرين/ثلاثة */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 4px;
-        flex-wrap: wrap !important;
-        justify-content: center;
-    }
-    .stTabs [data-baseweb="tab"] {
-        height: 45px;
-        padding: 0 12px;
-        background-color: #f1f5f9;
-        border-radius: 8px;
-        font-size: 0.9rem;
-        white-space: nowrap;
-        flex: 0 1 auto;
-        margin: 2px;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #3b82f6;
-        color: white;
-    }
-    
-    /* تحسين الجداول */
-    .dataframe {
-        font-size: 0.9rem;
-    }
-    
-    /* تحسين العرض على الموبايل */
-    @media (max-width: 768px) {
-        .main-header {
-            font-size: 1.8rem;
-        }
-        .stTabs [data-baseweb="tab"] {
-            font-size: 0.8rem;
-            padding: 0 8px;
-            height: 40px;
-        }
-    }
-    
-    /* تنسيق صورة الدواء */
-    .drug-image-container {
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        padding: 1rem 0;
-        margin-bottom: 2rem;
-    }
-    
-    /* تنسيق المصادر */
-    .reference-item {
-        background-color: #f8fafc;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-radius: 8px;
-        border-left: 3px solid #3b82f6;
-    }
-    
-    .reference-item strong {
-        color: #1e40af;
-        font-size: 1.05rem;
-    }
-    
-    .reference-item a {
-        color: #2563eb;
-        text-decoration: none;
-        word-break: break-all;
-        display: block;
-        margin-top: 0.3rem;
-    }
-    
-    .reference-item a:hover {
-        color: #1d4ed8;
-        text-decoration: underline;
-    }
-</style>
-""", unsafe_allow_html=True)
+# The stylesheet lives in static/entresto.css; each rerun only sends a short
+# <link> tag and the browser keeps its cached copy.
+st.markdown(theme.stylesheet_tag(st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
 
-# ==================== HEADER WITH DRUG IMAGE ====================
-st.markdown('<h1 class="main-header">💊 ENTRESTO (Sacubitril/Valsartan)</h1>', unsafe_allow_html=True)
-st.markdown('<p class="sub-header">✅ FDA-verified • 🔬 Evidence-based • 📅 Updated February 2026</p>', unsafe_allow_html=True)
+# ==================== INSTRUMENTATION ====================
+# ENTRESTO_METRICS=1 times each section, counts emitted bytes, tables built and
+# reruns, and serves them on :$ENTRESTO_METRICS_PORT/metrics (Prometheus, on
+# loopback unless ENTRESTO_METRICS_HOST says otherwise) and in a diagnostics
+# panel under the footer when the URL has ?diagnostics=1.
+instrument = os.environ.get("ENTRESTO_METRICS") == "1"
 
-# صورة الدواء في الوسط
-col1, col2, col3 = st.columns([1, 2, 1])
-with col2:
-    st.image("https://sspark.genspark.ai/cfimages?u1=Muvp4AIB6G6Hg6MJeOOkZrhTW09LRwYzPlOQdDqaCTEDxui%2Bhh9Hujjrk1Hp7bxR%2Ffgx4jzdmRna2kYAqXQGr2sxsSUp3tRUW21DgGbzesaR%2BIF7RSUdNj2HbVAldh9sSKjAUyXUtGPT48OjDuIn0XU6&u2=ZoKqDbxo4ID3Wy2m&width=2560", 
-             use_column_width=True,
-             caption="ENTRESTO® - Available in 50mg, 100mg, and 200mg formulations")
 
-st.markdown("---")
+@st.cache_resource(show_spinner=False)
+def start_metrics(port, host):
+    """Start the /metrics server, once per process."""
+    try:
+        return metrics.serve(port=port, host=host)
+    except OSError:
+        # Another worker on this host already owns the port; its endpoint
+        # reports that process only, this one stays panel-only.
+        return None
 
-# ==================== MAIN TABS ====================
-tabs = st.tabs([
-    "📖 Overview",
-    "⚗️ Mechanism",
-    "💊 Dosage",
-    "⚖️ Pharmacokinetics",
-    "🚫 Contraindications",
-    "⚠️ Side Effects",
-    "💊⚖️ Interactions",
-    "📊 Clinical Trials",
-    "📚 References"
-])
 
-# ==================== TAB 1: OVERVIEW ====================
-with tabs[0]:
-    st.header("📖 Overview of ENTRESTO")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### 🎯 Indications")
-        st.markdown("""
-        <div class="info-box">
-        <h4>👨‍⚕️ Adults:</h4>
-        <ul>
-            <li>Reduce risk of cardiovascular death and heart failure hospitalization</li>
-            <li>Chronic heart failure with reduced ejection fraction (HFrEF)</li>
-            <li>Benefits most evident when LVEF is below normal</li>
-        </ul>
-        
-        <h4>👶 Pediatrics (≥1 year):</h4>
-        <ul>
-            <li>Symptomatic heart failure with systemic LV systolic dysfunction</li>
-            <li>Reduces NT-proBNP and improves cardiovascular outcomes</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("### 📦 Available Strengths")
-        strengths_df = pd.DataFrame({
-            "#": [1, 2, 3],
-            "Strength (mg)": ["24/26", "49/51", "97/103"],
-            "Color": ["Violet white", "Pale yellow", "Light pink"],
-            "Marking": ["NVR/LZ", "NVR/L1", "NVR/L11"]
-        })
-        st.dataframe(strengths_df, use_container_width=True, hide_index=True)
-    
-    with col2:
-        st.markdown("### 🏆 Key Advantages")
-        st.markdown("""
-        <div class="success-box">
-        <h4>✅ Superior Efficacy:</h4>
-        <ul>
-            <li>⬇️ 20% reduction in cardiovascular death vs. enalapril</li>
-            <li>⬇️ 21% reduction in HF hospitalization</li>
-            <li>⬇️ 16% reduction in all-cause mortality</li>
-        </ul>
-        
-        <h4>✅ Safety Profile:</h4>
-        <ul>
-            <li>Less cough than ACE inhibitors (9% vs. 13%)</li>
-            <li>Minimal CYP450 metabolism → Low drug interaction risk</li>
-            <li>Well-tolerated in elderly and renal impairment</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("### 📊 Clinical Evidence")
-        st.info("""
-        **PARADIGM-HF Trial** (NEJM 2014)
-        - 8,442 patients with HFrEF
-        - Median follow-up: 27 months
-        - Primary endpoint: CV death or HF hospitalization
-        - Result: HR 0.80 (95% CI 0.73-0.87, P<0.001)
-        """)
-    
-    st.markdown("### ℹ️ Basic Information")
-    info_df = pd.DataFrame({
-        "#": [1, 2, 3, 4, 5],
-        "Property": ["Generic Name", "Brand Name", "Manufacturer", "Drug Class", "FDA Approval"],
-        "Value": [
-            "Sacubitril/Valsartan",
-            "ENTRESTO®",
-            "Novartis Pharmaceuticals",
-            "Neprilysin Inhibitor + ARB",
-            "July 7, 2015"
-        ]
-    })
-    st.dataframe(info_df, use_container_width=True, hide_index=True)
+if instrument:
+    start_metrics(int(os.environ.get("ENTRESTO_METRICS_PORT", metrics.DEFAULT_PORT)),
+                  os.environ.get("ENTRESTO_METRICS_HOST", metrics.DEFAULT_HOST))
+    new_session = "metrics_reruns" not in st.session_state
+    st.session_state["metrics_reruns"] = st.session_state.get("metrics_reruns", 0) + 1
+    metrics.REGISTRY.count_rerun(new_session)
 
-# ==================== TAB 2: MECHANISM ====================
-with tabs[1]:
-    st.header("⚗️ Mechanism of Action")
-    
-    st.markdown("""
-    <div class="info-box">
-    <h3 style="color: #1e3a8a;">🔬 Dual Complementary Pathways</h3>
-    <p>ENTRESTO combines two components that target distinct but complementary mechanisms in heart failure:</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### 1️⃣ Sacubitril (Neprilysin Inhibitor)")
-        st.markdown("""
-        <div class="success-box">
-        <h4>🎯 Target: Neprilysin Enzyme</h4>
-        
-        <h5>Mechanism:</h5>
-        <ul>
-            <li>Inhibits neprilysin enzyme that degrades natriuretic peptides</li>
-            <li>Increases levels of ANP, BNP, and CNP</li>
-            <li>Prodrug → Active metabolite LBQ657</li>
-        </ul>
-        
-        <h5>Effects:</h5>
-        <ul>
-            <li>✅ Vasodilation (arterial & venous)</li>
-            <li>✅ Increased sodium and water excretion</li>
-            <li>✅ Reduced cardiac remodeling</li>
-            <li>✅ Decreased preload and afterload</li>
-            <li>✅ Improved myocardial relaxation</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("### 2️⃣ Valsartan (ARB)")
-        st.markdown("""
-        <div class="success-box">
-        <h4>🎯 Target: Angiotensin II Type 1 Receptor</h4>
-        
-        <h5>Mechanism:</h5>
-        <ul>
-            <li>Blocks AT1 receptors</li>
-            <li>Prevents harmful effects of RAAS activation</li>
-            <li>Counteracts neprilysin's breakdown of angiotensin II</li>
-        </ul>
-        
-        <h5>Effects:</h5>
-        <ul>
-            <li>✅ Vasodilation</li>
-            <li>✅ Reduced aldosterone secretion</li>
-            <li>✅ Decreased sodium retention</li>
-            <li>✅ Lower blood pressure</li>
-            <li>✅ Cardio-renal protection</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("---")
-    st.markdown("""
-    <div class="info-box">
-    <h3 style="color: #1e3a8a;">🔑 Synergistic Benefit</h3>
-    <p style="font-size: 1.1rem;">
-    By combining neprilysin inhibition with RAAS blockade, ENTRESTO provides more comprehensive 
-    neurohormonal modulation than ACE inhibitors or ARBs alone. This dual action addresses both 
-    the natriuretic peptide deficiency and the RAAS overactivation that characterize heart failure.
-    </p>
-    </div>
-    """, unsafe_allow_html=True)
+# ==================== SHARED DATA ====================
+# ENTRESTO_FAST_START=1 (set in the Procfile) keeps pandas off the cold-start
+# path: the read-only tables are drawn as static HTML straight from the column
+# lists of the monograph file instead of through st.dataframe.
+fast_start = os.environ.get("ENTRESTO_FAST_START") == "1"
 
-# ==================== TAB 3: DOSAGE ====================
-with tabs[2]:
-    st.header("💊 Dosage and Administration")
-    
-    st.markdown("""
-    <div class="warning-box">
-    <h3>⚠️ CRITICAL: ACE Inhibitor Washout Period</h3>
-    <p style="font-size: 1.1rem; font-weight: bold;">
-    Allow a <span style="color: #dc2626;">36-HOUR WASHOUT</span> period after discontinuing ACE inhibitor 
-    before initiating ENTRESTO to reduce the risk of angioedema.
-    </p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("### 👨‍⚕️ Adult Dosing (HFrEF)")
-    
-    adult_dosing_df = pd.DataFrame({
-        "#": [1, 2, 3],
-        "Phase": ["Starting Dose", "Target Dose", "Maximum Dose"],
-        "Dose": ["49/51 mg BID", "97/103 mg BID", "97/103 mg BID"],
-        "Notes": [
-            "Double dose every 2-4 weeks as tolerated",
-            "Achieve within 2-4 weeks if tolerated",
-            "Based on systolic BP ≥100 mmHg"
-        ]
-    })
-    st.dataframe(adult_dosing_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### 📉 Dose Adjustments")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("#### Renal Impairment")
-        renal_df = pd.DataFrame({
-            "#": [1, 2, 3, 4],
-            "eGFR (mL/min/1.73m²)": ["≥60", "30-59", "15-29", "<15 or Dialysis"],
-            "Dose": ["Standard", "Standard", "24/26 mg BID start", "Not recommended"]
-        })
-        st.dataframe(renal_df, use_container_width=True, hide_index=True)
-    
-    with col2:
-        st.markdown("#### Hepatic Impairment")
-        hepatic_df = pd.DataFrame({
-            "#": [1, 2, 3],
-            "Severity": ["Mild (Child-Pugh A)", "Moderate (Child-Pugh B)", "Severe (Child-Pugh C)"],
-            "Dose": ["Standard", "24/26 mg BID start", "Not recommended"]
-        })
-        st.dataframe(hepatic_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### 👶 Pediatric Dosing (≥1 year)")
-    
-    st.info("""
-    **Weight-Based Dosing:**
-    - <40 kg: Starting 1.6 mg/kg BID → Target 3.1 mg/kg BID
-    - ≥40 kg: Starting 49/51 mg BID → Target 97/103 mg BID
-    - Adjust every 2 weeks based on tolerability
-    """)
-    
-    st.markdown("### 🍽️ Administration")
-    st.success("""
-    ✅ Take with or without food
-    
-    ✅ Twice daily (morning and evening)
-    
-    ✅ Swallow tablets whole (do not crush/chew)
-    
-    ✅ If dose missed, take next dose at scheduled time (do not double)
-    """)
 
-# ==================== TAB 4: PHARMACOKINETICS ====================
-with tabs[3]:
-    st.header("⚖️ Pharmacokinetics")
-    
-    st.markdown("### 📊 Pharmacokinetic Parameters Summary")
-    
-    pk_df = pd.DataFrame({
-        "#": [1, 2, 3, 4, 5, 6],
-        "Parameter": [
-            "Bioavailability",
-            "Tmax (Time to Peak)",
-            "Half-life (t½)",
-            "Protein Binding",
-            "Metabolism",
-            "Excretion"
-        ],
-        "Sacubitril": [
-            "≥60%",
-            "0.5 hours",
-            "1.4 hours",
-            "94-97%",
-            "Esterase → LBQ657",
-            "52-68% urine (as LBQ657)"
-        ],
-        "LBQ657 (Active)": [
-            "-",
-            "2 hours",
-            "11.5 hours",
-            "94-97%",
-            "No further metabolism",
-            "52-68% urine, 37-48% feces"
-        ],
-        "Valsartan": [
-            "23% (higher than other formulations)",
-            "1.5 hours",
-            "9.9 hours",
-            "94-97%",
-            "Minimal (~20% metabolites)",
-            "13% urine, 86% feces"
-        ]
-    })
-    st.dataframe(pk_df, use_container_width=True, hide_index=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### 🧬 Distribution")
-        st.info("""
-        **Volume of Distribution:**
-        - Sacubitril: ~103 L
-        - Valsartan: ~75 L
-        
-        **Blood-Brain Barrier:**
-        - LBQ657 crosses minimally (0.28%)
-        - Valsartan has low CNS penetration
-        """)
-        
-        st.markdown("### 🔄 Metabolism")
-        st.success("""
-        **Key Points:**
-        ✅ Sacubitril → LBQ657 (esterase hydrolysis)
-        
-        ✅ Minimal CYP450 involvement
-        
-        ✅ No enzyme induction/inhibition
-        
-        ✅ Low potential for drug-drug interactions
-        """)
-    
-    with col2:
-        st.markdown("### 🚰 Elimination")
-        elimination_df = pd.DataFrame({
-            "#": [1, 2],
-            "Route": ["Renal", "Fecal"],
-            "Sacubitril/LBQ657": ["52-68%", "37-48%"],
-            "Valsartan": ["13%", "86%"]
-        })
-        st.dataframe(elimination_df, use_container_width=True, hide_index=True)
-        
-        st.markdown("### 👥 Special Populations")
-        st.warning("""
-        **Renal Impairment:**
-        - eGFR <30: AUC increases ~2-fold
-        - Start with 24/26 mg BID
-        
-        **Hepatic Impairment:**
-        - Moderate (Child-Pugh B): AUC increases ~2-fold
-        - Start with 24/26 mg BID
-        
-        **Elderly (≥65 years):**
-        - No dose adjustment needed
-        - Monitor BP and renal function
-        """)
+@st.cache_resource(show_spinner=False, max_entries=256)
+def load_table(slug, name, table_version, _columns):
+    """Build one display table once per process and share it across sessions.
 
-# ==================== TAB 5: CONTRAINDICATIONS ====================
-with tabs[4]:
-    st.header("🚫 Contraindications and Warnings")
-    
-    st.markdown("### 🚨 Absolute Contraindications")
-    
-    contraindications_df = pd.DataFrame({
-        "#": [1, 2, 3, 4],
-        "Contraindication": [
-            "Known hypersensitivity",
-            "History of angioedema",
-            "Concomitant ACE inhibitor use",
-            "Concomitant aliskiren (in diabetes)"
-        ],
-        "Risk": [
-            "Angioedema, anaphylaxis",
-            "Life-threatening angioedema (esp. with ACEi history)",
-            "Increased angioedema risk (wait 36 hours)",
-            "Hyperkalemia, hypotension, renal impairment"
-        ],
-        "Frequency": [
-            "Rare (<0.1%)",
-            "0.5% overall, 2.4% in Black patients",
-            "Not quantified (contraindicated)",
-            "Not applicable (contraindicated)"
-        ]
-    })
-    st.dataframe(contraindications_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### ⚠️ Warnings and Precautions")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("#### 🔴 Fetal Toxicity")
-        st.markdown("""
-        <div class="warning-box">
-        <p><strong>Pregnancy Category D</strong></p>
-        <ul>
-            <li>Can cause fetal injury/death in 2nd-3rd trimester</li>
-            <li>Discontinue immediately if pregnancy detected</li>
-            <li>Advise females of reproductive potential about risks</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("#### 🟡 Hypotension")
-        st.info("""
-        **Incidence:** 18% vs. 12% with enalapril
-        
-        **Risk Factors:**
-        - Volume depletion
-        - Systolic BP <100 mmHg
-        - High-dose diuretics
-        - Renal impairment (eGFR <30)
-        
-        **Management:**
-        - Correct volume/salt depletion first
-        - Monitor BP regularly
-        - Consider dose reduction
-        """)
-    
-    with col2:
-        st.markdown("#### 🟠 Hyperkalemia")
-        st.warning("""
-        **Incidence:** 12% vs. 14% with enalapril
-        
-        **Risk Factors:**
-        - Renal impairment
-        - Diabetes
-        - K+-sparing diuretics
-        - K+ supplements
-        - NSAIDs
-        
-        **Management:**
-        - Monitor K+ regularly
-        - Adjust K+ supplements/diuretics
-        - Consider dose reduction if K+ >5.5 mEq/L
-        """)
-        
-        st.markdown("#### 🔵 Renal Function")
-        st.info("""
-        **Monitoring Required:**
-        - Baseline and periodic SCr/eGFR
-        - More frequent in eGFR <60
-        
-        **Caution:**
-        - Renal artery stenosis
-        - NSAIDs (may worsen function)
-        - Volume depletion
-        """)
+    ``slug``, ``name`` and ``table_version`` are only the cache key: an edit
+    to the drug's monograph file rebuilds exactly the tables it changed.
+    When ``python -m druginfo.bundle`` has built this version of the table,
+    it is memory-mapped Arrow (shared by every worker on the host) instead of
+    a per-process pandas DataFrame.
+    """
+    if isinstance(_columns, bundle.Columns):  # the monograph already maps the file
+        return _columns.table
+    table = bundle.load(slug, name, table_version)
+    if table is None:
+        table = data.build_frame(_columns)
+    return table
 
-# ==================== TAB 6: SIDE EFFECTS ====================
-with tabs[5]:
-    st.header("⚠️ Adverse Reactions (Side Effects)")
-    
-    st.markdown("### 📊 Common Adverse Reactions (>2% and > placebo)")
-    
-    adverse_df = pd.DataFrame({
-        "#": [1, 2, 3, 4, 5, 6, 7, 8],
-        "Adverse Reaction": [
-            "Hypotension",
-            "Hyperkalemia (K+ ≥6.0 mEq/L)",
-            "Cough",
-            "Dizziness",
-            "Renal impairment (Creatinine increase)",
-            "Angioedema",
-            "Fatigue",
-            "Nausea"
-        ],
-        "ENTRESTO (%)": ["18%", "12%", "9%", "6%", "3%", "0.5%", "2%", "2%"],
-        "Enalapril (%)": ["12%", "14%", "13%", "5%", "3%", "0.2%", "2%", "1%"],
-        "Significance": [
-            "Higher - Monitor BP",
-            "Lower - Favorable",
-            "Lower - Major advantage",
-            "Similar",
-            "Similar",
-            "Higher - Critical warning",
-            "Similar",
-            "Slightly higher"
-        ]
-    })
-    st.dataframe(adverse_df, use_container_width=True, hide_index=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### 🔴 Serious Adverse Reactions")
-        st.markdown("""
-        <div class="warning-box">
-        <h4>⚠️ Life-Threatening:</h4>
-        <ul>
-            <li><strong>Angioedema (0.5%):</strong> Swelling of face, lips, tongue, throat. Higher in Black patients (2.4%). Discontinue immediately.</li>
-            <li><strong>Severe Hypotension:</strong> May cause syncope, dizziness, falls. Monitor BP closely in first weeks.</li>
-            <li><strong>Acute Kidney Injury:</strong> Risk increases with dehydration, NSAIDs, or pre-existing renal disease.</li>
-            <li><strong>Hyperkalemia (K+ >6.0):</strong> Can cause cardiac arrhythmias. Monitor in renal impairment.</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("### 🟡 Less Common (<2%)")
-        st.info("""
-        - Syncope (fainting)
-        - Orthostatic hypotension
-        - Vertigo
-        - Headache
-        - Gastrointestinal upset
-        - Rash or pruritus
-        - Elevated liver enzymes
-        """)
-    
-    with col2:
-        st.markdown("### 📈 Frequency by Severity")
-        severity_df = pd.DataFrame({
-            "#": [1, 2, 3, 4],
-            "Severity": ["Mild", "Moderate", "Severe", "Life-threatening"],
-            "Examples": [
-                "Cough, nausea, fatigue",
-                "Dizziness, hypotension",
-                "Renal impairment, hyperkalemia",
-                "Angioedema, severe hypotension"
-            ],
-            "Frequency": ["5-10%", "10-20%", "2-5%", "<1%"]
-        })
-        st.dataframe(severity_df, use_container_width=True, hide_index=True)
-        
-        st.markdown("### ✅ Advantages Over ACE Inhibitors")
-        st.success("""
-        **Lower Incidence of:**
-        - ✅ Cough (9% vs 13% enalapril)
-        - ✅ Hyperkalemia (12% vs 14%)
-        
-        **Similar or Better:**
-        - Renal impairment
-        - Fatigue
-        - Dizziness
-        
-        **Higher (Monitor):**
-        - Hypotension (18% vs 12%)
-        - Angioedema (0.5% vs 0.2%)
-        """)
-    
-    st.markdown("### 🩺 Special Population Considerations")
-    
-    special_pop_ae_df = pd.DataFrame({
-        "#": [1, 2, 3, 4],
-        "Population": [
-            "Black patients",
-            "Elderly (≥65 years)",
-            "Renal impairment (eGFR <60)",
-            "Diabetes mellitus"
-        ],
-        "Specific Risks": [
-            "Angioedema 2.4% (vs 0.5% overall)",
-            "Higher hypotension risk due to reduced baroreceptor sensitivity",
-            "Increased hyperkalemia and AKI risk",
-            "Higher hyperkalemia with K+ supplements or aliskiren"
-        ],
-        "Monitoring": [
-            "Watch for facial/throat swelling, especially in first month",
-            "Frequent BP monitoring, assess orthostatic changes",
-            "Baseline and periodic K+, SCr, eGFR",
-            "Monitor K+ closely, avoid aliskiren"
-        ]
-    })
-    st.dataframe(special_pop_ae_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### 🚨 When to Seek Immediate Medical Attention")
-    st.error("""
-    **Stop drug and seek emergency care if:**
-    - Swelling of face, lips, tongue, or throat (angioedema)
-    - Difficulty breathing or swallowing
-    - Severe dizziness or fainting
-    - Chest pain or irregular heartbeat
-    - Severe or persistent vomiting/diarrhea
-    - Signs of kidney problems (decreased urination, swelling in legs)
-    """)
 
-# ==================== TAB 7: DRUG INTERACTIONS ====================
-with tabs[6]:
-    st.header("💊⚖️ Drug Interactions")
-    
-    st.markdown("### 🚫 Contraindicated Combinations")
-    
-    contraind_interactions_df = pd.DataFrame({
-        "#": [1, 2, 3],
-        "Drug": [
-            "ACE Inhibitors (e.g., enalapril, lisinopril)",
-            "Aliskiren (in diabetic patients)",
-            "Other ARBs (e.g., losartan, irbesartan)"
-        ],
-        "Risk": [
-            "Increased angioedema risk",
-            "Hyperkalemia, hypotension, renal impairment",
-            "Excessive RAAS suppression"
-        ],
-        "Management": [
-            "36-hour washout required before starting ENTRESTO",
-            "Contraindicated in diabetes; use with caution otherwise",
-            "Avoid concurrent use"
-        ]
-    })
-    st.dataframe(contraind_interactions_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### ⚠️ Significant Interactions (Monitor)")
-    
-    monitor_df = pd.DataFrame({
-        "#": [1, 2, 3, 4],
-        "Drug Class": [
-            "Potassium-sparing diuretics",
-            "Potassium supplements",
-            "NSAIDs",
-            "Lithium"
-        ],
-        "Examples": [
-            "Spironolactone, amiloride, triamterene",
-            "KCl, K-Dur",
-            "Ibuprofen, naproxen, indomethacin",
-            "Lithium carbonate"
-        ],
-        "Effect": [
-            "Hyperkalemia",
-            "Hyperkalemia",
-            "↓ Renal function, ↓ Antihypertensive effect",
-            "↑ Lithium levels → Toxicity"
-        ],
-        "Action": [
-            "Monitor K+ closely; adjust diuretic dose",
-            "Monitor K+ closely; reduce supplement",
-            "Monitor renal function & BP; avoid NSAIDs if possible",
-            "Monitor lithium levels; adjust dose as needed"
-        ]
-    })
-    st.dataframe(monitor_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### ✅ No Clinically Significant Interactions")
-    
-    safe_df = pd.DataFrame({
-        "#": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
-        "Drug": [
-            "Warfarin",
-            "Digoxin",
-            "Atorvastatin",
-            "Simvastatin",
-            "Amlodipine",
-            "Omeprazole",
-            "Metformin",
-            "Furosemide",
-            "Hydrochlorothiazide",
-            "Carvedilol"
-        ],
-        "Study Result": [
-            "No change in INR or warfarin pharmacokinetics",
-            "No change in digoxin levels",
-            "No change in statin pharmacokinetics",
-            "No change in statin pharmacokinetics",
-            "No pharmacokinetic interaction",
-            "No pharmacokinetic interaction",
-            "No change in metformin pharmacokinetics",
-            "No change in diuretic effect",
-            "No change in diuretic effect",
-            "No pharmacokinetic interaction"
-        ]
-    })
-    st.dataframe(safe_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### 🧬 Transporter Interactions")
-    
-    st.info("""
-    **Sacubitril inhibits OATP1B1 and OATP1B3:**
-    - May increase exposure of drugs that are substrates of these transporters
-    - **Example substrates:** Statins, rifampin
-    - **Clinical significance:** Generally minimal, but monitor for statin-related adverse effects
-    """)
-    
-    st.markdown("### 🔬 CYP450 Considerations")
-    
-    st.success("""
-    ✅ **Minimal CYP450 metabolism**
-    
-    ✅ **No enzyme induction or inhibition**
-    
-    ✅ **Low risk of CYP450-mediated drug interactions**
-    
-    ✅ CYP inhibitors (e.g., ketoconazole) or inducers (e.g., rifampin) unlikely to affect ENTRESTO levels
-    """)
+@st.cache_resource(show_spinner=False, max_entries=256)
+def load_static_table(slug, name, table_version, _columns):
+    """Fast-start counterpart of ``load_table``: the table's HTML, rendered once per version."""
+    return theme.RenderedTable(_columns)
+
+
+def display_tables(monograph):
+    load = load_static_table if fast_start else load_table
+    return data.LazyTables(monograph.tables, lambda name: load(
+        monograph.slug, name, monograph.table_versions[name], monograph.tables[name]))
+
 
-# ==================== TAB 8: CLINICAL TRIALS ====================
-with tabs[7]:
-    st.header("📊 Clinical Trials")
-    
-    st.markdown("### 🏆 Landmark Trial: PARADIGM-HF")
-    
-    st.markdown("""
-    <div class="success-box">
-    <h4>Study Design</h4>
-    <ul>
-        <li><strong>N:</strong> 8,442 patients with HFrEF</li>
-        <li><strong>Population:</strong> NYHA Class II-IV, LVEF ≤40% (later ≤35%)</li>
-        <li><strong>Intervention:</strong> Sacubitril/Valsartan 97/103 mg BID vs. Enalapril 10 mg BID</li>
-        <li><strong>Median Follow-up:</strong> 27 months</li>
-        <li><strong>Primary Endpoint:</strong> Composite of CV death or HF hospitalization</li>
-    </ul>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("#### 📉 Primary Results")
-        paradigm_results_df = pd.DataFrame({
-            "#": [1, 2, 3, 4],
-            "Outcome": [
-                "Primary endpoint (CV death or HF hosp)",
-                "Cardiovascular death",
-                "HF hospitalization",
-                "All-cause mortality"
-            ],
-            "HR (95% CI)": [
-                "0.80 (0.73-0.87)",
-                "0.80 (0.71-0.89)",
-                "0.79 (0.71-0.89)",
-                "0.84 (0.76-0.93)"
-            ],
-            "P-value": [
-                "<0.001",
-                "<0.001",
-                "<0.001",
-                "<0.001"
-            ],
-            "Risk Reduction": [
-                "20%",
-                "20%",
-                "21%",
-                "16%"
-            ]
-        })
-        st.dataframe(paradigm_results_df, use_container_width=True, hide_index=True)
-    
+ui, tables = (theme.StaticTables(st) if fast_start else st), display_tables(monograph)
+
+
+# ==================== REFERENCE LINK STATUS ====================
+# ``python -m druginfo.links`` (run on demand or from cron) writes the result
+# of checking every reference URL; each reference then shows its badge.
+@st.cache_resource(show_spinner=False, ttl=60)
+def load_link_status():
+    return links.read_results()
+
+
+link_status = load_link_status()
+if link_status:
+    tables = ChainMap(links.with_status(monograph.tables, link_status), tables)
+
+# ==================== HEADER WITH DRUG IMAGE ====================
+if len(drugs) > 1:
+    st.selectbox(
+        "Drug",
+        drugs,
+        format_func=monographs.display_name,
+        label_visibility="collapsed",
+        key="drug"
+    )
+    if st.query_params.get("drug") != monograph.slug:
+        st.query_params["drug"] = monograph.slug
+
+st.markdown(theme.title_html(monograph), unsafe_allow_html=True)
+st.markdown(theme.subtitle_html(monograph), unsafe_allow_html=True)
+
+# صورة الدواء في الوسط (نسخة محلية بأحجام متعددة - انظر druginfo/images.py)
+header_picture = images.header_picture_html(monograph.meta.get("header_image"))
+if header_picture:
+    col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.markdown("#### 🛡️ Safety Profile")
-        safety_df = pd.DataFrame({
-            "#": [1, 2, 3, 4, 5],
-            "Adverse Event": [
-                "Hypotension",
-                "Hyperkalemia (K+ ≥6.0)",
-                "Renal impairment",
-                "Cough",
-                "Angioedema"
-            ],
-            "ENTRESTO": [
-                "18%",
-                "4.3%",
-                "3.3%",
-                "11%",
-                "0.4%"
-            ],
-            "Enalapril": [
-                "12%",
-                "5.6%",
-                "3.3%",
-                "15%",
-                "0.2%"
-            ]
-        })
-        st.dataframe(safety_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### 🔬 Additional Key Trials")
-    
-    trials_df = pd.DataFrame({
-        "#": [1, 2, 3, 4],
-        "Trial": ["PARAGON-HF", "PIONEER-HF", "PANORAMA-HF", "PARADISE-MI"],
-        "Population": [
-            "HF with preserved EF (HFpEF)",
-            "Acute decompensated HF",
-            "HFrEF + CKD",
-            "Post-MI with reduced EF"
-        ],
-        "Key Finding": [
-            "Trend toward benefit (HR 0.87, P=0.059) in women & lower EF",
-            "Greater NT-proBNP reduction vs. enalapril at 8 weeks",
-            "Maintained eGFR benefit vs. valsartan",
-            "No significant benefit vs. ramipril in post-MI"
-        ],
-        "Status": [
-            "Published (Circulation 2019)",
-            "Published (JAMA 2019)",
-            "Published (JACC 2021)",
-            "Published (NEJM 2021)"
-        ]
-    })
-    st.dataframe(trials_df, use_container_width=True, hide_index=True)
-    
-    st.markdown("### 📈 Real-World Evidence")
-    
-    st.info("""
-    **Post-Marketing Studies:**
-    - Swedish Heart Failure Registry: Similar efficacy and safety to clinical trials
-    - Veterans Affairs study: 25% reduction in mortality vs. ACEi/ARB
-    - Canadian registry: Lower hospitalization rates in elderly patients
-    
-    **Long-term Follow-up:**
-    - Benefits sustained beyond 5 years
-    - Consistent across subgroups (age, gender, race, renal function)
-    """)
+        st.markdown(header_picture, unsafe_allow_html=True)
 
-# ==================== TAB 9: REFERENCES ====================
-with tabs[8]:
-    st.header("📚 References and Sources")
-    
-    st.markdown("### 📋 Primary Regulatory Sources")
-    st.write("")
-    
-    st.markdown("""
-    **1. FDA Label (April 2024)**  
-    Official prescribing information from U.S. Food and Drug Administration  
-    🔗 [https://www.accessdata.fda.gov/drugsatfda_docs/label/2024/207620s025,218591s000lbl.pdf](https://www.accessdata.fda.gov/drugsatfda_docs/label/2024/207620s025,218591s000lbl.pdf)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **2. EMA Product Information (2024)**  
-    European Medicines Agency - ENTRESTO EPAR Product Information  
-    🔗 [https://www.ema.europa.eu/en/documents/product-information/entresto-epar-product-information_en.pdf](https://www.ema.europa.eu/en/documents/product-information/entresto-epar-product-information_en.pdf)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **3. Novartis Product Monograph**  
-    Manufacturer's official product documentation  
-    🔗 [https://www.novartis.com/us-en/sites/novartis_us/files/entresto.pdf](https://www.novartis.com/us-en/sites/novartis_us/files/entresto.pdf)
-    """)
-    
-    st.markdown("---")
-    st.markdown("### 🔬 Pivotal Clinical Trials")
-    st.write("")
-    
-    st.markdown("""
-    **4. PARADIGM-HF (NEJM 2014)**  
-    McMurray JJ, et al. "Angiotensin-neprilysin inhibition versus enalapril in heart failure"  
-    🔗 [https://www.nejm.org/doi/full/10.1056/NEJMoa1409077](https://www.nejm.org/doi/full/10.1056/NEJMoa1409077)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **5. PARAGON-HF (Circulation 2019)**  
-    Solomon SD, et al. "Sacubitril/Valsartan Across the Spectrum of Ejection Fraction in Heart Failure"  
-    🔗 [https://www.ahajournals.org/doi/10.1161/CIRCULATIONAHA.119.044586](https://www.ahajournals.org/doi/10.1161/CIRCULATIONAHA.119.044586)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **6. PIONEER-HF (JAMA 2019)**  
-    Velazquez EJ, et al. "Angiotensin-Neprilysin Inhibition in Acute Decompensated Heart Failure"  
-    🔗 [https://jamanetwork.com/journals/jama/fullarticle/2738764](https://jamanetwork.com/journals/jama/fullarticle/2738764)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **7. PANORAMA-HF (JACC 2021)**  
-    Jering KS, et al. "Cardiovascular and Kidney Outcomes Across the Glycemic Spectrum"  
-    🔗 [https://www.jacc.org/doi/10.1016/j.jacc.2021.07.036](https://www.jacc.org/doi/10.1016/j.jacc.2021.07.036)
-    """)
-    
-    st.markdown("---")
-    st.markdown("### 📖 Pharmacology & Mechanism")
-    st.write("")
-    
-    st.markdown("""
-    **8. StatPearls - Sacubitril/Valsartan**  
-    Comprehensive pharmacology review from NCBI Bookshelf  
-    🔗 [https://www.ncbi.nlm.nih.gov/books/NBK507904/](https://www.ncbi.nlm.nih.gov/books/NBK507904/)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **9. FDA Clinical Pharmacology Review (NDA 207620)**  
-    Detailed pharmacokinetics and pharmacodynamics analysis  
-    🔗 [https://www.accessdata.fda.gov/drugsatfda_docs/nda/2015/207620Orig1s000ClinPharmR.pdf](https://www.accessdata.fda.gov/drugsatfda_docs/nda/2015/207620Orig1s000ClinPharmR.pdf)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **10. Springer - Pharmacokinetics Article**  
-    Clinical pharmacokinetics of sacubitril/valsartan combination  
-    🔗 [https://link.springer.com/article/10.1007/s40262-017-0558-9](https://link.springer.com/article/10.1007/s40262-017-0558-9)
-    """)
-    
-    st.markdown("---")
-    st.markdown("### 🔍 Drug Interaction Resources")
-    st.write("")
-    
-    st.markdown("""
-    **11. Drugs.com - Drug Interactions Checker**  
-    Comprehensive drug interaction database  
-    🔗 [https://www.drugs.com/drug-interactions/entresto.html](https://www.drugs.com/drug-interactions/entresto.html)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **12. Medscape - ENTRESTO Interactions**  
-    Professional drug interaction reference  
-    🔗 [https://reference.medscape.com/drug/entresto-sacubitril-valsartan-1000010/interactions](https://reference.medscape.com/drug/entresto-sacubitril-valsartan-1000010/interactions)
-    """)
-    
-    st.markdown("---")
-    st.markdown("### 🌐 Additional Professional Resources")
-    st.write("")
-    
-    st.markdown("""
-    **13. ENTRESTO Healthcare Professional Site**  
-    Official HCP resource from Novartis  
-    🔗 [https://www.entrestohcp.com/](https://www.entrestohcp.com/)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **14. American Heart Association - Heart Failure Guidelines**  
-    Evidence-based guidelines for heart failure management  
-    🔗 [https://www.heart.org/en/health-topics/heart-failure](https://www.heart.org/en/health-topics/heart-failure)
-    """)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    **15. ACC/AHA Heart Failure Guidelines (2022)**  
-    Latest guidelines from American College of Cardiology  
-    🔗 [https://www.acc.org/guidelines](https://www.acc.org/guidelines)
-    """)
-    
+st.markdown("---")
+
+# ==================== GLOBAL SEARCH ====================
+# Lazy mode (default) runs and sends only the selected section; the selection
+# lives in the ``?tab=`` query parameter so sections can be bookmarked.
+# ENTRESTO_TAB_MODE=tabs restores the classic st.tabs layout that renders all
+# sections on every rerun.
+lazy_tabs = os.environ.get("ENTRESTO_TAB_MODE", "lazy") != "tabs"
+
+
+@st.cache_resource(show_spinner=False, max_entries=1024)
+def load_section_documents(slug, key, section_version, _section, _tables):
+    """Render one section for the search index; redone only when the section changes."""
+    return search.section_documents(_section, _tables)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def load_search_index(slug, version, _monograph):
+    """Index every section of a drug once per monograph version (a few milliseconds)."""
+    return search.SearchIndex(
+        document
+        for section in _monograph.sections
+        for document in load_section_documents(slug, section.key, _monograph.section_versions[section.key],
+                                               section, _monograph.tables)
+    )
+
+
+def go_to_section(key):
+    st.session_state["section_nav"] = key
+
+
+query = st.text_input(
+    "Search",
+    placeholder="🔍 Search all sections (e.g. hyperkalemia, washout, warfarin)",
+    label_visibility="collapsed",
+    key="search_query"
+)
+if query.strip():
+    hits = load_search_index(monograph.slug, monograph.version, monograph).search(query)
+    if not hits:
+        st.caption("No matches found.")
+    for number, hit in enumerate(hits):
+        title = f"{SECTIONS_BY_KEY[hit.section].label} › {hit.heading}"
+        if lazy_tabs:
+            st.button(title, key=f"search_hit_{number}", on_click=go_to_section, args=(hit.section,))
+        else:
+            st.markdown(f"**{title}**")
+        st.caption(hit.snippet)
     st.markdown("---")
-    st.info("""
-    **📊 Data Accuracy Statement**
-    
-    All information in this application has been verified against:
-    - FDA Label (April 2024)
-    - EMA Product Information (2024)
-    - Peer-reviewed clinical trial publications
-    - Official manufacturer documentation
-    
-    **📅 Last Updated:** February 14, 2026  
-    **📌 Version:** 2.2.0  
-    **✅ Verification Status:** All references checked and validated
-    """)
+
+# ==================== MAIN SECTIONS ====================
+def render_section(section):
+    if not instrument:
+        section.render(ui, tables)
+        if section.tool is not None:
+            tools.TOOLS[section.tool](monograph)
+        return
+
+    with metrics.REGISTRY.timed(section.key):
+        section.render(metrics.CountingUI(ui, section.key), tables)
+        if section.tool is not None:
+            tools.TOOLS[section.tool](monograph)
+
+
+if not lazy_tabs:
+    for tab, section in zip(st.tabs([section.label for section in SECTIONS]), SECTIONS):
+        with tab:
+            render_section(section)
+else:
+    section_keys = [section.key for section in SECTIONS]
+    if st.session_state.get("section_nav") not in SECTIONS_BY_KEY:
+        requested = st.query_params.get("tab")
+        st.session_state["section_nav"] = requested if requested in SECTIONS_BY_KEY else section_keys[0]
+
+    selected = st.radio(
+        "Section",
+        section_keys,
+        format_func=lambda key: SECTIONS_BY_KEY[key].label,
+        horizontal=True,
+        label_visibility="collapsed",
+        key="section_nav"
+    )
+    if st.query_params.get("tab") != selected:
+        st.query_params["tab"] = selected
+
+    render_section(SECTIONS_BY_KEY[selected])
 
 # ==================== FOOTER ====================
 st.markdown("---")
-st.markdown("""
-<div style="text-align: center; color: #64748b; padding: 2rem 0;">
-    <p><strong>ENTRESTO Professional Drug Information</strong></p>
-    <p>Pre-Pharmacode V2.0 Standard | FDA-Verified | Evidence-Based</p>
-    <p>Version 2.2.0 | Last Updated: February 14, 2026</p>
-    <p style="font-size: 0.9rem; margin-top: 1rem;">
-        ⚠️ <em>This information is for healthcare professionals only. 
-        Always consult the full prescribing information and clinical judgment when making treatment decisions.</em>
-    </p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(theme.footer_html(monograph), unsafe_allow_html=True)
+offline_url = os.environ.get("ENTRESTO_OFFLINE_URL")
+if offline_url:
+    st.caption(f"📴 [Offline copy]({offline_url}): install it on a ward device to read the monograph "
+               "without a connection.")
+
+# ==================== DIAGNOSTICS ====================
+if instrument and st.query_params.get("diagnostics") == "1":
+    sections, reruns, sessions = metrics.REGISTRY.snapshot()
+    with st.expander("🩺 Diagnostics", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Reruns (this session)", st.session_state["metrics_reruns"])
+        col2.metric("Reruns (process)", reruns)
+        col3.metric("Sessions (process)", sessions)
+        rows = sorted(sections.items(), key=lambda item: -item[1].seconds)
+        st.markdown(theme.table_html({
+            "Section": [key for key, _ in rows],
+            "Renders": [stats.renders for _, stats in rows],
+            "Mean (ms)": [f"{1000 * stats.seconds / stats.renders:.1f}" if stats.renders else "-" for _, stats in rows],
+            "Max (ms)": [f"{1000 * stats.max_seconds:.1f}" for _, stats in rows],
+            "Bytes / render": [stats.bytes // stats.renders if stats.renders else 0 for _, stats in rows],
+            "Tables built": [stats.tables for _, stats in rows],
+        }), unsafe_allow_html=True)
+        fragment_cache = fragments.CACHE.cache_info()
+        st.caption(f"HTML fragment cache: {fragment_cache.hit_rate:.1%} hits "
+                   f"({fragment_cache.hits} hits, {fragment_cache.misses} misses), "
+                   f"{fragment_cache.currsize} fragments, {fragment_cache.size_bytes / 1024:.1f} KB, "
+                   f"{fragment_cache.removed} unsafe tags/attributes removed.")
+        st.caption("Prometheus text format: `/metrics` on port `ENTRESTO_METRICS_PORT` "
+                   f"(default {metrics.DEFAULT_PORT}).")
+
+if sid is not None:
+    values = {**st.session_state["state_values"], **state.snapshot(st.session_state)}
+    if values != st.session_state["state_values"]:
+        store.put(sid, values)
+        st.session_state["state_values"] = values
+
+# ==================== CACHE WARM-UP ====================
+def warm_caches(monograph, table_names=None):
+    """Fill the shared caches of a monograph.
+
+    Every cache is keyed on the narrowest version it depends on, so after a
+    reload only what changed is rebuilt; ``table_names`` limits the display
+    tables built (default: all).
+    """
+    load_search_index(monograph.slug, monograph.version, monograph)
+    tools.warm_caches(monograph)
+    tables = display_tables(monograph)
+    for name in monograph.tables if table_names is None else table_names:
+        tables[name]
+
+
+def rewarm(old, new):
+    warm_caches(new, monographs.changed_tables(old, new))
+
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up(slug, version, _monograph):
+    """Fill the remaining shared caches in the background, once per process.
+
+    Runs after the first page has been sent, so the first visitor after a cold
+    start does not wait for caches their section does not need, and the next
+    search or tool use finds them ready.
+    """
+    thread = threading.Thread(target=warm_caches, args=(_monograph,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource(show_spinner=False)
+def start_watching():
+    """Watch the monograph files for edits, once per process.
+
+    A changed file is swapped in by the watcher thread and the caches of the
+    sections and tables it changed are rebuilt there; open sessions keep the
+    monograph they are rendering and pick up the new one on their next rerun.
+    """
+    return monographs.watch(on_change=rewarm)
+
+
+start_warm_up(monograph.slug, monograph.version, monograph)
+start_watching()
@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from druginfo import monographs  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def monograph():
+    return monographs.load()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+import pytest
+
+pytest.importorskip("starlette")
+
+from druginfo import api  # noqa: E402
+
+
+def get(path, headers=()):
+    """``(status, headers, body)`` of one GET through the ASGI app (no HTTP client needed)."""
+    url = urlsplit(path)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": url.path, "raw_path": url.path.encode(), "query_string": url.query.encode(), "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(api.app(scope, receive, send))
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], {name.decode(): value.decode() for name, value in start["headers"]}, body
+
+
+def test_resource_is_served_with_etag_and_304_on_match():
+    status, headers, body = get("/api/v1/drugs/entresto")
+    assert status == 200 and json.loads(body)
+    status, _, body = get("/api/v1/drugs/entresto", [("If-None-Match", headers["etag"])])
+    assert status == 304 and body == b""
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/drugs/nope",
+    "/api/v1/drugs/nope/dose?weight_kg=70&egfr=45",
+    "/api/v1/drugs/nope/screen?egfr=12",
+    "/api/v1/drugs/entresto/no-such-resource",
+])
+def test_unknown_drug_or_resource_is_404(path):
+    status, _, body = get(path)
+    assert status == 404 and "error" in json.loads(body)
+
+
+@pytest.mark.parametrize("query, field", [
+    ("egfr=45", "weight_kg"),
+    ("weight_kg=abc&egfr=45", "weight_kg"),
+    ("weight_kg=inf&egfr=45", "weight_kg"),
+    ("weight_kg=nan&egfr=45", "weight_kg"),
+    ("weight_kg=70&egfr=1e9", "egfr"),
+    ("weight_kg=70&egfr=45&sbp=-inf", "sbp"),
+    ("weight_kg=70&egfr=45&child_pugh=D", "child_pugh"),
+])
+def test_invalid_dose_request_is_400(query, field):
+    status, _, body = get(f"/api/v1/dose?{query}")
+    assert status == 400
+    assert field in json.loads(body)["error"]
+
+
+def test_dose_plan():
+    status, _, body = get("/api/v1/dose?weight_kg=70&egfr=45&prior_agent=arb&prior_daily_dose_mg=320")
+    assert status == 200
+    assert json.loads(body)["plan"]["starting_dose"] == "49/51 mg BID"
+
+
+@pytest.mark.parametrize("query, field", [
+    ("egfr=abc", "egfr"),
+    ("egfr=inf", "egfr"),
+    ("pregnant=maybe", "pregnant"),
+    ("shoe_size=9", "shoe_size"),
+])
+def test_invalid_screen_request_is_400(query, field):
+    status, _, body = get(f"/api/v1/screen?{query}")
+    assert status == 400
+    assert field in json.loads(body)["error"]
+
+
+def test_screen_fires_rule():
+    status, _, body = get("/api/v1/screen?egfr=12")
+    assert status == 200
+    assert "egfr_below_15" in [finding["rule"] for finding in json.loads(body)["findings"]]
+
+
+def test_interaction_check_needs_a_drug():
+    assert get("/api/v1/interactions/check")[0] == 400
+
+
+def test_interaction_check_reports_every_component_and_suggestions():
+    status, _, body = get("/api/v1/interactions/check?drug=amlodipine/benazepril&drug=lisinoprill")
+    payload = json.loads(body)
+    assert status == 200
+    assert {match["matched"].lower() for match in payload["matches"]} == {"amlodipine", "benazepril"}
+    assert payload["unknown"] == ["lisinoprill"]
+    assert [item["suggestion"].lower() for item in payload["did_you_mean"]] == ["lisinopril"]
+
+
+@pytest.mark.parametrize("query, recommended, starting", [
+    ("egfr=14.6", False, "Not recommended"),
+    ("egfr=29.5", True, "24/26 mg BID"),
+    ("egfr=45&sbp=99.5", True, "24/26 mg BID"),
+    ("egfr=45&sbp=100", True, "49/51 mg BID"),
+])
+def test_dose_thresholds_apply_to_unrounded_inputs(query, recommended, starting):
+    status, _, body = get(f"/api/v1/dose?weight_kg=70&prior_agent=arb&prior_daily_dose_mg=320&{query}")
+    plan = json.loads(body)["plan"]
+    assert status == 200
+    assert plan["recommended"] == recommended and plan["starting_dose"] == starting
@@ -0,0 +1,33 @@
+import stat
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from druginfo import bundle, monographs  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def parsed():
+    return monographs.parse(monographs.path_for(monographs.DEFAULT_DRUG).read_bytes(), monographs.DEFAULT_DRUG)
+
+
+def test_bundled_monograph_matches_the_parsed_file(parsed, tmp_path):
+    bundle.build(parsed, tmp_path)
+    bundled = bundle.load_monograph(parsed.slug, parsed.version, tmp_path)
+    assert bundled.table_versions == parsed.table_versions
+    assert bundled.section_versions == parsed.section_versions
+    assert list(bundled.tables) == list(parsed.tables)
+    for name, columns in parsed.tables.items():
+        assert isinstance(bundled.tables[name], bundle.Columns)
+        assert dict(bundled.tables[name]) == columns
+
+
+def test_files_are_world_readable(parsed, tmp_path):
+    directory = bundle.build(parsed, tmp_path)
+    for path in directory.iterdir():
+        assert stat.S_IMODE(path.stat().st_mode) == 0o644, path.name
+
+
+def test_unbuilt_version_is_not_loaded(parsed, tmp_path):
+    assert bundle.load_monograph(parsed.slug, "0" * 12, tmp_path) is None
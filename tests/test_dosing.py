@@ -0,0 +1,122 @@
+import itertools
+
+import pytest
+
+from druginfo import dosing
+
+pd = pytest.importorskip("pandas")
+
+GRID = {
+    "weight_kg": (12.5, 39.9, 40.0, 72.3),
+    "egfr": (10, 14.6, 20, 45, 90),
+    "child_pugh": (None, "A", "b", "C"),
+    "prior_agent": ("none", "acei", "ARB"),
+    "prior_daily_dose_mg": (5.0, 160.0, 320.0),
+    "sbp": (95, 130),
+    "pediatric": (False, True),
+}
+
+
+@pytest.fixture(scope="module")
+def patients():
+    return pd.DataFrame(list(itertools.product(*GRID.values())), columns=list(GRID))
+
+
+def _expected(row):
+    plan = dosing.calculate_dose(**row)
+    return {
+        "status": "recommended" if plan.recommended else "not recommended",
+        "starting_dose": plan.starting_dose,
+        "target_dose": plan.target_dose,
+        "weeks_to_target": plan.schedule[-1].week if plan.schedule else 0,
+        "washout_hours": plan.washout_hours,
+        "notes": "; ".join(plan.notes),
+    }
+
+
+def test_bulk_path_matches_the_single_patient_path_row_for_row(patients):
+    result = dosing.calculate_doses(patients)
+    for row, got in zip(patients.to_dict("records"), result.to_dict("records")):
+        expected = _expected({name: None if value != value else value for name, value in row.items()})
+        assert {name: got[name] for name in expected} == expected, row
+
+
+def test_grid_covers_the_special_branches(patients):
+    result = dosing.calculate_doses(patients)
+    notes = set(result["notes"].astype(str))
+    assert any("Pediatric ≥40 kg" in text for text in notes)
+    assert any("Pediatric <40 kg" in text for text in notes)
+    assert any("Child-Pugh C" in text for text in notes)
+    assert (result["starting_dose"] == dosing.ADULT_LADDER[dosing.STANDARD_START]).any()
+
+
+@pytest.mark.parametrize("change", [
+    {"weight_kg": "abc"}, {"weight_kg": float("inf")}, {"egfr": float("nan")}, {"egfr": 1e9},
+    {"sbp": -1}, {"child_pugh": "D"}, {"prior_agent": "beta blocker"}, {"prior_daily_dose_mg": 1e6},
+])
+def test_rows_the_single_path_rejects_are_invalid_in_bulk(change):
+    row = {"weight_kg": 70.0, "egfr": 60, "child_pugh": None, "prior_agent": "arb",
+           "prior_daily_dose_mg": 320.0, "sbp": 120, "pediatric": False, **change}
+    with pytest.raises(ValueError):
+        dosing.calculate_dose(**row)
+    result = dosing.calculate_doses(pd.DataFrame([row]))
+    assert list(result["status"]) == ["invalid input"]
+    assert list(result["notes"]) == ["Invalid input"]
+
+
+BASE = {"weight_kg": 70.0, "egfr": 90, "child_pugh": None, "prior_agent": "arb",
+        "prior_daily_dose_mg": 320.0, "sbp": 120, "pediatric": False}
+STANDARD, REDUCED = dosing.ADULT_LADDER[dosing.STANDARD_START], dosing.ADULT_LADDER[dosing.REDUCED_START]
+
+# (inputs, recommended, starting dose or a prefix of it, a note that must / must not be present)
+BOUNDARIES = [
+    ({"egfr": 14.6}, False, "Not recommended", "eGFR <15"),
+    ({"egfr": 14.99}, False, "Not recommended", "eGFR <15"),
+    ({"egfr": 15}, True, REDUCED, "eGFR 15-29"),
+    ({"egfr": 29.5}, True, REDUCED, "eGFR 15-29"),
+    ({"egfr": 30}, True, STANDARD, None),
+    ({"sbp": 99.5}, True, REDUCED, "Systolic BP <100"),
+    ({"sbp": 100}, True, STANDARD, None),
+    ({"prior_daily_dose_mg": 160}, True, REDUCED, "Low-dose prior"),
+    ({"prior_daily_dose_mg": 160.04}, True, STANDARD, None),
+    ({"pediatric": True, "weight_kg": 39.96}, True, "1.6 mg/kg BID", "Pediatric <40 kg"),
+    ({"pediatric": True, "weight_kg": 40}, True, STANDARD, "Pediatric ≥40 kg"),
+]
+
+
+def _bulk_row(inputs):
+    return dosing.calculate_doses(pd.DataFrame([inputs])).iloc[0]
+
+
+@pytest.mark.parametrize("change, recommended, starting, note", BOUNDARIES)
+def test_thresholds_apply_to_unrounded_inputs(change, recommended, starting, note):
+    inputs = {**BASE, **change}
+    plan = dosing.calculate_dose(**inputs)
+    assert plan.recommended == recommended
+    assert plan.starting_dose.startswith(starting)
+    if note is None:
+        assert plan.notes == ()
+    else:
+        assert any(text.startswith(note) for text in plan.notes)
+
+    row = _bulk_row(inputs)
+    assert row["status"] == ("recommended" if recommended else "not recommended")
+    assert row["starting_dose"] == plan.starting_dose
+    assert row["notes"] == "; ".join(plan.notes)
+
+
+def test_closer_monitoring_below_60_is_not_rounded_away():
+    closer = "eGFR <60: more frequent K+ and SCr/eGFR checks"
+    assert closer in dosing.calculate_dose(**{**BASE, "egfr": 59.6}).monitoring
+    assert closer not in dosing.calculate_dose(**{**BASE, "egfr": 60}).monitoring
+
+
+def test_weight_based_dosing_says_adult_adjustments_were_not_evaluated():
+    child = {**BASE, "pediatric": True, "weight_kg": 20.0}
+    assert dosing.PEDIATRIC_ADJUSTMENTS_NOTE not in dosing.calculate_dose(**child).notes
+    for change in ({"egfr": 20}, {"child_pugh": "B"}, {"sbp": 90}, {"prior_agent": "none"},
+                   {"prior_daily_dose_mg": 80}):
+        plan = dosing.calculate_dose(**{**child, **change})
+        assert plan.starting_dose.startswith("1.6 mg/kg")
+        assert dosing.PEDIATRIC_ADJUSTMENTS_NOTE in plan.notes, change
+        assert _bulk_row({**child, **change})["notes"] == "; ".join(plan.notes)
@@ -0,0 +1,105 @@
+import pytest
+
+from druginfo import interactions
+
+
+@pytest.fixture(scope="module")
+def index(monograph):
+    return interactions.InteractionIndex(monograph.tables)
+
+
+def _class_rows(tables):
+    """``(table, row, class name)`` of every row that names a class rather than one drug."""
+    table = tables["contraind_interactions"]
+    for row, drug in zip(table["#"], table["Drug"]):
+        if interactions.normalize(interactions._names(drug)[0]) in interactions.CLASS_MEMBERS:
+            yield "contraind_interactions", row, drug
+    table = tables["monitor"]
+    for row, drug_class in zip(table["#"], table["Drug Class"]):
+        yield "monitor", row, drug_class
+
+
+def _rows(index, query):
+    matches, _, _ = index.check([query])
+    return {(match.interaction.table, match.interaction.row) for match in matches}
+
+
+@pytest.mark.parametrize("query", ["potassium chloride", "KCl", "potassium citrate", "Potassium Chloride 20 mEq"])
+def test_potassium_supplements_are_monitored(index, query):
+    matches, unknown, _ = index.check([query])
+    assert not unknown
+    assert {match.interaction.severity for match in matches} == {"monitor"}
+    assert "hyperkalemia" in " ".join(match.interaction.effect.lower() for match in matches)
+
+
+def test_every_class_row_resolves_from_a_concrete_drug(monograph, index):
+    for table, row, name in _class_rows(monograph.tables):
+        key = interactions.normalize(interactions._names(name)[0])
+        tables = monograph.tables
+        examples = []
+        if table == "monitor":
+            examples = tables["monitor"]["Examples"][tables["monitor"]["#"].index(row)].split(",")
+        concrete = [*interactions.CLASS_MEMBERS.get(key, ()), *examples]
+        # Class labels and abbreviations ("NSAID", "ARB") are not drug names.
+        concrete = [drug for drug in concrete if drug.strip() and not drug.strip().isupper()
+                    and interactions.normalize(drug) != key]
+        assert any((table, row) in _rows(index, drug) for drug in concrete), name
+
+
+@pytest.mark.parametrize("query, severity", [
+    ("ramipril", "contraindicated"),
+    ("candesartan", "contraindicated"),
+    ("Klor-Con", "monitor"),
+    ("ibuprofen", "monitor"),
+    ("eplerenone", "monitor"),
+    ("lithium carbonate", "monitor"),
+    ("warfarin", "no interaction"),
+])
+def test_resolves_members_to_their_row(index, query, severity):
+    matches, unknown, _ = index.check([query])
+    assert not unknown
+    assert matches[0].interaction.severity == severity
+
+
+@pytest.mark.parametrize("query, components", [
+    ("amlodipine/benazepril", {"amlodipine", "benazepril"}),
+    ("Amlodipine-Benazepril 5/20 mg", {"amlodipine", "benazepril"}),
+    ("hydrochlorothiazide lisinopril", {"hydrochlorothiazide", "lisinopril"}),
+    ("lisinopril + hydrochlorothiazide", {"hydrochlorothiazide", "lisinopril"}),
+    ("Potassium Chloride 20 mEq", {"potassium chloride"}),
+])
+def test_combination_products_resolve_every_component(index, query, components):
+    matches, unknown, _ = index.check([query])
+    assert not unknown
+    assert {match.term for match in matches} == components
+    assert all(match.query == query for match in matches)
+
+
+@pytest.mark.parametrize("query", ["amlodipine/benazepril", "hydrochlorothiazide lisinopril"])
+def test_ace_inhibitor_in_a_combination_is_contraindicated(index, query):
+    matches, _, _ = index.check([query])
+    assert matches[0].interaction.severity == "contraindicated"
+
+
+def test_unrecognized_component_of_a_combination_is_reported(index):
+    matches, unknown, suggestions = index.check(["amlodipine/benazeprill"])
+    assert {match.term for match in matches} == {"amlodipine"}
+    assert unknown == ["benazeprill"]
+    assert [(suggestion.query, suggestion.term) for suggestion in suggestions] == [("benazeprill", "benazepril")]
+
+
+def test_misspelling_is_only_suggested(index):
+    matches, unknown, suggestions = index.check(["lisinoprill"])
+    assert matches == [] and unknown == ["lisinoprill"]
+    assert suggestions[0].term == "lisinopril" and suggestions[0].score < 1.0
+
+
+@pytest.mark.parametrize("query", ["digitoxin", "esomeprazole"])
+def test_different_drugs_are_not_mapped_onto_similar_ones(index, query):
+    matches, unknown, suggestions = index.check([query])
+    assert matches == [] and unknown == [query] and suggestions == []
+
+
+def test_unknown_drug_is_reported(index):
+    matches, unknown, suggestions = index.check(["zzzz"])
+    assert matches == [] and unknown == ["zzzz"] and suggestions == []
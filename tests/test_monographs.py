@@ -0,0 +1,31 @@
+import json
+import os
+
+import pytest
+
+from druginfo import monographs
+
+
+def _write(path, text, mtime_ns):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_display_name_follows_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(monographs, "MONOGRAPH_DIR", tmp_path)
+    path = tmp_path / "sampledrug.json"
+    _write(path, json.dumps({"name": "Sample"}), 1_000_000_000)
+    assert monographs.display_name("sampledrug") == "Sample"
+
+    _write(path, json.dumps({"name": "Sample XR"}), 2_000_000_000)
+    assert monographs.display_name("sampledrug") == "Sample XR"
+
+    # Half-written: the last good name stays until the file changes again.
+    _write(path, '{"name": "Sam', 3_000_000_000)
+    assert monographs.display_name("sampledrug") == "Sample XR"
+    _write(path, json.dumps({}), 4_000_000_000)
+    assert monographs.display_name("sampledrug") == "sampledrug"
+
+    path.unlink()
+    with pytest.raises(KeyError):
+        monographs.display_name("sampledrug")
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from druginfo import risk, screening  # noqa: E402
+
+VALUES = {
+    screening.BOOL: (True, False, None),
+    screening.NUMBER: (45, 64, 65, 80, None),
+    screening.TEXT: ("A", "B", "C", None),
+}
+
+
+@pytest.fixture(scope="module")
+def model(monograph):
+    return monograph.risk_model
+
+
+def _cohort(model, size, seed):
+    rng = random.Random(seed)
+    return pd.DataFrame([{field: rng.choice(VALUES[kind]) for field, kind in model.fields.items()}
+                         for _ in range(size)], dtype=object)
+
+
+def _interval(text):
+    low, high = text.split("–")
+    return float(low.replace(",", "")), float(high.replace(",", ""))
+
+
+@pytest.mark.parametrize("size, seed", [(1, 0), (40, 1), (1000, 2), (25000, 3)])
+def test_bootstrap_interval_contains_the_point_estimate(model, size, seed):
+    estimate = model.estimate(_cohort(model, size, seed), samples=500, seed=seed)
+    assert estimate.patients == size
+    interval = f"{risk.CONFIDENCE:.0%} interval"
+    for _, row in estimate.events.iterrows():
+        low, high = _interval(row[interval])
+        assert low <= row["Expected events"] <= high, row["Adverse Reaction"]
+
+
+def test_expected_events_are_the_rates_without_population_members(model):
+    cohort = pd.DataFrame({field: [False if kind == screening.BOOL else None] * 200
+                           for field, kind in model.fields.items()}, dtype=object)
+    estimate = model.estimate(cohort, samples=0)
+    assert list(estimate.events["Expected events"]) == [round(200 * rate, 1) for rate in model.rates]
+
+
+def test_percent_rejects_text_that_is_not_a_percentage():
+    assert risk.percent(" 2.4 % ") == pytest.approx(0.024)
+    with pytest.raises(ValueError):
+        risk.percent("n/a")
+
+
+def test_a_mapping_cohort_counts_rows_not_columns(model):
+    # Without populations there are no masks to take the length from.
+    plain = risk.RiskModel(model.events, model.rates, model.comparator, model.n, (), screening.ConditionSet((), {}))
+    cohort = {"age": [70] * 30, "black": [False] * 30}
+    assert plain.estimate(cohort, samples=0).patients == 30
+    assert model.estimate(cohort, samples=0).patients == 30
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from druginfo import screening  # noqa: E402
+
+# Readable, unreadable and missing spellings of every field kind.
+VALUES = {
+    screening.BOOL: (True, False, "yes", " Y ", "no", "0", "1", "maybe", "", None),
+    screening.NUMBER: (0, 10, 14.9, 15, 35.5, 36, 120, "12", " 40 ", "abc", "", None, float("nan")),
+    screening.TEXT: ("A", "b", "C", " c ", "", None),
+}
+
+
+@pytest.fixture(scope="module")
+def rules(monograph):
+    return monograph.rules
+
+
+@pytest.fixture(scope="module")
+def cohort(rules):
+    rng = random.Random(0)
+    records = [{field: rng.choice(VALUES[kind]) for field, kind in rules.kinds.items()} for _ in range(2000)]
+    return pd.DataFrame(records, dtype=object)
+
+
+def _worst(actions):
+    return next((action for action in screening.ACTIONS if action in actions), screening.CLEAR)
+
+
+def test_screen_frame_matches_screen_per_record(rules, cohort):
+    result = rules.screen_frame(cohort)
+    assert result.attrs["missing_fields"] == []
+    for record, (_, row) in zip(cohort.to_dict("records"), result.iterrows()):
+        findings, _ = rules.screen(record)
+        fired = [finding.rule.id for finding in findings]
+        assert [rule.id for rule in rules.rules if row[f"rule_{rule.id}"]] == fired, record
+        assert row["screen_findings"] == ", ".join(fired)
+        assert row["screen_result"] == _worst({finding.rule.action for finding in findings})
+
+
+def test_absent_fields_never_fire(rules, cohort):
+    partial = cohort.drop(columns=["egfr"])
+    result = rules.screen_frame(partial)
+    assert result.attrs["missing_fields"] == ["egfr"]
+    for record, (_, row) in zip(partial.to_dict("records"), result.iterrows()):
+        findings, _ = rules.screen(record)
+        assert row["screen_findings"] == ", ".join(finding.rule.id for finding in findings)
+
+
+def _write(frame, name):
+    import io
+
+    out = io.BytesIO()
+    if name.endswith(".parquet"):
+        frame.to_parquet(out, index=False)
+    else:
+        frame.to_csv(out, index=False)
+    return out.getvalue()
+
+
+def _read(payload, name):
+    import io
+
+    return pd.read_parquet(io.BytesIO(payload)) if name.endswith(".parquet") else pd.read_csv(io.BytesIO(payload))
+
+
+@pytest.mark.parametrize("name", ["cohort.csv", "cohort.parquet"])
+def test_bulk_export_round_trips_fields_named_like_rules(monograph, rules, name):
+    pytest.importorskip("pyarrow")
+    from druginfo import tools
+
+    frame = pd.DataFrame({"hypersensitivity": [True, False], "angioedema_history": [False, True],
+                          "egfr": [60, 10]})
+    result, _, _ = tools._bulk_screening(monograph.slug, monograph.version, _write(frame, name), name, _rules=rules)
+    read = _read(result, name)
+    assert read.columns.is_unique
+    assert list(read["hypersensitivity"]) == [True, False]
+    assert list(read["rule_hypersensitivity"]) == [True, False]
+    assert list(read["rule_angioedema_history"]) == [False, True]
+    assert list(read["screen_findings"]) == ["hypersensitivity", "angioedema_history, egfr_below_15"]
+
+    # Screening a downloaded result again replaces its screen columns.
+    again, _, _ = tools._bulk_screening(monograph.slug, monograph.version, result, name, _rules=rules)
+    assert list(_read(again, name).columns) == list(read.columns)
+
+
+def test_a_mapping_cohort_without_rules_keeps_every_row():
+    result = screening.RuleSet((), (), {}).screen_frame({"age": [70] * 30, "egfr": [40] * 30})
+    assert len(result) == 30
+    assert set(result["screen_result"]) == {screening.CLEAR}
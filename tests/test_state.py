@@ -0,0 +1,28 @@
+from druginfo import state
+
+
+def test_session_id_comes_from_the_cookie_only():
+    cookie = "ab" * 16
+    sid = state.session_id({state.SESSION_COOKIE: cookie})
+    assert state.valid_sid(sid)
+    # The file name is a hash, not the cookie itself.
+    assert sid != cookie
+    assert sid == state.session_id({state.SESSION_COOKIE: cookie})
+    assert sid != state.session_id({state.SESSION_COOKIE: "cd" * 16})
+
+
+def test_session_id_rejects_missing_or_malformed_cookies():
+    assert state.session_id({}) is None
+    assert state.session_id({"sid": "ab" * 16}) is None
+    for cookie in ("", "../../etc/passwd", "AB" * 16, "ab" * 15):
+        assert state.session_id({state.SESSION_COOKIE: cookie}) is None
+
+
+def test_store_round_trip(tmp_path):
+    store = state.FileStore(tmp_path)
+    sid = state.session_id({state.SESSION_COOKIE: "ab" * 16})
+    assert store.get(sid) == {}
+    values = {"calc_weight": 55.5, "search_query": "angioedema"}
+    store.put(sid, values)
+    assert store.get(sid) == values
+    assert [path.name for path in tmp_path.iterdir()] == [f"{sid}.json"]
@@ -0,0 +1,75 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from druginfo import trials  # noqa: E402
+
+
+def test_forest_plots_never_share_an_axis_between_measures(monograph):
+    rows = trials.derive(monograph.tables[trials.TABLE])
+    groups = {trials.ALL: rows}
+    for row in rows:
+        groups.setdefault(row["Endpoint"], []).append(row)
+    for endpoint, members in groups.items():
+        data, spec = trials.forest_plot(members, endpoint)
+        measures = list(dict.fromkeys(row["Measure"] for row in members))
+        panels = spec.get("vconcat", [spec])
+        assert [panel["transform"][0]["filter"]["equal"] for panel in panels] == measures
+        assert data.column("Measure").to_pylist() == [row["Measure"] for row in members]
+
+
+def test_panorama_hf_is_the_pediatric_trial_against_enalapril(monograph):
+    columns = monograph.tables["trials"]
+    n = columns["Trial"].index("PANORAMA-HF")
+    assert columns["Population"][n].startswith("Pediatric")
+    assert "enalapril" in columns["Key Finding"][n]
+
+
+def _row(monograph, trial, endpoint):
+    rows = trials.derive(monograph.tables[trials.TABLE])
+    return next(row for row in rows if row["Trial"] == trial and row["Endpoint"] == endpoint)
+
+
+def test_paradigm_primary_endpoint_metrics(monograph):
+    row = _row(monograph, "PARADIGM-HF", "Primary endpoint")
+    # 914/4187 vs 1117/4212 patients with an event.
+    assert row["Risk (ENTRESTO)"] == pytest.approx(0.2183, abs=1e-4)
+    assert row["Risk (Comparator)"] == pytest.approx(0.2652, abs=1e-4)
+    assert row["ARR"] == pytest.approx(0.0469, abs=1e-4)
+    assert row["ARR (95% CI)"] == "4.7% (2.9% to 6.5%)"
+    assert row["NNT (95% CI)"] == "NNTB 22 (16–35)"
+    assert row["RR (95% CI)"] == "0.82 (0.76–0.89)"
+    assert row["Effect (95% CI)"] == "HR 0.80 (0.73–0.87)"
+
+
+def test_metrics_against_hand_calculation():
+    arr, low, high = trials.risk_difference(10, 100, 20, 100)
+    se = (0.1 * 0.9 / 100 + 0.2 * 0.8 / 100) ** 0.5
+    assert arr == pytest.approx(0.1)
+    assert (low, high) == pytest.approx((0.1 - trials.Z95 * se, 0.1 + trials.Z95 * se))
+    rr, rr_low, rr_high = trials.relative_risk(10, 100, 20, 100)
+    assert rr == pytest.approx(0.5)
+    assert rr_low < 0.5 < rr_high
+    assert rr_low * rr_high == pytest.approx(0.25)  # symmetric on the log scale
+
+
+def test_ci_crossing_zero_spans_benefit_and_harm(monograph):
+    row = _row(monograph, "PARAGON-HF", "CV death")
+    assert row["ARR (95% CI)"] == "0.4% (-1.2% to 2.0%)"
+    assert row["NNT (95% CI)"] == "NNTB 251 (NNTH 84 to ∞ to NNTB 51)"
+    # A point estimate on the harm side keeps the same interval wording.
+    assert trials.nnt_text(-0.01, -0.03, 0.02) == "NNTH 100 (NNTH 34 to ∞ to NNTB 50)"
+
+
+def test_nnt_sign_and_limits():
+    assert trials.nnt_text(0.05, 0.02, 0.08) == "NNTB 20 (13–50)"
+    # Harm: the ARR and both limits are negative, the NNTH limits still run low to high.
+    assert trials.nnt_text(-0.05, -0.08, -0.02) == "NNTH 20 (13–50)"
+    assert trials.nnt_text(0, -0.01, 0.01) == "∞"
+
+
+def test_endpoints_without_patient_counts_keep_only_the_estimate(monograph):
+    row = _row(monograph, "PARAGON-HF", "Primary endpoint")
+    assert row["ARR"] is None
+    assert (row["ARR (95% CI)"], row["NNT (95% CI)"], row["RR (95% CI)"]) == ("", "", "")
+    assert row["Effect (95% CI)"] == "Rate ratio 0.87 (0.75–1.01)"